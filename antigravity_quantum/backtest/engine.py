@@ -1,22 +1,29 @@
 import asyncio
+import copy
 import pandas as pd
 from typing import Dict, List
 from ..strategies.factory import StrategyFactory
+from ..strategies.base import IStrategy
 from ..data.stream import MarketStream
+from ..config import VECTORIZED_BACKTEST
+from .vectorized import simulate_spot
+from .futures import FuturesCosts, simulate_futures
 
 class BacktestEngine:
-    def __init__(self, assets: List[str], initial_capital: float = 1000.0, days: int = 30):
+    def __init__(self, assets: List[str], initial_capital: float = 1000.0, days: int = 30, market_stream: MarketStream = None):
         self.assets = assets
         self.initial_capital = initial_capital
         self.days = days
-        self.market_stream = MarketStream()
+        self.market_stream = market_stream # Created on run(): backtest_asset() alone needs no exchange
         
-    async def run(self, strategy_override: IStrategy = None):
+    async def run(self, strategy_override: IStrategy = None, vectorized: bool = None):
         print(f"\n🚀 STARTING BACKTEST SIMULATION (Pilot Mode)")
         print(f"🎯 Assets: {self.assets}")
         print(f"💰 Initial Capital: ${self.initial_capital:,.2f} per asset")
         print(f"🗓️  Period: Last {self.days} Days\n{'='*50}")
         
+        if self.market_stream is None:
+            self.market_stream = MarketStream()
         await self.market_stream.initialize()
         
         results = {}
@@ -24,105 +31,155 @@ class BacktestEngine:
         for asset in self.assets:
             print(f"\n🔍 Analyzing {asset}...")
             
-            # 1. Fetch History
-            df = await self.market_stream.get_historical_candles(asset, days=self.days)
+            if strategy_override:
+                # Fresh copy per asset: stateful strategies (grid) anchor per asset
+                strategy = copy.deepcopy(strategy_override)
+            else:
+                strategy = StrategyFactory.get_strategy(asset.replace('USDT',''), volatility_index=0.5)
+            print(f"⚙️  Strategy: {strategy.name}")
+
+            # 1. Fetch History (+ the indicators the strategy declares)
+            df = await self.market_stream.get_historical_candles(asset, days=self.days, indicators=strategy.required_indicators)
             if df.empty:
                 print(f"❌ No data for {asset}")
                 continue
                 
-            # 2. Setup Simulation State
-            balance = self.initial_capital
-            position = None # {'entry': float, 'size': float}
-            trades_log = []
+            # 2. Simulate (whole-history signals + NumPy fills, or the bar-by-bar loop)
+            results[asset] = await self.backtest_asset(asset, strategy, df, vectorized=vectorized)
+            balance, roi = results[asset]['final_balance'], results[asset]['roi']
             
-            if strategy_override:
-                strategy = strategy_override
-            else:
-                strategy = StrategyFactory.get_strategy(asset.replace('USDT',''), volatility_index=0.5)
-            print(f"⚙️  Strategy: {strategy.name}")
+            print(f"🏁 Result: ${balance:,.2f} ({roi:+.2f}%) | Trades: {results[asset]['trades']}")
+
+        await self.market_stream.close()
+        return results
+
+    async def backtest_asset(self, asset: str, strategy: IStrategy, df: pd.DataFrame, vectorized: bool = None) -> Dict:
+        """
+        Simulates one asset over df (indicators already computed).
+        vectorized (default VECTORIZED_BACKTEST): one analyze_series() pass + simulate_spot(),
+        same trades/balance as the loop. Histories shorter than the warmup use the loop.
+        """
+        if vectorized is None:
+            vectorized = VECTORIZED_BACKTEST
+        if vectorized:
+            result = await self._run_vectorized(asset, strategy, df)
+            if result is not None:
+                return result
+        return await self._run_loop(asset, strategy, df)
+
+    async def backtest_futures(self, asset: str, strategy: IStrategy, df: pd.DataFrame,
+                               costs: FuturesCosts = None, warmup: int = 50) -> Dict:
+        """
+        Long/short futures version of backtest_asset(): SELL opens shorts, sizing/leverage and
+        SL/TP from strategy.calculate_entry_params(), fees, slippage and funding (see simulate_futures).
+        Raises ValueError if df lacks a column the strategy declares: its SL/TP (e.g. Trend's ATR
+        distance) would silently come from calculate_entry_params() fallbacks.
+        """
+        missing = [col for col in strategy.required_indicators if col not in df.columns]
+        if missing:
+            raise ValueError(f"backtest_futures({asset}): {strategy.name} needs {missing}; SL/TP would use fallbacks")
+        actions, confidences = await self.signal_series(asset, strategy, df, warmup)
+        return simulate_futures(df, actions, confidences, entry_params=strategy.calculate_entry_params,
+                                symbol=asset, initial_capital=self.initial_capital, warmup=warmup, costs=costs)
+
+    @staticmethod
+    async def signal_series(asset: str, strategy: IStrategy, df: pd.DataFrame, warmup: int = 50):
+        """Whole-history (actions, confidences), primed like the loop. Rows before the warmup are ignored by the simulators."""
+        # The loop's first analyze() call (anchors stateful strategies, e.g. the grid center)
+        await strategy.analyze({"symbol": asset, "timeframe": "15m", "dataframe": df.iloc[:warmup + 1]})
+        return strategy.analyze_series(df)
+
+    async def _run_vectorized(self, asset: str, strategy: IStrategy, df: pd.DataFrame, warmup: int = 50):
+        if len(df) <= warmup:
+            return None
+        actions, _ = await self.signal_series(asset, strategy, df, warmup)
+        return simulate_spot(df['close'], actions, timestamps=df['timestamp'].array,
+                             initial_capital=self.initial_capital, warmup=warmup)
+
+    async def _run_loop(self, asset: str, strategy: IStrategy, df: pd.DataFrame) -> Dict:
+        """Bar-by-bar reference: analyze() on the growing slice (O(n²))."""
+        # 2. Setup Simulation State
+        balance = self.initial_capital
+        position = None # {'entry': float, 'size': float}
+        trades_log = []
+        
+        # 3. Iterate (Skip warmup)
+        warmup = 50
+        for i in range(warmup, len(df)):
+            # Create window for strategy
+            msg_df = df.iloc[:i+1] # Strategy analyzes full df up to now
+            # In a real efficient backtester we'd optimize this slicing, but for 3000 rows it's fine.
+            
+            # Mock current candle
+            current_price = df.iloc[i]['close']
+            timestamp = df.iloc[i]['timestamp']
+            
+            # Analyze
+            # Since strategy.analyze expects specific format
+            market_data = {
+                "symbol": asset,
+                "timeframe": "15m",
+                "dataframe": msg_df
+            }
+            
+            signal = await strategy.analyze(market_data)
             
-            # 3. Iterate (Skip warmup)
-            warmup = 50
-            for i in range(warmup, len(df)):
-                # Create window for strategy
-                msg_df = df.iloc[:i+1] # Strategy analyzes full df up to now
-                # In a real efficient backtester we'd optimize this slicing, but for 3000 rows it's fine.
+            if not signal:
+                continue
                 
-                # Mock current candle
-                current_price = df.iloc[i]['close']
-                timestamp = df.iloc[i]['timestamp']
+            # Execution Logic (Simple Spot)
+            fee = 0.001 # 0.1% Binance Spot Fee
+            
+            # BUY CONDITION
+            if signal.action == "BUY" and position is None:
+                entry_price = current_price
+                size = (balance * 0.99) / entry_price # 99% usage to cover fees safe
+                cost = size * entry_price
+                balance -= cost
                 
-                # Analyze
-                # Since strategy.analyze expects specific format
-                market_data = {
-                    "symbol": asset,
-                    "timeframe": "15m",
-                    "dataframe": msg_df
+                position = {
+                    'entry': entry_price,
+                    'size': size,
+                    'time': timestamp
                 }
+                trades_log.append({
+                    'type': 'BUY',
+                    'price': entry_price,
+                    'time': timestamp,
+                    'balance': balance
+                })
                 
-                signal = await strategy.analyze(market_data)
+            # SELL CONDITION
+            elif (signal.action == "SELL" or signal.action == "EXIT") and position is not None:
+                exit_price = current_price
+                revenue = position['size'] * exit_price * (1 - fee)
                 
-                if not signal:
-                    continue
-                    
-                # Execution Logic (Simple Spot)
-                fee = 0.001 # 0.1% Binance Spot Fee
+                pnl = revenue - (position['size'] * position['entry'])
+                pnl_pct = (pnl / (position['size'] * position['entry'])) * 100
                 
-                # BUY CONDITION
-                if signal.action == "BUY" and position is None:
-                    entry_price = current_price
-                    size = (balance * 0.99) / entry_price # 99% usage to cover fees safe
-                    cost = size * entry_price
-                    balance -= cost
-                    
-                    position = {
-                        'entry': entry_price,
-                        'size': size,
-                        'time': timestamp
-                    }
-                    trades_log.append({
-                        'type': 'BUY',
-                        'price': entry_price,
-                        'time': timestamp,
-                        'balance': balance
-                    })
-                    
-                # SELL CONDITION
-                elif (signal.action == "SELL" or signal.action == "EXIT") and position is not None:
-                    exit_price = current_price
-                    revenue = position['size'] * exit_price * (1 - fee)
-                    
-                    pnl = revenue - (position['size'] * position['entry'])
-                    pnl_pct = (pnl / (position['size'] * position['entry'])) * 100
-                    
-                    balance += revenue
-                    position = None
-                    
-                    trades_log.append({
-                        'type': 'SELL',
-                        'price': exit_price,
-                        'time': timestamp,
-                        'balance': balance,
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct
-                    })
-
-            # Check open position at end
-            if position:
-                # Mark to market
-                current_val = position['size'] * df.iloc[-1]['close']
-                balance += current_val
-            
-            roi = ((balance - self.initial_capital) / self.initial_capital) * 100
-            
-            results[asset] = {
-                'final_balance': balance,
-                'roi': roi,
-                'trades': len(trades_log),
-                'history': trades_log
-            }
-            
-            print(f"🏁 Result: ${balance:,.2f} ({roi:+.2f}%) | Trades: {len(trades_log)}")
+                balance += revenue
+                position = None
+                
+                trades_log.append({
+                    'type': 'SELL',
+                    'price': exit_price,
+                    'time': timestamp,
+                    'balance': balance,
+                    'pnl': pnl,
+                    'pnl_pct': pnl_pct
+                })
 
-        await self.market_stream.close()
-        return results
+        # Check open position at end
+        if position:
+            # Mark to market
+            current_val = position['size'] * df.iloc[-1]['close']
+            balance += current_val
+        
+        roi = ((balance - self.initial_capital) / self.initial_capital) * 100
+        
+        return {
+            'final_balance': balance,
+            'roi': roi,
+            'trades': len(trades_log),
+            'history': trades_log
+        }
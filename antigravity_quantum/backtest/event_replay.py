@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from ..core.clock import SimulatedClock
+from ..core.engine import QuantumEngine
+from ..data.replay import ReplayMarketStream
+from ..data.timeframes import timeframe_to_ms
+
+class EventReplay:
+    """
+    Drives the real QuantumEngine (core_loop -> scan_cycle -> strategy.analyze ->
+    signal_callback) over recorded candles in virtual time: the engine's waits
+    advance a SimulatedClock instead of sleeping, so weeks of data replay as fast
+    as the CPU allows. Emitted signals are collected with their virtual time and,
+    optionally, forwarded to `dispatch` (a sync callback such as main.dispatch_quantum_signal,
+    called the way QuantumBridge does).
+
+    Difference from production: the replay only shows strategies CLOSED candles
+    (ReplayMarketStream), while the live MarketStream's window ends with the candle
+    still forming. Live scans run just after a close, so that last row is a few seconds
+    old, but a replay signal can still differ from the one production emitted.
+    The window is [start_ms, end_ms): no scan runs, and no signal is kept, at or after end_ms.
+    """
+    def __init__(self, assets: List[str], root: str = None, exchange_id: str = 'binance',
+                 dispatch: Callable[[Any], None] = None, warmup_candles: int = 100):
+        self.assets = assets
+        self.root = root
+        self.exchange_id = exchange_id
+        self.dispatch = dispatch
+        self.warmup_candles = warmup_candles # History needed before the first scan (MarketStream limit)
+        self.signals: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {}
+
+    async def run(self, start_ms: int = None, end_ms: int = None) -> pd.DataFrame:
+        """
+        Replays [start_ms, end_ms) (default: the whole recorded range after warm-up, until the
+        scan of the last candle). Returns the signals.
+        """
+        probe = ReplayMarketStream(self.root, self.exchange_id)
+        data_range = probe.data_range(self.assets)
+        if data_range is None:
+            print(f"❌ Replay: no recorded candles for {self.assets}")
+            return pd.DataFrame()
+        longest = max(timeframe_to_ms(probe.timeframe_for(a)) for a in self.assets)
+        if start_ms is None:
+            start_ms = data_range[0] + self.warmup_candles * longest
+        if end_ms is None:
+            end_ms = data_range[1] + 2 * longest # The last candle closes, then gets scanned
+
+        clock = SimulatedClock(start_ms / 1000)
+        market_stream = ReplayMarketStream(self.root, self.exchange_id, sim_clock=clock)
+        engine = QuantumEngine(assets=self.assets, market_stream=market_stream)
+        cycles = 0
+        original_scan_cycle = engine.scan_cycle
+
+        async def counted_scan_cycle(assets=None):
+            nonlocal cycles
+            if clock.now_ms >= end_ms:
+                engine.running = False # Window over: no more scans are scheduled
+                return {'failed': []}
+            cycles += 1
+            return await original_scan_cycle(assets)
+
+        async def on_signal(signal):
+            if clock.now_ms >= end_ms:
+                return # Scan still in flight when the window closed
+            self.signals.append({'time': pd.Timestamp(clock.now_ms, unit='ms'), 'symbol': signal.symbol,
+                                 'action': signal.action, 'confidence': signal.confidence,
+                                 'price': signal.price, 'metadata': signal.metadata})
+            if self.dispatch:
+                try:
+                    self.dispatch(signal)
+                except Exception as e:
+                    print(f"❌ Replay Dispatch Error: {e}")
+
+        engine.scan_cycle = counted_scan_cycle
+        engine.set_callback(on_signal)
+        self.signals = []
+
+        wall_start = time.perf_counter()
+        await market_stream.initialize()
+        engine.running = True
+        loop_task = asyncio.create_task(engine.core_loop())
+        # The loop yields at least once per iteration (virtual sleep), so the cursor is checked every step
+        while not loop_task.done() and clock.now_ms < end_ms:
+            await asyncio.sleep(0)
+        engine.running = False
+        await loop_task
+        await engine.stop()
+        wall = time.perf_counter() - wall_start
+
+        virtual = (min(clock.now_ms, end_ms) - start_ms) / 1000
+        self.stats = {
+            'start': pd.Timestamp(start_ms, unit='ms'),
+            'end': pd.Timestamp(end_ms, unit='ms'),
+            'cycles': cycles,
+            'signals': len(self.signals),
+            'wall_s': wall,
+            'virtual_s': virtual,
+            'speed': virtual / wall if wall > 0 else 0.0, # Virtual seconds per wall second
+            **engine.scheduler.stats()
+        }
+        return pd.DataFrame(self.signals)
+
+    def print_report(self):
+        s = self.stats
+        if not s:
+            return
+        print(f"\n📼 **EVENT REPLAY** {s['start']} -> {s['end']}")
+        print("〰️" * 30)
+        print(f"⏱️ {s['virtual_s'] / 86_400:.1f} days in {s['wall_s']:.1f}s (x{s['speed']:,.0f} real time)")
+        print(f"🔁 {s['cycles']} cycles | {s['scans']} scans | {s['skip_rate'] * 100:.0f}% skipped (candle still forming)")
+        print(f"💡 {s['signals']} signals")
+        for (symbol, action), count in sorted(Counter((x['symbol'], x['action']) for x in self.signals).items()):
+            print(f"   {symbol.replace('USDT', '')} {action}: {count}")
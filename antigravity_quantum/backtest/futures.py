@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..strategies.base import Signal
+from ..config import (FUTURES_MAKER_FEE, FUTURES_TAKER_FEE, FUTURES_SLIPPAGE,
+                      FUNDING_RATE, FUNDING_INTERVAL_HOURS, MAINTENANCE_MARGIN)
+
+@dataclass
+class FuturesCosts:
+    """
+    Execution costs of the futures simulator:
+    - market orders (entries, signal exits, stops, liquidations): taker fee + `slippage` against the order
+    - take-profits (resting limit orders): maker fee, no slippage
+    - funding: `funding_rate` on the position notional every `funding_interval_hours`
+      (UTC-aligned, paid by longs when positive). A per-bar rate array can be passed
+      to simulate_futures() instead (e.g. recorded funding history).
+    """
+    maker_fee: float = FUTURES_MAKER_FEE
+    taker_fee: float = FUTURES_TAKER_FEE
+    slippage: float = FUTURES_SLIPPAGE
+    funding_rate: float = FUNDING_RATE
+    funding_interval_hours: int = FUNDING_INTERVAL_HOURS
+    maintenance_margin: float = MAINTENANCE_MARGIN
+
+
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """For each bar, the first bar >= it where mask is True (len(mask) if none)."""
+    n = len(mask)
+    return np.minimum.accumulate(np.where(mask, np.arange(n), n)[::-1])[::-1]
+
+def _first_exit(hit: Callable[[int, int], np.ndarray], start: int, end: int) -> int:
+    """First bar in [start, end) where hit(lo, hi) (bool array over bars lo..hi-1) is True, else -1.
+    Scans doubling windows, so the cost follows the trade length, not the history length."""
+    window = 64
+    lo = start
+    while lo < end:
+        hi = min(end, lo + window)
+        found = hit(lo, hi)
+        if found.any():
+            return lo + int(np.argmax(found))
+        lo, window = hi, window * 2
+    return -1
+
+
+def simulate_futures(df: pd.DataFrame, actions: np.ndarray, confidences: np.ndarray = None,
+                     entry_params: Callable[[Signal, float], Dict[str, Any]] = None, symbol: str = "",
+                     initial_capital: float = 1000.0, warmup: int = 50, costs: FuturesCosts = None,
+                     funding_rates: np.ndarray = None) -> Dict[str, Any]:
+    """
+    Long/short futures simulation of IStrategy actions over df (OHLCV + timestamp):
+    - Flat: BUY opens a long, SELL opens a short (filled at the close)
+    - In a position: the opposite signal closes and reverses it, EXIT closes it
+    - Leverage, margin (size_pct of equity) and SL/TP come from entry_params(signal, equity),
+      i.e. the strategy's calculate_entry_params() (a SL/TP on the wrong side of the entry is
+      ignored); isolated-margin liquidation price from the leverage and maintenance margin
+    - Stops, take-profits and liquidations are resolved intrabar from high/low with NumPy
+      (gaps fill at the open; stop and target in the same bar -> the stop, conservatively)
+    Python only iterates over trades; bar scans are array operations.
+    Returns final_balance, roi, trades, history, equity (per bar) and cost/exit stats.
+    """
+    costs = costs or FuturesCosts()
+    n = len(df)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    times = df['timestamp'].array
+    atr = df['atr'].to_numpy(dtype=np.float64) if 'atr' in df.columns else None
+    actions = np.asarray(actions).copy()
+    actions[:warmup] = "HOLD"
+    confidences = np.zeros(n) if confidences is None else np.asarray(confidences, dtype=np.float64)
+    if entry_params is None:
+        entry_params = lambda signal, equity: {"leverage": 1, "size_pct": 1.0}
+
+    # Funding: cumulative rate x price at each funding instant (bar opening on the schedule)
+    open_ms = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    is_funding = open_ms % (costs.funding_interval_hours * 3_600_000) == 0
+    rates = np.broadcast_to(costs.funding_rate if funding_rates is None else funding_rates, (n,))
+    funding_cum = np.cumsum(np.where(is_funding, rates * open_, 0.0))
+
+    is_buy, is_sell, is_exit = actions == "BUY", actions == "SELL", actions == "EXIT"
+    next_entry = _next_index(is_buy | is_sell)
+    next_close = {1: _next_index(is_sell | is_exit), -1: _next_index(is_buy | is_exit)}
+
+    equity_curve = np.full(n, float(initial_capital))
+    history: List[Dict[str, Any]] = []
+    stats = {'stop_loss': 0, 'take_profit': 0, 'liquidation': 0, 'signal': 0, 'fees': 0.0, 'funding': 0.0}
+    balance = float(initial_capital)
+    i = int(next_entry[0]) if n else 0
+
+    while i < n and balance > 0:
+        side = 1 if is_buy[i] else -1
+        action = "BUY" if side == 1 else "SELL"
+        metadata = {'atr': float(atr[i])} if atr is not None else {}
+        params = entry_params(Signal(symbol, action, float(confidences[i]), float(close[i]), metadata), balance)
+        leverage = params.get('leverage', 1)
+        margin = balance * params.get('size_pct', 1.0)
+        entry = close[i] * (1 + side * costs.slippage)
+        qty = margin * leverage / entry
+        fee_in = margin * leverage * costs.taker_fee
+
+        liq = entry * (1 - side * (1 / leverage - costs.maintenance_margin))
+        sl = params.get('stop_loss_price')
+        tp = params.get('take_profit_price')
+        # A stop or target on the wrong side of the entry would fill on the next bar: ignored
+        if sl is not None and side * (entry - sl) <= 0:
+            sl = None
+        if tp is not None and side * (tp - entry) <= 0:
+            tp = None
+        liquidates = sl is None or (side * (sl - liq) <= 0) # Liquidation reached before the stop
+        stop = liq if liquidates else sl
+
+        # Exit: first of stop/target (intrabar, from the next bar) or the closing signal
+        j_signal = int(next_close[side][i + 1]) if i + 1 < n else n
+        end = min(j_signal + 1, n)
+        if side == 1:
+            hit = lambda lo, hi: (low[lo:hi] <= stop) | ((high[lo:hi] >= tp) if tp is not None else False)
+        else:
+            hit = lambda lo, hi: (high[lo:hi] >= stop) | ((low[lo:hi] <= tp) if tp is not None else False)
+        j = _first_exit(hit, i + 1, end)
+
+        if j >= 0:
+            stopped = (low[j] <= stop) if side == 1 else (high[j] >= stop)
+            if stopped:
+                # Gap through the stop: filled at the open
+                level = min(stop, open_[j]) if side == 1 else max(stop, open_[j])
+                reason = 'liquidation' if liquidates else 'stop_loss'
+                exit_price = level * (1 - side * costs.slippage)
+                fee_out = qty * exit_price * costs.taker_fee
+            else:
+                exit_price = max(tp, open_[j]) if side == 1 else min(tp, open_[j])
+                reason = 'take_profit'
+                fee_out = qty * exit_price * costs.maker_fee
+        elif j_signal < n:
+            j = j_signal
+            reason = 'signal'
+            exit_price = close[j] * (1 - side * costs.slippage)
+            fee_out = qty * exit_price * costs.taker_fee
+        else:
+            j, reason = n - 1, 'open' # Marked to market at the last close, exit fee not paid
+            exit_price, fee_out = close[j], 0.0
+
+        funding = side * qty * (funding_cum[j] - funding_cum[i])
+        pnl = side * qty * (exit_price - entry) - fee_in - fee_out - funding
+        # Isolated margin: never more than the whole margin is lost (liquidation, or a stop
+        # filled at a gap open beyond the liquidation price)
+        if reason == 'liquidation' or (reason == 'stop_loss' and pnl < -margin - fee_in):
+            pnl = -margin - fee_in
+
+        # Equity while open: unrealized PnL at each close, entry fee and funding to date
+        bars = slice(i, j)
+        equity_curve[bars] = balance + side * qty * (close[bars] - entry) - fee_in \
+            - side * qty * (funding_cum[bars] - funding_cum[i])
+        balance += pnl
+        equity_curve[j:] = balance
+
+        stats['fees'] += fee_in + fee_out
+        stats['funding'] += funding
+        stats[reason] = stats.get(reason, 0) + 1
+        history.append({'type': 'OPEN_LONG' if side == 1 else 'OPEN_SHORT', 'price': entry, 'time': times[i],
+                        'leverage': leverage, 'margin': margin, 'stop_loss': sl, 'take_profit': tp, 'liquidation': liq})
+        if reason != 'open':
+            history.append({'type': 'CLOSE', 'reason': reason, 'price': exit_price, 'time': times[j],
+                            'balance': balance, 'pnl': pnl, 'pnl_pct': (pnl / margin) * 100})
+
+        # Next entry: a reversal enters on the closing bar; after a stop/target the
+        # bar's own signal (at its close) may enter; after EXIT, the next signal
+        if reason == 'open':
+            break
+        if reason != 'signal':
+            i = int(next_entry[j])
+        elif not is_exit[j]:
+            i = j
+        else:
+            i = int(next_entry[j + 1]) if j + 1 < n else n
+
+    return {
+        'final_balance': float(balance),
+        'roi': ((balance - initial_capital) / initial_capital) * 100,
+        'trades': len(history),
+        'history': history,
+        'equity': equity_curve,
+        **stats
+    }
@@ -0,0 +1,24 @@
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from strategies.engine import StrategyEngine
+from .vectorized import simulate_bidirectional
+
+def backtest_squeeze_velocity(df: pd.DataFrame, initial_capital: float = 1000.0, mtf: bool = True,
+                              fee: float = 0.0005) -> Dict[str, Any]:
+    """
+    Backtest of the legacy StrategyEngine ("Squeeze & Velocity") signals that
+    process_asset/run_trading_loop send: whole-history signal columns
+    (StrategyEngine.analyze_series, 1H EMA-200 filter included) fed to the
+    long/short simulator. df: OHLCV candles (timestamp column), usually 15m.
+    """
+    signals = StrategyEngine(df, zero_copy=True).analyze_series(mtf=mtf)
+    # The trading loop alerts a spot signal and moves on: no futures action on those candles
+    futures = np.where(signals['signal_spot'].to_numpy(), 'WAIT', signals['signal_futures'].to_numpy())
+    result = simulate_bidirectional(df['close'], futures, timestamps=df['timestamp'].array,
+                                    initial_capital=initial_capital, fee=fee)
+    result['spot_signals'] = int(signals['signal_spot'].sum())
+    result['signals'] = signals
+    return result
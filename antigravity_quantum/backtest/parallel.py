@@ -0,0 +1,111 @@
+import asyncio
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from ..strategies.base import IStrategy
+from ..data.stream import MarketStream, HISTORICAL_INDICATORS
+from .engine import BacktestEngine
+
+# Histories shipped once per worker process (pool initializer), not once per job
+_worker_histories: Dict[str, pd.DataFrame] = {}
+
+def _init_worker(histories: Dict[str, pd.DataFrame]):
+    global _worker_histories
+    _worker_histories = histories
+
+def _run_job(strategy_name: str, strategy: IStrategy, asset: str, initial_capital: float, vectorized: bool):
+    """One (strategy, asset) cell, on its own copy of the strategy (also when run in-process)."""
+    engine = BacktestEngine([asset], initial_capital=initial_capital)
+    strategy = copy.deepcopy(strategy) # Stateful strategies (grid) anchor per asset
+    result = asyncio.run(engine.backtest_asset(asset, strategy, _worker_histories[asset], vectorized=vectorized))
+    result.pop('equity', None) # Not needed for the table; avoids pickling it back
+    return strategy_name, asset, result
+
+
+async def load_histories(assets: List[str], days: int = 30, market_stream: MarketStream = None,
+                         indicators=HISTORICAL_INDICATORS) -> Dict[str, pd.DataFrame]:
+    """
+    Downloads each asset's history ONCE (indicator superset for every strategy).
+    Assets without data are left out.
+    """
+    own_stream = market_stream is None
+    market_stream = market_stream or MarketStream()
+    try:
+        await market_stream.initialize()
+        frames = await asyncio.gather(*(market_stream.get_historical_candles(a, days=days, indicators=indicators) for a in assets))
+    finally:
+        if own_stream:
+            await market_stream.close()
+
+    histories = {}
+    for asset, df in zip(assets, frames):
+        if df.empty:
+            print(f"❌ No data for {asset}")
+        else:
+            histories[asset] = df
+    return histories
+
+
+class ParallelBacktestRunner:
+    """
+    Runs a strategy x asset matrix of backtests on a process pool (one worker per CPU core).
+    Histories are loaded once and shared by every strategy; each cell gets a fresh copy of
+    its strategy (stateful strategies such as the grid are anchored per asset).
+    """
+    def __init__(self, strategies: Dict[str, IStrategy], initial_capital: float = 1000.0,
+                 workers: int = None, vectorized: bool = None):
+        self.strategies = strategies
+        self.initial_capital = initial_capital
+        self.workers = workers or os.cpu_count() or 1
+        self.vectorized = vectorized
+        self.elapsed = 0.0
+
+    def run(self, histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, dict]]:
+        """Returns {strategy_name: {asset: result}} (results as BacktestEngine.backtest_asset)."""
+        jobs = [(name, strategy, asset) for name, strategy in self.strategies.items() for asset in histories]
+        results = {name: {} for name in self.strategies}
+
+        start = time.perf_counter()
+        if self.workers <= 1:
+            _init_worker(histories)
+            cells = [_run_job(name, strategy, asset, self.initial_capital, self.vectorized) for name, strategy, asset in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(histories,)) as pool:
+                futures = [pool.submit(_run_job, name, strategy, asset, self.initial_capital, self.vectorized)
+                           for name, strategy, asset in jobs]
+                cells = [f.result() for f in futures]
+        self.elapsed = time.perf_counter() - start
+
+        for name, asset, result in cells:
+            results[name][asset] = result
+        return results
+
+    def summary(self, results: Dict[str, Dict[str, dict]]) -> List[Tuple[str, float, float, int]]:
+        """Comparative table rows: (strategy, total ROI %, total PnL, trades), best ROI first."""
+        rows = []
+        for name, per_asset in results.items():
+            start_capital = len(per_asset) * self.initial_capital
+            balance = sum(r['final_balance'] for r in per_asset.values())
+            roi = ((balance - start_capital) / start_capital) * 100 if start_capital else 0.0
+            rows.append((name, roi, balance - start_capital, sum(r['trades'] for r in per_asset.values())))
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def print_report(self, results: Dict[str, Dict[str, dict]]):
+        for name, per_asset in results.items():
+            print(f"\n📊 **RESULTS FOR {name.upper()}**")
+            for asset, data in per_asset.items():
+                icon = "🟢" if data['roi'] > 0 else "🔴"
+                print(f"   {icon} {asset.replace('USDT', '')}: ${data['final_balance']:,.0f} ({data['roi']:+.1f}%) | {data['trades']} Trades")
+
+        print("\n\n🏁 **COMPARATIVE SUMMARY**")
+        print("〰️" * 30)
+        for rank, (name, roi, pnl, trades) in enumerate(self.summary(results), 1):
+            print(f"{rank}. {name:<26} ROI {roi:+7.2f}% | PnL ${pnl:>9,.2f} | {trades} Trades")
+        print("〰️" * 30)
+        cells = sum(len(per_asset) for per_asset in results.values())
+        print(f"⏱️ {cells} backtests in {self.elapsed:.2f}s on {self.workers} worker(s)")
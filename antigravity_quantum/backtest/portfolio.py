@@ -0,0 +1,220 @@
+import asyncio
+import copy
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..strategies.base import IStrategy, Signal
+from ..strategies.factory import StrategyFactory
+from ..risk.manager import RiskManager
+from ..data.stream import MarketStream
+from ..config import MAX_CONCURRENT_SCANS
+from .engine import BacktestEngine
+from .sweep import max_drawdown_pct
+
+ACTION_CODES = {"BUY": 1, "SELL": -1, "EXIT": -1}
+
+@dataclass
+class AssetTape:
+    """
+    Compact per-asset event stream: candle CLOSE times (ms), closes and action codes
+    (1 BUY, -1 SELL/EXIT, 0 otherwise). A year of 5m candles is ~1 MB; the
+    DataFrame it came from is released once the tape is built.
+    """
+    symbol: str
+    time_ms: np.ndarray
+    close: np.ndarray
+    action: np.ndarray
+    confidence: np.ndarray
+
+    def price_at(self, t_ms) -> np.ndarray:
+        """Last close at or before t_ms (forward fill). Before the first close: the first close."""
+        i = np.searchsorted(self.time_ms, t_ms, side='right') - 1
+        return self.close[np.clip(i, 0, None)]
+
+
+def build_tape(symbol: str, df: pd.DataFrame, actions: np.ndarray, confidences: np.ndarray, warmup: int = 50) -> AssetTape:
+    open_ms = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    bar_ms = int(np.median(np.diff(open_ms))) if len(open_ms) > 1 else 0
+    codes = np.zeros(len(df), dtype=np.int8)
+    for action, code in ACTION_CODES.items():
+        codes[np.asarray(actions) == action] = code
+    codes[:warmup] = 0
+    return AssetTape(symbol, open_ms + bar_ms, df['close'].to_numpy(dtype=np.float64),
+                     codes, np.asarray(confidences, dtype=np.float64))
+
+
+class PortfolioBacktest:
+    """
+    One shared account over many assets (BacktestEngine runs each asset alone).
+    The per-asset signal streams are merged by candle close time into one event
+    sequence; every entry goes through RiskManager.check_trade_approval with the
+    live portfolio exposure, so concurrent positions compete for the same cash
+    and the max_exposure gate.
+    Only signal events are walked in Python; equity/exposure curves are then
+    rebuilt with NumPy on the merged timeline.
+    Fills follow the spot simulator: BUY at the close (position_size of equity,
+    capped by cash), SELL/EXIT at the close paying `fee`.
+    """
+    def __init__(self, assets: List[str], initial_capital: float = 10000.0, position_size: float = 0.1,
+                 fee: float = 0.001, days: int = 365, risk_manager: RiskManager = None,
+                 strategy_override: IStrategy = None, market_stream: MarketStream = None, warmup: int = 50):
+        self.assets = assets
+        self.initial_capital = initial_capital
+        self.position_size = position_size
+        self.fee = fee
+        self.days = days
+        self.risk_manager = risk_manager or RiskManager()
+        self.strategy_override = strategy_override
+        self.market_stream = market_stream
+        self.warmup = warmup
+
+    def _strategy_for(self, asset: str) -> IStrategy:
+        # Fresh instance per asset: stateful strategies (grid) anchor per asset
+        if self.strategy_override is not None:
+            return copy.deepcopy(self.strategy_override)
+        return StrategyFactory.get_strategy(asset.replace('USDT', ''), volatility_index=0.5)
+
+    async def tape_from_frame(self, asset: str, df: pd.DataFrame) -> AssetTape:
+        strategy = self._strategy_for(asset)
+        actions, confidences = await BacktestEngine.signal_series(asset, strategy, df, self.warmup)
+        return build_tape(asset, df, actions, confidences, self.warmup)
+
+    async def load_tapes(self) -> List[AssetTape]:
+        """Fetches each asset's history (bounded concurrency) and keeps only its tape."""
+        own_stream = self.market_stream is None
+        market_stream = self.market_stream or MarketStream()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+
+        async def load(asset):
+            async with semaphore:
+                indicators = self._strategy_for(asset).required_indicators
+                df = await market_stream.get_historical_candles(asset, days=self.days, indicators=indicators)
+                if len(df) <= self.warmup:
+                    print(f"❌ No data for {asset}")
+                    return None
+                return await self.tape_from_frame(asset, df)
+
+        try:
+            await market_stream.initialize()
+            tapes = await asyncio.gather(*(load(a) for a in self.assets))
+        finally:
+            if own_stream:
+                await market_stream.close()
+        return [t for t in tapes if t is not None]
+
+    async def run(self, tapes: List[AssetTape] = None) -> Dict[str, Any]:
+        if tapes is None:
+            tapes = await self.load_tapes()
+        start = time.perf_counter()
+        if not tapes:
+            return {}
+
+        # 1. k-way merge of the signal events (close time, then asset order)
+        ev_time, ev_asset, ev_bar = [], [], []
+        for k, tape in enumerate(tapes):
+            bars = np.flatnonzero(tape.action)
+            ev_time.append(tape.time_ms[bars])
+            ev_asset.append(np.full(len(bars), k, dtype=np.int32))
+            ev_bar.append(bars)
+        ev_time, ev_asset, ev_bar = np.concatenate(ev_time), np.concatenate(ev_asset), np.concatenate(ev_bar)
+        order = np.lexsort((ev_asset, ev_time))
+
+        # 2. Shared account over the event sequence
+        cash = self.initial_capital
+        positions: Dict[int, Dict[str, float]] = {} # asset index -> size, entry, cost, time
+        cash_times, cash_values = [], []
+        closed = [] # (asset index, size, entry time, exit time)
+        history: List[Dict[str, Any]] = []
+        rejected = 0
+        max_concurrent = 0
+
+        for t, k, bar in zip(ev_time[order].tolist(), ev_asset[order].tolist(), ev_bar[order].tolist()):
+            tape = tapes[k]
+            price = tape.close[bar]
+            code = tape.action[bar]
+
+            if code == 1 and k not in positions:
+                held = sum(p['size'] * tapes[j].price_at(t) for j, p in positions.items())
+                equity = cash + held
+                exposure = held / equity if equity > 0 else 1.0
+                signal = Signal(tape.symbol, "BUY", float(tape.confidence[bar]), price, {})
+                if not await self.risk_manager.check_trade_approval(signal, exposure):
+                    rejected += 1
+                    continue
+                cost = min(equity * self.position_size, cash)
+                if cost <= 0:
+                    rejected += 1
+                    continue
+                cash -= cost
+                positions[k] = {'size': cost / price, 'entry': price, 'cost': cost, 'time': t}
+                max_concurrent = max(max_concurrent, len(positions))
+                history.append({'type': 'BUY', 'symbol': tape.symbol, 'price': price, 'time': t, 'cash': cash})
+
+            elif code == -1 and k in positions:
+                pos = positions.pop(k)
+                revenue = pos['size'] * price * (1 - self.fee)
+                pnl = revenue - pos['cost']
+                cash += revenue
+                closed.append((k, pos['size'], pos['time'], t))
+                history.append({'type': 'SELL', 'symbol': tape.symbol, 'price': price, 'time': t, 'cash': cash,
+                                'pnl': pnl, 'pnl_pct': (pnl / pos['cost']) * 100})
+            else:
+                continue
+            cash_times.append(t)
+            cash_values.append(cash)
+
+        # 3. Curves on the merged timeline (every close of every asset)
+        timeline = np.unique(np.concatenate([tape.time_ms for tape in tapes]))
+        cash_idx = np.searchsorted(np.asarray(cash_times, dtype=np.int64), timeline, side='right') - 1
+        cash_curve = np.asarray(cash_values + [self.initial_capital])[cash_idx] # -1 (before any fill) -> initial capital
+        held_curve = np.zeros(len(timeline))
+        still_open = [(k, p['size'], p['time'], None) for k, p in positions.items()]
+        for k, size, entry_t, exit_t in closed + still_open:
+            i0 = np.searchsorted(timeline, entry_t, side='left')
+            i1 = np.searchsorted(timeline, exit_t, side='left') if exit_t is not None else len(timeline)
+            held_curve[i0:i1] += size * tapes[k].price_at(timeline[i0:i1])
+        equity_curve = cash_curve + held_curve
+        exposure_curve = np.divide(held_curve, equity_curve, out=np.zeros_like(held_curve), where=equity_curve > 0)
+
+        final_equity = float(equity_curve[-1])
+        return {
+            'final_equity': final_equity,
+            'roi': ((final_equity - self.initial_capital) / self.initial_capital) * 100,
+            'trades': len(history),
+            'rejected': rejected,
+            'open_positions': len(positions),
+            'max_concurrent': max_concurrent,
+            'max_drawdown_pct': max_drawdown_pct(equity_curve),
+            'max_exposure': float(exposure_curve.max()),
+            'avg_exposure': float(exposure_curve.mean()),
+            'history': history,
+            'timeline': timeline,
+            'equity': equity_curve,
+            'exposure': exposure_curve,
+            'assets': len(tapes),
+            'events': len(order),
+            'elapsed_s': time.perf_counter() - start
+        }
+
+    @staticmethod
+    def curves(result: Dict[str, Any]) -> pd.DataFrame:
+        """Equity and exposure over time as a DataFrame (timestamp index)."""
+        return pd.DataFrame({'equity': result['equity'], 'exposure': result['exposure']},
+                            index=pd.to_datetime(result['timeline'], unit='ms'))
+
+    def print_report(self, result: Dict[str, Any]):
+        if not result:
+            print("❌ Portfolio backtest: no data")
+            return
+        icon = "🟢" if result['roi'] > 0 else "🔴"
+        print(f"\n📊 **PORTFOLIO RESULTS** ({result['assets']} assets, shared ${self.initial_capital:,.0f})")
+        print("〰️" * 30)
+        print(f"{icon} Equity: ${result['final_equity']:,.2f} ({result['roi']:+.2f}%) | Max DD {result['max_drawdown_pct']:.1f}%")
+        print(f"🔁 {result['trades']} Trades | {result['rejected']} rejected by risk | {result['open_positions']} still open")
+        print(f"⚖️ Exposure: max {result['max_exposure'] * 100:.0f}% | avg {result['avg_exposure'] * 100:.0f}% "
+              f"(limit {self.risk_manager.max_exposure * 100:.0f}%) | {result['max_concurrent']} concurrent positions max")
+        print(f"⏱️ {result['events']} signal events simulated in {result['elapsed_s']:.2f}s")
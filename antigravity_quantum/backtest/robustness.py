@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from ..strategies.base import IStrategy
+from .engine import BacktestEngine
+from .sweep import ParameterSweep, _evaluate, max_drawdown_pct
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def trade_returns(result: Dict[str, Any]) -> np.ndarray:
+    """Per-trade return on the balance before the trade (closed trades of a backtest result's history)."""
+    closed = [row for row in result.get('history', []) if 'pnl' in row]
+    pnl = np.array([row['pnl'] for row in closed], dtype=np.float64)
+    before = np.array([row['balance'] for row in closed], dtype=np.float64) - pnl
+    return np.divide(pnl, before, out=np.zeros_like(pnl), where=before > 0)
+
+def monte_carlo(returns: Sequence[float], n_sims: int = 5000, method: str = 'bootstrap',
+                initial_capital: float = 1000.0, seed: int = None, chunk: int = 1000) -> Dict[str, np.ndarray]:
+    """
+    Resamples a trade sequence n_sims times (NumPy, `chunk` paths per block):
+    - bootstrap: draws with replacement -> ROI and drawdown distributions
+    - shuffle: permutations of the same trades -> same ROI, drawdown distribution only
+    Returns {'roi': %, 'max_drawdown_pct': %} arrays of length n_sims.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    m = len(returns)
+    if m == 0:
+        return {'roi': np.zeros(n_sims), 'max_drawdown_pct': np.zeros(n_sims)}
+
+    roi, drawdown = [], []
+    for start in range(0, n_sims, chunk):
+        size = min(chunk, n_sims - start)
+        if method == 'shuffle':
+            idx = np.argsort(rng.random((size, m)), axis=1)
+        else:
+            idx = rng.integers(0, m, (size, m))
+        equity = initial_capital * np.cumprod(1 + returns[idx], axis=1)
+        equity = np.concatenate([np.full((size, 1), initial_capital), equity], axis=1)
+        peaks = np.maximum.accumulate(equity, axis=1)
+        roi.append((equity[:, -1] / initial_capital - 1) * 100)
+        drawdown.append(np.max((peaks - equity) / peaks, axis=1) * 100)
+    return {'roi': np.concatenate(roi), 'max_drawdown_pct': np.concatenate(drawdown)}
+
+def percentiles(samples: Dict[str, np.ndarray], qs: Sequence[int] = PERCENTILES) -> pd.DataFrame:
+    """Percentile table: one row per metric, one column per percentile."""
+    return pd.DataFrame({name: np.percentile(values, qs) for name, values in samples.items()},
+                        index=[f"p{q}" for q in qs]).T
+
+def print_distribution(title: str, samples: Dict[str, np.ndarray]):
+    print(f"\n🎲 **MONTE CARLO: {title}** ({len(next(iter(samples.values())))} paths)")
+    print("〰️" * 30)
+    print(percentiles(samples).to_string(float_format=lambda v: f"{v:+.2f}"))
+
+
+# Full histories shipped once per worker; folds are sliced inside the worker
+_wf_histories: Dict[str, pd.DataFrame] = {}
+
+def _init_worker(histories: Dict[str, pd.DataFrame]):
+    global _wf_histories
+    _wf_histories = histories
+
+def _slice(start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+    out = {}
+    for asset, df in _wf_histories.items():
+        ts = df['timestamp']
+        part = df[(ts >= start) & (ts < end)]
+        if len(part):
+            out[asset] = part.reset_index(drop=True)
+    return out
+
+def _run_fold(fold: int, strategy_cls: Type[IStrategy], combos: List[Dict[str, Any]],
+              bounds: Tuple[pd.Timestamp, pd.Timestamp, pd.Timestamp, pd.Timestamp], initial_capital: float) -> Dict[str, Any]:
+    """Optimizes on the train window (best ROI), then runs the winner on the unseen test window."""
+    train_start, train_end, test_start, test_end = bounds
+    train, test = _slice(train_start, train_end), _slice(test_start, test_end)
+
+    async def run():
+        scores = [await _evaluate(strategy_cls, params, initial_capital, train) for params in combos]
+        best = max(scores, key=lambda row: (row['roi'], -row['max_drawdown_pct']))
+        params = {name: best[name] for name in combos[0]}
+
+        engine = BacktestEngine([], initial_capital=initial_capital)
+        balance, drawdown, returns = 0.0, 0.0, []
+        for asset, df in test.items():
+            result = await engine.backtest_asset(asset, strategy_cls(**params), df, vectorized=True)
+            balance += result['final_balance']
+            drawdown = max(drawdown, max_drawdown_pct(result.get('equity')))
+            returns.append(trade_returns(result))
+        start_capital = initial_capital * len(test)
+        return {
+            'fold': fold,
+            'train': f"{train_start:%Y-%m-%d} → {train_end:%Y-%m-%d}",
+            'test': f"{test_start:%Y-%m-%d} → {test_end:%Y-%m-%d}",
+            **params,
+            'train_roi': best['roi'],
+            'test_roi': ((balance - start_capital) / start_capital) * 100 if start_capital else 0.0,
+            'test_max_drawdown_pct': drawdown,
+            'test_round_trips': sum(len(r) for r in returns),
+            'returns': np.concatenate(returns) if returns else np.zeros(0)
+        }
+    return asyncio.run(run())
+
+
+class WalkForward:
+    """
+    Walk-forward analysis: the common time span of the histories is cut into
+    folds + 1 windows; fold k optimizes param_grid on window k (or windows 0..k
+    when anchored) and is scored on window k + 1, which it never saw.
+    Folds run in parallel on a process pool. Without param_grid each fold just
+    runs the default parameters (out-of-sample stability only).
+    The out-of-sample trades of every fold feed monte_carlo().
+    """
+    def __init__(self, strategy_cls: Type[IStrategy], param_grid: Dict[str, Sequence] = None, folds: int = 4,
+                 anchored: bool = False, initial_capital: float = 1000.0, workers: int = None):
+        self.strategy_cls = strategy_cls
+        self.param_grid = param_grid or {}
+        self.folds = folds
+        self.anchored = anchored
+        self.initial_capital = initial_capital
+        self.workers = workers or os.cpu_count() or 1
+        self.returns = np.zeros(0) # Out-of-sample trade returns of the last run
+        self.elapsed = 0.0
+
+    def windows(self, histories: Dict[str, pd.DataFrame]) -> List[Tuple[pd.Timestamp, ...]]:
+        """(train_start, train_end, test_start, test_end) per fold."""
+        start = min(df['timestamp'].iloc[0] for df in histories.values())
+        end = max(df['timestamp'].iloc[-1] for df in histories.values()) + pd.Timedelta(microseconds=1)
+        edges = pd.date_range(start, end, periods=self.folds + 2)
+        return [(edges[0] if self.anchored else edges[k], edges[k + 1], edges[k + 1], edges[k + 2])
+                for k in range(self.folds)]
+
+    def run(self, histories: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        combos = ParameterSweep(self.strategy_cls, self.param_grid).combinations()
+        windows = self.windows(histories)
+        start = time.perf_counter()
+        if self.workers <= 1:
+            _init_worker(histories)
+            rows = [_run_fold(k, self.strategy_cls, combos, bounds, self.initial_capital) for k, bounds in enumerate(windows)]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(windows)), initializer=_init_worker,
+                                     initargs=(histories,)) as pool:
+                futures = [pool.submit(_run_fold, k, self.strategy_cls, combos, bounds, self.initial_capital)
+                           for k, bounds in enumerate(windows)]
+                rows = [f.result() for f in futures]
+        self.elapsed = time.perf_counter() - start
+
+        self.returns = np.concatenate([row.pop('returns') for row in rows])
+        return pd.DataFrame(rows)
+
+    def print_report(self, table: pd.DataFrame):
+        print(f"\n🧭 **WALK-FORWARD: {self.strategy_cls.__name__}** ({self.folds} folds{', anchored' if self.anchored else ''}, "
+              f"{self.elapsed:.1f}s on {self.workers} worker(s))")
+        print("〰️" * 30)
+        print(table.to_string(index=False, float_format=lambda v: f"{v:,.4g}"))
+        if len(table):
+            positive = (table['test_roi'] > 0).mean() * 100
+            print(f"📈 Out-of-sample: mean ROI {table['test_roi'].mean():+.2f}% | {positive:.0f}% of folds positive | "
+                  f"train→test decay {table['train_roi'].mean() - table['test_roi'].mean():+.2f} pts")
@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Type
+
+import numpy as np
+import pandas as pd
+
+from ..strategies.base import IStrategy
+from .engine import BacktestEngine
+
+# Histories with the parameter-independent indicator columns, shipped once per worker
+_sweep_histories: Dict[str, pd.DataFrame] = {}
+
+def _init_worker(histories: Dict[str, pd.DataFrame]):
+    global _sweep_histories
+    _sweep_histories = histories
+
+def max_drawdown_pct(equity: np.ndarray) -> float:
+    """Largest peak-to-trough drop of an equity curve, in %."""
+    if equity is None or len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max((peaks - equity) / peaks) * 100)
+
+async def _evaluate(strategy_cls: Type[IStrategy], params: Dict[str, Any], initial_capital: float,
+                    histories: Dict[str, pd.DataFrame] = None) -> Dict[str, Any]:
+    histories = _sweep_histories if histories is None else histories
+    engine = BacktestEngine([], initial_capital=initial_capital)
+    balance, trades, drawdown = 0.0, 0, 0.0
+    for asset, df in histories.items():
+        # Fresh strategy per asset (stateful strategies anchor per asset)
+        result = await engine.backtest_asset(asset, strategy_cls(**params), df, vectorized=True)
+        balance += result['final_balance']
+        trades += result['trades']
+        drawdown = max(drawdown, max_drawdown_pct(result.get('equity')))
+
+    start_capital = initial_capital * len(histories)
+    return {
+        **params,
+        'roi': ((balance - start_capital) / start_capital) * 100 if start_capital else 0.0,
+        'pnl': balance - start_capital,
+        'max_drawdown_pct': drawdown,
+        'trades': trades
+    }
+
+def _evaluate_chunk(strategy_cls: Type[IStrategy], combos: List[Dict[str, Any]], initial_capital: float) -> List[Dict[str, Any]]:
+    async def run_chunk():
+        return [await _evaluate(strategy_cls, params, initial_capital) for params in combos]
+    return asyncio.run(run_chunk())
+
+
+class ParameterSweep:
+    """
+    Grid search over strategy constructor parameters, e.g.
+        ParameterSweep(ScalpingStrategy, {'rsi_long': range(50, 61), 'adx_min': [15, 20, 25]})
+    Indicator columns are computed once per asset (they don't depend on the parameters;
+    parameter-dependent bands are derived from them by the strategy). Each combination
+    is one analyze_series() pass + simulate_spot() per asset, on a process pool.
+    Result: a table ranked by ROI, then drawdown (lower first), then trade count.
+    """
+    def __init__(self, strategy_cls: Type[IStrategy], param_grid: Dict[str, Sequence],
+                 initial_capital: float = 1000.0, workers: int = None, chunks_per_worker: int = 4):
+        self.strategy_cls = strategy_cls
+        self.param_grid = {name: list(values) for name, values in param_grid.items()}
+        self.initial_capital = initial_capital
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self.elapsed = 0.0
+
+    def combinations(self) -> List[Dict[str, Any]]:
+        names = list(self.param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*self.param_grid.values())]
+
+    def run(self, histories: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        combos = self.combinations()
+        start = time.perf_counter()
+        if self.workers <= 1:
+            _init_worker(histories)
+            rows = _evaluate_chunk(self.strategy_cls, combos, self.initial_capital)
+        else:
+            n_chunks = min(len(combos), self.workers * self.chunks_per_worker)
+            chunks = [list(chunk) for chunk in np.array_split(np.array(combos, dtype=object), n_chunks)]
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(histories,)) as pool:
+                futures = [pool.submit(_evaluate_chunk, self.strategy_cls, chunk, self.initial_capital) for chunk in chunks]
+                rows = [row for f in futures for row in f.result()]
+        self.elapsed = time.perf_counter() - start
+
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        return table.sort_values(['roi', 'max_drawdown_pct', 'trades'], ascending=[False, True, False]).reset_index(drop=True)
+
+    def print_report(self, table: pd.DataFrame, top: int = 10):
+        print(f"\n🧪 **SWEEP: {self.strategy_cls.__name__}** ({len(table)} combinations in {self.elapsed:.1f}s, {self.workers} worker(s))")
+        print("〰️" * 30)
+        if table.empty:
+            print("   No results")
+            return
+        print(table.head(top).to_string(float_format=lambda v: f"{v:,.4g}"))
@@ -0,0 +1,183 @@
+import numpy as np
+from typing import Any, Dict, List, Sequence
+
+def _fills(actions: np.ndarray, warmup: int):
+    """
+    Entry/exit bar indices of the long-only state machine:
+    BUY opens when flat, SELL/EXIT closes when in a position, everything else is ignored.
+    Only the first signal of each run counts (BUY BUY SELL SELL -> one round trip).
+    """
+    bars = np.arange(warmup, len(actions))
+    acts = actions[warmup:]
+    buys = bars[acts == "BUY"]
+    sells = bars[(acts == "SELL") | (acts == "EXIT")]
+
+    events = np.concatenate([buys, sells])
+    side = np.concatenate([np.ones(len(buys), dtype=np.int8), -np.ones(len(sells), dtype=np.int8)])
+    order = np.argsort(events, kind='stable')
+    events, side = events[order], side[order]
+
+    first_of_run = np.concatenate([[True], side[1:] != side[:-1]]) if len(side) else np.zeros(0, dtype=bool)
+    events, side = events[first_of_run], side[first_of_run]
+    if len(side) and side[0] == -1: # Exits while flat
+        events = events[1:]
+    return events[0::2], events[1::2]
+
+def simulate_spot(close: Sequence[float], actions: Sequence[str], timestamps: Sequence[Any] = None,
+                  initial_capital: float = 1000.0, warmup: int = 50, fee: float = 0.001,
+                  allocation: float = 0.99) -> Dict[str, Any]:
+    """
+    NumPy version of the BacktestEngine spot loop (same rules, no per-bar Python):
+    - BUY (flat): spend `allocation` of the balance at the close
+    - SELL/EXIT (in position): sell everything at the close, paying `fee`
+    - Open position at the end: marked to market at the last close
+    Returns final_balance, roi, trades, history (same format as the loop) and the
+    per-bar equity curve.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    actions = np.asarray(actions)
+    entries, exits = _fills(actions, warmup)
+    n_closed = len(exits)
+
+    p_in, p_out = close[entries], close[exits]
+    # Each round trip multiplies the balance: idle cash + position value after the fee
+    growth = (1 - allocation) + allocation * (p_out / p_in[:n_closed]) * (1 - fee)
+    balances = initial_capital * np.cumprod(np.concatenate([[1.0], growth])) # Before trade k / after n_closed trades
+
+    size = balances[:len(entries)] * allocation / p_in
+    cash = balances[:len(entries)] - size * p_in
+    cost = size[:n_closed] * p_in[:n_closed]
+    revenue = size[:n_closed] * p_out * (1 - fee)
+    pnl = revenue - cost
+
+    final_balance = balances[n_closed]
+    if len(entries) > n_closed: # Mark to market
+        final_balance = cash[-1] + size[-1] * close[-1]
+
+    # Equity: open trade -> cash + size * close, otherwise the realized balance
+    bars = np.arange(len(close))
+    trade = np.searchsorted(entries, bars, side='right') - 1
+    closed_by = np.searchsorted(exits, bars, side='right')
+    in_position = (trade >= 0) & (trade >= closed_by)
+    k = np.clip(trade, 0, None)
+    if len(entries):
+        equity = np.where(in_position, cash[k] + size[k] * close, balances[closed_by])
+    else:
+        equity = np.full(len(close), float(initial_capital))
+
+    times = timestamps if timestamps is not None else bars # Positional (list / array)
+    history: List[Dict[str, Any]] = []
+    for i, entry in enumerate(entries):
+        history.append({'type': 'BUY', 'price': p_in[i], 'time': times[entry], 'balance': cash[i]})
+        if i < n_closed:
+            history.append({
+                'type': 'SELL',
+                'price': p_out[i],
+                'time': times[exits[i]],
+                'balance': balances[i + 1],
+                'pnl': pnl[i],
+                'pnl_pct': (pnl[i] / cost[i]) * 100
+            })
+
+    return {
+        'final_balance': float(final_balance),
+        'roi': ((final_balance - initial_capital) / initial_capital) * 100,
+        'trades': len(history),
+        'history': history,
+        'equity': equity
+    }
+
+def position_states(signals: Sequence[str]) -> np.ndarray:
+    """
+    Futures position after each bar (1 long, -1 short, 0 flat) under the trading-loop
+    state machine: BUY -> long and SHORT -> short from any state (flips included),
+    CLOSE_LONG / CLOSE_SHORT only close their own side, EXIT_ALL closes anything.
+    Vectorized: the state is set by the last BUY/SHORT/EXIT_ALL and cleared by a
+    matching close after it.
+    """
+    signals = np.asarray(signals)
+    n = len(signals)
+    bars = np.arange(n)
+
+    def last_index(mask):
+        return np.maximum.accumulate(np.where(mask, bars, -1)) if n else np.zeros(0, dtype=np.int64)
+
+    is_reset = (signals == "BUY") | (signals == "SHORT") | (signals == "EXIT_ALL")
+    last_reset = last_index(is_reset)
+    reset_state = np.select([signals == "BUY", signals == "SHORT"], [1, -1], 0).astype(np.int8)
+    state = np.where(last_reset >= 0, reset_state[np.clip(last_reset, 0, None)], 0).astype(np.int8)
+
+    closed_long = last_index(signals == "CLOSE_LONG") > last_reset
+    closed_short = last_index(signals == "CLOSE_SHORT") > last_reset
+    state[((state == 1) & closed_long) | ((state == -1) & closed_short)] = 0
+    return state
+
+def simulate_bidirectional(close: Sequence[float], signals: Sequence[str], timestamps: Sequence[Any] = None,
+                           initial_capital: float = 1000.0, warmup: int = 0, fee: float = 0.0005,
+                           allocation: float = 0.99) -> Dict[str, Any]:
+    """
+    Long/short version of simulate_spot() driven by futures signals (see position_states):
+    - Each position uses `allocation` of the balance as notional, filled at the close
+    - `fee` is paid on the notional at entry and at exit (a flip pays both)
+    - Open position at the end: marked to market at the last close (exit fee not paid)
+    Returns final_balance, roi, trades, history (OPEN_LONG/OPEN_SHORT + CLOSE rows)
+    and the per-bar equity curve.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals).copy()
+    signals[:warmup] = "WAIT"
+    state = position_states(signals)
+
+    changed = np.flatnonzero(np.diff(np.concatenate([[0], state])) != 0)
+    # Trades = runs of a non-flat state: entry where the run starts, exit where it ends
+    starts = changed[state[changed] != 0]
+    side = state[starts].astype(np.float64)
+    ends = np.searchsorted(changed, starts, side='right')
+    n_closed = int(np.sum(ends < len(changed)))
+    exits = changed[ends[:n_closed]]
+
+    p_in, p_out = close[starts], close[exits]
+    ratio = p_out / p_in[:n_closed]
+    # Balance multiplier per round trip: price move on the notional minus both fees
+    growth = 1 + allocation * (side[:n_closed] * (ratio - 1) - fee * (1 + ratio))
+    balances = initial_capital * np.cumprod(np.concatenate([[1.0], growth]))
+    notional = balances[:len(starts)] * allocation
+    pnl = balances[1:n_closed + 1] - balances[:n_closed]
+
+    final_balance = balances[n_closed]
+    if len(starts) > n_closed:
+        final_balance = balances[n_closed] + notional[-1] * (side[-1] * (close[-1] / p_in[-1] - 1) - fee)
+
+    bars = np.arange(len(close))
+    trade = np.searchsorted(starts, bars, side='right') - 1
+    closed_by = np.searchsorted(exits, bars, side='right')
+    in_position = (trade >= 0) & (trade >= closed_by)
+    k = np.clip(trade, 0, None)
+    if len(starts):
+        open_value = notional[k] * (side[k] * (close / p_in[k] - 1) - fee)
+        equity = np.where(in_position, balances[k] + open_value, balances[closed_by])
+    else:
+        equity = np.full(len(close), float(initial_capital))
+
+    times = timestamps if timestamps is not None else bars
+    history: List[Dict[str, Any]] = []
+    for i, entry in enumerate(starts):
+        history.append({'type': 'OPEN_LONG' if side[i] > 0 else 'OPEN_SHORT', 'price': p_in[i],
+                        'time': times[entry], 'balance': balances[i]})
+        if i < n_closed:
+            history.append({
+                'type': 'CLOSE',
+                'price': p_out[i],
+                'time': times[exits[i]],
+                'balance': balances[i + 1],
+                'pnl': pnl[i],
+                'pnl_pct': (pnl[i] / notional[i]) * 100
+            })
+
+    return {
+        'final_balance': float(final_balance),
+        'roi': ((final_balance - initial_capital) / initial_capital) * 100,
+        'trades': len(history),
+        'history': history,
+        'equity': equity
+    }
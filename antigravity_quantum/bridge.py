@@ -34,11 +34,12 @@ class QuantumBridge:
         # Setup Callback
         # The engine calls this async function
         async def async_signal_handler(signal):
-            # We bridge back to Sync world
+            # We bridge back to Sync world, in a worker thread: the callback places orders
+            # (blocking fan-out) and must not stall the other assets' scans on this loop
             # print(f"🌉 Bridge Received Signal: {signal.symbol}")
             if self.notification_callback:
                 try:
-                    self.notification_callback(signal)
+                    await asyncio.to_thread(self.notification_callback, signal)
                 except Exception as e:
                     print(f"❌ Bridge Callback Error: {e}")
 
@@ -2,6 +2,7 @@
 # Dynamic configuration for the Quantum Engine
 # This file is imported by both the Engine (background) and Main (foreground).
 # Simple toggles. In a larger app, use a proper DB or Redis.
+import os
 
 # --- STRATEGY CONFIG ---
 ENABLED_STRATEGIES = {
@@ -22,3 +23,79 @@ DISABLED_ASSETS = set()
 
 # Global Settings
 USE_QUANTUM_ENGINE = True
+
+# --- DATA LAYER ---
+# Local candle store (columnar, partitioned by symbol/timeframe).
+# Fetches only download candles newer than the last stored one.
+USE_CANDLE_STORE = True
+CANDLE_STORE_DIR = os.getenv('CANDLE_STORE_DIR', os.path.join('data', 'candles'))
+
+# Shared in-process candle cache (keyed by symbol/timeframe/limit).
+# Entries expire when the candle closes; MAX_AGE (seconds) optionally caps that.
+USE_CANDLE_CACHE = True
+CANDLE_CACHE_MAX_ENTRIES = 256
+CANDLE_CACHE_MAX_AGE = None
+
+# Incremental indicator state (strategies/indicators.py): each new candle costs O(1)
+# instead of recomputing the whole window. Used by StrategyEngine and MarketStream.
+USE_INCREMENTAL_INDICATORS = True
+
+# StrategyEngine.analyze(): read-only column arrays + indicator buffers reused across
+# scans instead of copying the DataFrame and adding ~14 columns per call.
+USE_ZERO_COPY_ANALYSIS = True
+
+# QuantumEngine scan cycles: compute the indicators of all due assets (per timeframe)
+# as one batch over (assets x time) matrices instead of one pandas pass per asset.
+USE_BATCH_INDICATORS = True
+# Seconds a batch waits for its fetches; later arrivals are computed and analyzed on their own
+BATCH_FETCH_WAIT = 2.0
+
+# WebSocket kline streaming for MarketStream (one multiplexed connection).
+# REST is then only used to backfill buffers after (re)connects.
+USE_WS_STREAM = True
+WS_STREAM_URL = os.getenv('WS_STREAM_URL', 'wss://stream.binance.com:9443/stream')
+WS_BUFFER_SIZE = 1000
+
+# --- ENGINE CONCURRENCY ---
+# Assets scanned in parallel per cycle, and per-asset timeout (seconds)
+MAX_CONCURRENT_SCANS = 8
+SCAN_TIMEOUT = 20
+# Binance REST request-weight budget per minute shared by MarketStream fetches
+BINANCE_WEIGHT_PER_MINUTE = 1200
+
+# Candle-close scheduler: seconds to wait after a close before scanning
+# (lets the exchange publish the closed candle)
+SCHEDULER_SETTLE_SECONDS = 2.0
+
+# --- BACKTEST ---
+# Whole-history signals (IStrategy.analyze_series) + NumPy fill simulator instead of
+# re-analyzing a growing slice on every bar. Same trades/balance as the loop.
+VECTORIZED_BACKTEST = True
+
+# Futures simulator (backtest/futures.py): Binance USDT-M base tier
+FUTURES_MAKER_FEE = 0.0002
+FUTURES_TAKER_FEE = 0.0005
+FUTURES_SLIPPAGE = 0.0002 # Market orders, fraction of price
+FUNDING_RATE = 0.0001 # Per funding period (0.01% = neutral)
+FUNDING_INTERVAL_HOURS = 8
+MAINTENANCE_MARGIN = 0.004
+
+# --- EXECUTION ---
+# Futures exchange info (precision, tick/step size, min notional) is indexed once per
+# process (utils/exchange_metadata.py) and refreshed in the background on this period
+SYMBOL_METADATA_REFRESH_SECONDS = 3600
+
+# Per-session account state (positions, balances, open orders) fed by the futures
+# user-data stream (utils/account_state.py) and reconciled over REST on this period.
+# Order paths fall back to REST whenever the stream is not in sync.
+USE_USER_DATA_STREAM = True
+USER_DATA_STREAM_URL = os.getenv('USER_DATA_STREAM_URL', 'wss://fstream.binance.com/ws')
+ACCOUNT_RECONCILE_SECONDS = 60
+
+# Signal fan-out: every session executes concurrently on this many threads
+# (utils/execution.py); calls for one session still run in order
+EXECUTION_WORKERS = 64
+# Futures order requests (per IP, all sessions): request-weight budget per minute, and
+# closes in flight at once per session during a panic flatten
+FUTURES_ORDER_WEIGHT_PER_MINUTE = 1200
+FLATTEN_WORKERS = 8
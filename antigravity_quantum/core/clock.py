@@ -0,0 +1,25 @@
+import asyncio
+
+class SimulatedClock:
+    """
+    Virtual time source (seconds, like time.time) for replays.
+    Callable, so it plugs in wherever a clock function is expected
+    (CandleScheduler, ReplayMarketStream); sleep() advances it instead of waiting.
+    """
+    def __init__(self, start: float):
+        self.now = float(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    @property
+    def now_ms(self) -> int:
+        return int(self.now * 1000)
+
+    def advance(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+    async def sleep(self, seconds: float):
+        """asyncio.sleep() in virtual time: moves the clock and only yields to the event loop."""
+        self.advance(seconds)
+        await asyncio.sleep(0)
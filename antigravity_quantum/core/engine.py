@@ -1,15 +1,21 @@
 import asyncio
+import time
 from ..strategies.factory import StrategyFactory
 from ..risk.manager import RiskManager
 from ..data.stream import MarketStream
+from .scheduler import CandleScheduler
+from ..config import USE_WS_STREAM, MAX_CONCURRENT_SCANS, SCAN_TIMEOUT, SCHEDULER_SETTLE_SECONDS, USE_BATCH_INDICATORS, BATCH_FETCH_WAIT
 
 class QuantumEngine:
     """
     Main Orchestrator for Antigravity Quantum.
     """
-    def __init__(self, assets=None):
+    def __init__(self, assets=None, market_stream: MarketStream = None):
         self.risk_guardian = RiskManager()
-        self.market_stream = MarketStream('binance')
+        # Any MarketStream-compatible source (e.g. data.replay.ReplayMarketStream for offline runs)
+        self.market_stream = market_stream or MarketStream('binance')
+        self.scheduler = CandleScheduler(self.market_stream.timeframe_for, settle=SCHEDULER_SETTLE_SECONDS,
+                                         clock=self.market_stream.clock)
         self.running = False
         
         # Determine Assets
@@ -22,51 +28,191 @@ class QuantumEngine:
             print("⚠️ QuantumEngine: Using Default Fallback Assets.")
 
         self.signal_callback = None
+        self.cycle_stats = {}
         
     def set_callback(self, callback):
         """
         Sets the async callback for signal emission.
         Signature: async def callback(signal: Signal)
+        Blocking work (order placement) belongs off the loop (see QuantumBridge).
         """
         self.signal_callback = callback
 
     async def initialize(self):
         print("🌌 QuantumEngine: Initializing Subsystems...")
         await self.market_stream.initialize()
+        if USE_WS_STREAM and await self.market_stream.start_streaming(self.assets):
+            print("✅ Market Stream: WebSocket klines")
         
         # Simulating Async Config / DB Load
         await asyncio.sleep(0.5)
         print("✅ Risk Manager: Online")
         print("✅ Strategy Factory: Online")
 
+    def _strategy_for(self, asset: str):
+        # In real version, we calculate volatility from market_data to pick strategy
+        # For now using VOL=0.5 default, or based on asset
+        volatility_index = 0.5 
+        return StrategyFactory.get_strategy(asset.replace('USDT',''), volatility_index)
+
+    async def _analyze_asset(self, asset: str, market_data=None):
+        """Strategy -> Fetch -> Analyze for one asset. Returns (ok, signal); ok is False if no data was available."""
+        # 1. Get Dynamic Strategy
+        strategy = self._strategy_for(asset)
+
+        # 2. Fetch Data (Real) + only the indicators this strategy declares
+        # (batch cycles pass market_data already computed for the whole universe)
+        if market_data is None:
+            market_data = await self.market_stream.get_candles(asset, indicators=strategy.required_indicators)
+        if market_data['dataframe'].empty:
+            return False, None
+        
+        # 3. Analyze (Async)
+        signal = await strategy.analyze(market_data)
+        
+        if signal:
+            print(f"💡 QUANTUM SIGNAL: {signal.action} on {asset} ({strategy.name}) | Conf: {signal.confidence:.2f}")
+        return True, signal
+
+    async def _emit(self, signal):
+        """
+        Hands a signal to the callback. Never runs under a scan timeout: cancelling it
+        could leave orders half placed (an entry filled without its SL/TP).
+        """
+        if signal and self.signal_callback:
+            try:
+                await self.signal_callback(signal)
+            except Exception as e:
+                print(f"⚠️ Signal Callback Error ({signal.symbol}): {e}")
+
+    async def _scan_asset(self, asset: str, market_data=None) -> bool:
+        """Strategy -> Fetch -> Signal pipeline for one asset. Returns False if no data was available."""
+        ok, signal = await self._analyze_asset(asset, market_data)
+        await self._emit(signal)
+        return ok
+
+    async def _timed_scan(self, asset: str, semaphore: asyncio.Semaphore):
+        """
+        Runs one asset under the concurrency limit. Errors/timeouts stay local to the asset
+        and only cover fetch + analysis; the signal is emitted after. Returns (ok, seconds).
+        """
+        start = time.perf_counter()
+        ok, signal = False, None
+        async with semaphore:
+            try:
+                ok, signal = await asyncio.wait_for(self._analyze_asset(asset), timeout=SCAN_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"⚠️ Scan Timeout ({asset}): > {SCAN_TIMEOUT}s")
+            except Exception as e:
+                print(f"⚠️ Scan Error ({asset}): {e}")
+        await self._emit(signal)
+        return ok, time.perf_counter() - start
+
+    async def _timed_fetch(self, asset: str, semaphore: asyncio.Semaphore):
+        """Raw candles for one asset (batch cycles). Returns (DataFrame or None, seconds)."""
+        async with semaphore:
+            start = time.perf_counter()
+            df = None
+            try:
+                df = await asyncio.wait_for(self.market_stream.fetch_candles(asset), timeout=SCAN_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"⚠️ Fetch Timeout ({asset}): > {SCAN_TIMEOUT}s")
+            except Exception as e:
+                print(f"⚠️ Data Fetch Error ({asset}): {e}")
+            return df, time.perf_counter() - start
+
+    async def _analyze_batch(self, fetched: dict, indicators) -> dict:
+        """Computes one batch of fetched frames and analyzes its assets concurrently. {asset: (ok, seconds)}"""
+        batch = self.market_stream.batch_indicators({a: df for a, (df, _) in fetched.items()}, indicators)
+
+        async def scan(asset, fetch_s):
+            start = time.perf_counter()
+            ok = False
+            if asset in batch:
+                try:
+                    ok = await self._scan_asset(asset, batch[asset])
+                except Exception as e:
+                    print(f"⚠️ Scan Error ({asset}): {e}")
+            return ok, fetch_s + time.perf_counter() - start
+
+        results = await asyncio.gather(*(scan(a, fetch_s) for a, (_, fetch_s) in fetched.items()))
+        return dict(zip(fetched, results))
+
+    async def _batch_group(self, assets, semaphore: asyncio.Semaphore) -> dict:
+        """
+        One timeframe group: fetches concurrently and batches whatever arrived within
+        BATCH_FETCH_WAIT seconds; slower assets are computed and analyzed on their own
+        as they arrive, so one stalled symbol never holds back the others' signals.
+        """
+        indicators = sorted({col for a in assets for col in self._strategy_for(a).required_indicators})
+        tasks = {asyncio.ensure_future(self._timed_fetch(a, semaphore)): a for a in assets}
+        ready, pending = await asyncio.wait(tasks, timeout=BATCH_FETCH_WAIT)
+
+        async def late(task):
+            return await self._analyze_batch({tasks[task]: await task}, indicators)
+
+        parts = await asyncio.gather(self._analyze_batch({tasks[t]: t.result() for t in ready}, indicators),
+                                     *(late(t) for t in pending))
+        return {a: r for part in parts for a, r in part.items()}
+
+    async def _batch_scan(self, assets, semaphore: asyncio.Semaphore):
+        """
+        Fetches all assets concurrently and computes their indicators in batches
+        (per timeframe), each analyzed as soon as it is ready (_batch_group).
+        Returns [(ok, seconds)] like _timed_scan (fetch time + analysis time).
+        """
+        groups = {}
+        for asset in assets:
+            groups.setdefault(self.market_stream.timeframe_for(asset), []).append(asset)
+        results = {}
+        for part in await asyncio.gather(*(self._batch_group(g, semaphore) for g in groups.values())):
+            results.update(part)
+        return [results[a] for a in assets]
+
+    async def scan_cycle(self, assets=None):
+        """
+        Scans all assets concurrently (bounded by MAX_CONCURRENT_SCANS).
+        With USE_BATCH_INDICATORS the indicators are computed once for all assets.
+        Stores timing stats: wall time vs. the sum of per-asset times (= the old sequential cost).
+        """
+        assets = self.assets if assets is None else assets
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+        start = time.perf_counter()
+        if USE_BATCH_INDICATORS:
+            results = await self._batch_scan(assets, semaphore)
+        else:
+            results = await asyncio.gather(*(self._timed_scan(a, semaphore) for a in assets))
+        wall = time.perf_counter() - start
+        durations = [d for _, d in results]
+
+        serial = sum(durations)
+        self.cycle_stats = {
+            "assets": len(assets),
+            "wall_s": wall,
+            "serial_s": serial,
+            "slowest_s": max(durations) if durations else 0.0,
+            "speedup": serial / wall if wall > 0 else 1.0,
+            "failed": [a for a, (ok, _) in zip(assets, results) if not ok],
+            "throttled_s": self.market_stream.rate_limiter.waited
+        }
+        return self.cycle_stats
+
     async def core_loop(self):
-        """Main Decision Loop"""
+        """Main Decision Loop (wakes each asset just after its candle closes)"""
         print("🚀 Quantum Core Loop Started.")
+        closed = set()
         while self.running:
-            for asset in self.assets:
-                # print(f"🔍 Scanning {asset}...") # Reduced Noise
-                
-                # 1. Fetch Data (Real)
-                market_data = await self.market_stream.get_candles(asset)
-                if market_data['dataframe'].empty:
-                    continue
-
-                # 2. Get Dynamic Strategy
-                # In real version, we calculate volatility from market_data to pick strategy
-                # For now using VOL=0.5 default, or based on asset
-                volatility_index = 0.5 
-                strategy = StrategyFactory.get_strategy(asset.replace('USDT',''), volatility_index)
-                
-                # 3. Analyze (Async)
-                signal = await strategy.analyze(market_data)
-                
-                if signal:
-                    print(f"💡 QUANTUM SIGNAL: {signal.action} on {asset} ({strategy.name}) | Conf: {signal.confidence:.2f}")
-                    
-                    if self.signal_callback:
-                        await self.signal_callback(signal)
+            # Streamed closes are scanned immediately; the rest once their close has settled
+            due = set(self.scheduler.due(self.assets)) | (closed & set(self.assets))
+            if due:
+                assets = [a for a in self.assets if a in due]
+                self.scheduler.mark_scanned(assets)
+                stats = await self.scan_cycle(assets)
+                self.scheduler.mark_failed(stats['failed'])
+                # print(f"⏱️ Cycle: {stats['wall_s']:.2f}s (seq. {stats['serial_s']:.2f}s, x{stats['speedup']:.1f})") # Reduced Noise
                 
-            await asyncio.sleep(60) # 1 Minute Cycle (Matches 15m candle update speed approx)
+            # Streaming: also wakes up early on a candle close
+            closed = await self.market_stream.wait_for_candle_close(self.scheduler.seconds_until_next(self.assets))
 
     async def run(self):
         self.running = True
@@ -0,0 +1,94 @@
+import time
+from typing import Callable, Dict, Iterable, List
+
+from ..data.timeframes import candle_open_ms, next_close_ms
+
+class CandleScheduler:
+    """
+    Candle-close-aligned scheduling for the scan loops.
+    Each asset has a timeframe (e.g. SOL 5m, BTC 15m, ADA 1h); an asset is due
+    once a candle has closed since its last scan (+ `settle` seconds so the
+    exchange has published the closed candle). Assets whose candle is still
+    forming are skipped instead of being refetched every cycle.
+    The clock is injectable (seconds, like time.time) for replays/backtests.
+    """
+    def __init__(self, timeframe_for: Callable[[str], str], settle: float = 2.0,
+                 fallback_interval: float = 60.0, clock: Callable[[], float] = time.time):
+        self.timeframe_for = timeframe_for
+        self.settle = settle
+        self.fallback_interval = fallback_interval # Unsupported timeframes: old fixed cycle
+        self.clock = clock
+        self._last_open: Dict[str, int] = {} # asset -> open time (ms) of the candle forming at last scan
+        self._last_scan: Dict[str, float] = {}
+        self._retry_at: Dict[str, float] = {} # failed scans: retried before the next close
+
+        self.scans = 0
+        self.skipped = 0
+
+    def _forming_open(self, asset: str, now_ms: int):
+        try:
+            return candle_open_ms(self.timeframe_for(asset), now_ms)
+        except ValueError:
+            return None
+
+    def due(self, assets: Iterable[str]) -> List[str]:
+        """Assets with a closed (and settled) candle since their last scan. Never-scanned assets are due."""
+        assets = list(assets)
+        now = self.clock()
+        settled_ms = int((now - self.settle) * 1000)
+        result = []
+        for asset in assets:
+            if asset not in self._last_scan or now >= self._retry_at.get(asset, float('inf')):
+                result.append(asset)
+                continue
+            settled_open = self._forming_open(asset, settled_ms)
+            if settled_open is None:
+                if now - self._last_scan[asset] >= self.fallback_interval:
+                    result.append(asset)
+            elif self._last_open[asset] is None or settled_open > self._last_open[asset]:
+                result.append(asset)
+
+        self.skipped += len(assets) - len(result)
+        return result
+
+    def mark_scanned(self, assets: Iterable[str]):
+        now = self.clock()
+        now_ms = int(now * 1000)
+        for asset in assets:
+            self._last_open[asset] = self._forming_open(asset, now_ms)
+            self._last_scan[asset] = now
+            self._retry_at.pop(asset, None)
+            self.scans += 1
+
+    def mark_failed(self, assets: Iterable[str], retry_in: float = None):
+        """Failed fetch/analysis: retry after `retry_in` seconds instead of waiting for the next close."""
+        retry_at = self.clock() + (self.fallback_interval if retry_in is None else retry_in)
+        for asset in assets:
+            self._retry_at[asset] = retry_at
+
+    def seconds_until_next(self, assets: Iterable[str]) -> float:
+        """Seconds until the next asset becomes due (0 if one already is)."""
+        now = self.clock()
+        waits = []
+        for asset in assets:
+            if asset not in self._last_scan:
+                return 0.0
+            last_open = self._last_open[asset]
+            if last_open is None:
+                waits.append(self._last_scan[asset] + self.fallback_interval - now)
+            else:
+                close_ms = next_close_ms(self.timeframe_for(asset), last_open)
+                waits.append(close_ms / 1000 + self.settle - now)
+            if asset in self._retry_at:
+                waits.append(self._retry_at[asset] - now)
+        if not waits:
+            return self.fallback_interval
+        return max(0.0, min(waits))
+
+    def stats(self) -> Dict[str, float]:
+        total = self.scans + self.skipped
+        return {
+            "scans": self.scans,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / total if total else 0.0
+        }
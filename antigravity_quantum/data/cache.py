@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .timeframes import next_close_ms
+
+CacheKey = Tuple[str, str, int] # (symbol, timeframe, limit)
+
+class CandleCache:
+    """
+    Process-wide TTL cache for candle windows, keyed by (symbol, timeframe, limit).
+
+    - An entry expires when the candle of its timeframe that was forming at fetch time closes
+      (optionally capped by max_age seconds).
+    - Concurrent misses on the same key are coalesced: the first caller fetches,
+      the others wait on its result (threads block, coroutines await).
+    - Bounded with LRU eviction.
+    Sync callers (Telegram handlers, legacy loop) and async callers (QuantumEngine)
+    share the same entries and the same in-flight table.
+    """
+    def __init__(self, max_entries: int = 256, max_age: float = None, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    # --- INTERNALS ---
+    def _expiry(self, timeframe: str, now: float) -> float:
+        try:
+            expires_at = next_close_ms(timeframe, int(now * 1000)) / 1000
+        except ValueError:
+            expires_at = now + 60 # Unknown timeframe: 1 minute TTL
+        if self.max_age is not None:
+            expires_at = min(expires_at, now + self.max_age)
+        return expires_at
+
+    @staticmethod
+    def _share(value: Any) -> Any:
+        # Callers add indicator columns in place: never hand out the cached object itself
+        return value.copy() if hasattr(value, 'copy') else value
+
+    @staticmethod
+    def _cacheable(value: Any) -> bool:
+        # Failed fetches come back as empty DataFrames: don't pin them until the candle closes
+        return value is not None and not getattr(value, 'empty', False)
+
+    def _lookup(self, key: CacheKey) -> Tuple[bool, Any, Optional[Future], bool]:
+        """
+        Under the lock: returns (hit, value, future, is_leader).
+        On a miss, either joins the in-flight fetch or registers a new one.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1], None, False
+                del self._entries[key]
+
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return False, None, fut, False
+
+            self.misses += 1
+            fut = Future()
+            self._inflight[key] = fut
+            return False, None, fut, True
+
+    def _complete(self, key: CacheKey, fut: Future, value: Any):
+        with self._lock:
+            if self._cacheable(value):
+                self._entries[key] = (self._expiry(key[1], self.clock()), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    def _fail(self, key: CacheKey, fut: Future, exc: BaseException):
+        with self._lock:
+            self._inflight.pop(key, None)
+        fut.set_exception(exc)
+
+    # --- PUBLIC API ---
+    def get_or_fetch(self, symbol: str, timeframe: str, limit: int, fetch_fn: Callable[[], Any]) -> Any:
+        """Blocking version (threads)."""
+        key = (symbol, timeframe, limit)
+        hit, value, fut, leader = self._lookup(key)
+        if hit:
+            return self._share(value)
+        if not leader:
+            return self._share(fut.result())
+
+        try:
+            value = fetch_fn()
+        except BaseException as e:
+            self._fail(key, fut, e)
+            raise
+        self._complete(key, fut, value)
+        return self._share(value)
+
+    async def aget_or_fetch(self, symbol: str, timeframe: str, limit: int, fetch_coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Asyncio version. Waiters await the leader's result whichever thread/loop it runs on."""
+        key = (symbol, timeframe, limit)
+        hit, value, fut, leader = self._lookup(key)
+        if hit:
+            return self._share(value)
+        if not leader:
+            return self._share(await asyncio.wrap_future(fut))
+
+        try:
+            value = await fetch_coro_fn()
+        except BaseException as e:
+            self._fail(key, fut, e)
+            raise
+        self._complete(key, fut, value)
+        return self._share(value)
+
+    def invalidate(self, symbol: str = None):
+        """Drops every entry (or only those of one symbol)."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.coalesced) / requests if requests else 0.0
+            }
+
+
+def _build_default_cache() -> CandleCache:
+    from ..config import CANDLE_CACHE_MAX_ENTRIES, CANDLE_CACHE_MAX_AGE
+    return CandleCache(max_entries=CANDLE_CACHE_MAX_ENTRIES, max_age=CANDLE_CACHE_MAX_AGE)
+
+# Shared by data/fetcher.py (sync callers) and MarketStream (QuantumEngine)
+candle_cache = _build_default_cache()
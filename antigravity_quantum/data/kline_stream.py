@@ -0,0 +1,156 @@
+import asyncio
+import json
+import random
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .timeframes import normalize_timeframe, timeframe_to_ms
+
+try:
+    import websockets
+except ImportError: # Optional dependency: streaming mode is disabled without it
+    websockets = None
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+class CandleBuffer:
+    """
+    Rolling OHLCV buffer for one (symbol, timeframe).
+    Rows are [open_time_ms, open, high, low, close, volume]; the last row may be the forming candle.
+    `synced` is False until seeded via REST, and again after a reconnect or a missed candle.
+    """
+    def __init__(self, timeframe: str, maxlen: int = 1000):
+        self.step = timeframe_to_ms(timeframe)
+        self.rows = deque(maxlen=maxlen)
+        self.synced = False
+
+    def seed(self, rows: Iterable[list]):
+        """Merges REST rows (older/equal timestamps) under whatever the stream already delivered."""
+        live = [r for r in self.rows]
+        merged = {int(r[0]): [int(r[0])] + [float(x) for x in r[1:6]] for r in rows}
+        for r in live: # Stream data is fresher than the REST snapshot
+            merged[r[0]] = r
+        self.rows.clear()
+        self.rows.extend(merged[k] for k in sorted(merged))
+        self.synced = True
+
+    def update(self, row: list):
+        if not self.rows:
+            self.rows.append(row)
+            return
+        last_ts = self.rows[-1][0]
+        if row[0] == last_ts:
+            self.rows[-1] = row
+        elif row[0] > last_ts:
+            if row[0] - last_ts > self.step:
+                self.synced = False # Missed candle(s): needs a REST backfill
+            self.rows.append(row)
+
+    def ready(self, limit: int) -> bool:
+        return self.synced and len(self.rows) >= limit
+
+    def frame(self, limit: int) -> pd.DataFrame:
+        rows = list(self.rows)[-limit:]
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+
+class KlineStream:
+    """
+    One multiplexed kline WebSocket for the whole asset universe (Binance combined stream format).
+    Keeps a CandleBuffer per (symbol, timeframe) up to date and signals candle closes.
+    The URL is configurable so it can run against a local stand-in server.
+    """
+    def __init__(self, subscriptions: List[Tuple[str, str]], url: str = BINANCE_STREAM_URL,
+                 buffer_size: int = 1000, on_candle_closed: Callable[[str, str, list], None] = None):
+        self.url = url
+        self.subscriptions = [(s.upper(), normalize_timeframe(tf)) for s, tf in subscriptions]
+        self.buffers: Dict[Tuple[str, str], CandleBuffer] = {
+            key: CandleBuffer(key[1], maxlen=buffer_size) for key in self.subscriptions
+        }
+        self.on_candle_closed = on_candle_closed
+        self.running = False
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self._closed: Set[str] = set()
+        self._closed_event = asyncio.Event()
+
+    @property
+    def stream_url(self) -> str:
+        streams = '/'.join(f"{s.lower()}@kline_{tf}" for s, tf in self.subscriptions)
+        return f"{self.url}?streams={streams}"
+
+    def buffer(self, symbol: str, timeframe: str) -> Optional[CandleBuffer]:
+        return self.buffers.get((symbol.upper(), normalize_timeframe(timeframe)))
+
+    def _handle_message(self, raw: str):
+        msg = json.loads(raw)
+        data = msg.get('data', msg) # Combined stream wraps payloads in {"stream", "data"}
+        if data.get('e') != 'kline':
+            return
+        k = data['k']
+        buf = self.buffers.get((k['s'].upper(), k['i']))
+        if buf is None:
+            return
+
+        row = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+        buf.update(row)
+        self.messages += 1
+
+        if k.get('x'): # Candle closed
+            self._closed.add(k['s'].upper())
+            self._closed_event.set()
+            if self.on_candle_closed:
+                try:
+                    self.on_candle_closed(k['s'].upper(), k['i'], row)
+                except Exception as e:
+                    print(f"⚠️ Candle close hook error ({k['s']}): {e}")
+
+    async def wait_for_close(self, timeout: float = None) -> Set[str]:
+        """Waits until at least one candle closes (or timeout). Returns the symbols that closed."""
+        try:
+            await asyncio.wait_for(self._closed_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        closed, self._closed = self._closed, set()
+        self._closed_event.clear()
+        return closed
+
+    async def run(self):
+        """Connect/reconnect loop. After every (re)connect all buffers need a REST backfill."""
+        if websockets is None:
+            print("⚠️ KlineStream: 'websockets' not installed. Streaming disabled.")
+            return
+
+        self.running = True
+        delay = 1.0
+        while self.running:
+            try:
+                async with websockets.connect(self.stream_url, ping_interval=20, max_size=2 ** 22) as ws:
+                    for buf in self.buffers.values():
+                        buf.synced = False
+                    self.connected = True
+                    delay = 1.0
+                    print(f"📡 KlineStream: Subscribed to {len(self.subscriptions)} streams.")
+                    async for raw in ws:
+                        self._handle_message(raw)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"⚠️ KlineStream Disconnected: {e}")
+
+            self.connected = False
+            if not self.running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay + random.uniform(0, 0.5)) # Backoff with jitter
+            delay = min(delay * 2, 30.0)
+
+        self.connected = False
+
+    def stop(self):
+        self.running = False
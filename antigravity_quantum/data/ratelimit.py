@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+from typing import Callable
+
+def kline_weight(limit: int) -> int:
+    """Binance request weight of GET /api/v3/klines for a given limit."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightBucket:
+    """
+    Async token bucket over Binance request weight.
+    Capacity is the per-minute weight budget; tokens refill continuously.
+    Callers await acquire(weight) before a request; waiters are served in order,
+    so a burst of concurrent scans is spread out instead of hitting a 429/418.
+    """
+    def __init__(self, weight_per_minute: int = 1200, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(weight_per_minute)
+        self.rate = weight_per_minute / 60.0 # tokens per second
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.waited = 0.0 # Total seconds spent throttled (stats)
+        self._lock = None
+        self._thread_lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight: int = 1):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        weight = min(weight, self.capacity)
+        async with self._lock: # FIFO: one waiter refills/sleeps at a time
+            self._refill()
+            if self.tokens < weight:
+                delay = (weight - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= weight
+
+    def acquire_blocking(self, weight: int = 1):
+        """acquire() for sync callers on worker threads (order paths). Use one style per bucket."""
+        weight = min(weight, self.capacity)
+        with self._thread_lock: # One waiter refills/sleeps at a time
+            self._refill()
+            if self.tokens < weight:
+                delay = (weight - self.tokens) / self.rate
+                self.waited += delay
+                time.sleep(delay)
+                self._refill()
+            self.tokens -= weight
+
+    def observe_used_weight(self, used_weight_1m: int):
+        """Syncs with the exchange's X-MBX-USED-WEIGHT-1M header (other processes share the IP budget)."""
+        self._refill()
+        self.tokens = min(self.tokens, max(0.0, self.capacity - used_weight_1m))
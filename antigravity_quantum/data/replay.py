@@ -0,0 +1,167 @@
+import asyncio
+import os
+import time
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from strategies.registry import compute_indicators
+from ..core.clock import SimulatedClock
+from .store import get_candle_store
+from .stream import MarketStream, HISTORICAL_INDICATORS
+from .timeframes import timeframe_to_ms, next_close_ms
+from .ratelimit import WeightBucket
+
+class ReplayMarketStream(MarketStream):
+    """
+    File-backed MarketStream: same interface (get_candles, fetch_candles,
+    get_historical_candles, batch_indicators...), served from CandleStore
+    partitions on disk. No exchange client, no network.
+
+    The replay cursor is a SimulatedClock (`now_ms` starts one; or share a clock).
+    Only candles CLOSED at that time are visible, so a replay never sees a candle's
+    final values while it is still forming. No cursor means all stored data.
+    """
+    def __init__(self, root: str = None, exchange_id: str = 'binance', now_ms: int = None,
+                 sim_clock: SimulatedClock = None):
+        self.exchange_id = exchange_id
+        self.exchange = None
+        self.store = get_candle_store(exchange_id, root)
+        self.rate_limiter = WeightBucket() # Never throttles; kept for engine stats
+        self.tf_map = dict(self.TIMEFRAMES)
+        self.kline_stream = None
+        self._stream_task = None
+        if sim_clock is None and now_ms is not None:
+            sim_clock = SimulatedClock(now_ms / 1000)
+        self.sim_clock = sim_clock
+
+    async def initialize(self):
+        if not os.path.isdir(self.store.root):
+            print(f"⚠️ Replay: no stored candles in {self.store.root}")
+        else:
+            print(f"📼 Replay data source: {self.store.root}")
+
+    async def start_streaming(self, symbols: List[str], url: str = None) -> bool:
+        return False # Replays are pull-based
+
+    @property
+    def now_ms(self) -> Optional[int]:
+        return self.sim_clock.now_ms if self.sim_clock is not None else None
+
+    def clock(self) -> float:
+        """Replay time in seconds (the cursor), for schedulers driven by this source."""
+        return self.sim_clock() if self.sim_clock is not None else time.time()
+
+    def _visible_end(self, timeframe: str) -> Optional[int]:
+        """Last visible candle open time (inclusive) at the cursor."""
+        if self.now_ms is None:
+            return None
+        return self.now_ms - timeframe_to_ms(timeframe)
+
+    def data_range(self, symbols: Iterable[str]) -> Optional[tuple]:
+        """(first, last) stored candle open time (ms) over the symbols' partitions."""
+        firsts, lasts = [], []
+        for symbol in symbols:
+            tf = self.timeframe_for(symbol)
+            first, last = self.store.first_timestamp(symbol, tf), self.store.last_timestamp(symbol, tf)
+            if first is not None:
+                firsts.append(first)
+                lasts.append(last)
+        return (min(firsts), max(lasts)) if firsts else None
+
+    async def wait_for_candle_close(self, timeout: float) -> set:
+        """With a cursor: moves it forward `timeout` seconds and returns at once. Otherwise a plain sleep."""
+        if self.sim_clock is None:
+            await asyncio.sleep(timeout)
+        else:
+            await self.sim_clock.sleep(timeout)
+        return set()
+
+    async def _fetch_ohlcv(self, formatted_symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List[list]:
+        raise RuntimeError("ReplayMarketStream is offline (no exchange requests)")
+
+    async def fetch_candles(self, symbol: str, limit: int = 100) -> pd.DataFrame:
+        timeframe = self.timeframe_for(symbol)
+        df = self.store.load_frame(symbol, timeframe, limit=limit, end_ms=self._visible_end(timeframe))
+        if df.empty:
+            raise LookupError(f"no stored candles for {symbol} {timeframe}")
+        return df
+
+    async def get_historical_candles(self, symbol: str, days: int = 30, indicators=None) -> pd.DataFrame:
+        timeframe = self.timeframe_for(symbol)
+        end_ms = self._visible_end(timeframe)
+        last_ts = end_ms if end_ms is not None else self.store.last_timestamp(symbol, timeframe)
+        if last_ts is None:
+            print(f"⚠️ Replay: no stored candles for {symbol} ({timeframe})")
+            return pd.DataFrame()
+
+        start_ms = last_ts - days * 86_400_000
+        df = self.store.load_frame(symbol, timeframe, start_ms=start_ms, end_ms=end_ms)
+        if df.empty:
+            return pd.DataFrame()
+        compute_indicators(df, indicators or HISTORICAL_INDICATORS)
+        return df
+
+    async def close(self):
+        pass
+
+
+class CandleRecorder:
+    """
+    Captures live candles to disk for later replays (ReplayMarketStream).
+    Uses a regular MarketStream (REST, request-weight bucket) and writes into a
+    CandleStore at `root`: an optional history backfill, then each new candle
+    just after it closes.
+    """
+    def __init__(self, symbols: List[str], root: str = None, exchange_id: str = 'binance', market_stream: MarketStream = None):
+        self.symbols = symbols
+        self.market_stream = market_stream or MarketStream(exchange_id)
+        self.store = get_candle_store(exchange_id, root) # Shared partitions/locks with MarketStream
+        self.recorded = 0
+        self.running = False
+
+    async def backfill(self, days: int):
+        """Stores the last `days` of history for every symbol."""
+        start_ms = int((time.time() - days * 86_400) * 1000)
+        for symbol in self.symbols:
+            tf = self.market_stream.timeframe_for(symbol)
+            first = self.store.first_timestamp(symbol, tf)
+            rows = await self.market_stream._paginate_ohlcv(self.market_stream._format_symbol(symbol), tf, start_ms, until=first)
+            self.recorded += self.store.write(symbol, tf, rows)
+            print(f"📼 {symbol} ({tf}): {self.store.count(symbol, tf)} candles stored")
+
+    async def record_once(self):
+        """Downloads everything after the last recorded candle (which is rewritten: it may have been forming)."""
+        for symbol in self.symbols:
+            tf = self.market_stream.timeframe_for(symbol)
+            since = self.store.last_timestamp(symbol, tf)
+            try:
+                rows = await self.market_stream._fetch_ohlcv(self.market_stream._format_symbol(symbol), tf, since=since, limit=1000)
+                self.recorded += self.store.write(symbol, tf, rows)
+            except Exception as e:
+                print(f"⚠️ Recorder Error ({symbol}): {e}")
+
+    def seconds_until_next_close(self) -> float:
+        now_ms = int(time.time() * 1000)
+        closes = [next_close_ms(self.market_stream.timeframe_for(s), now_ms) for s in self.symbols]
+        return max(0.0, (min(closes) - now_ms) / 1000) + 2.0 # Settle: let the exchange publish the close
+
+    async def run(self, duration: float = None, backfill_days: int = None):
+        """Records until stop() (or `duration` seconds), optionally backfilling history first."""
+        self.running = True
+        deadline = time.time() + duration if duration else None
+        await self.market_stream.initialize()
+        try:
+            if backfill_days:
+                await self.backfill(backfill_days)
+            while self.running and (deadline is None or time.time() < deadline):
+                await self.record_once()
+                wait = self.seconds_until_next_close()
+                if deadline is not None:
+                    wait = min(wait, max(0.0, deadline - time.time()))
+                await asyncio.sleep(wait)
+        finally:
+            await self.market_stream.close()
+
+    def stop(self):
+        self.running = False
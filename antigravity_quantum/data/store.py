@@ -0,0 +1,265 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .timeframes import normalize_timeframe, timeframe_to_ms
+
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+class CandleStore:
+    """
+    Persistent columnar OHLCV store, partitioned by symbol and timeframe.
+
+    Layout: <root>/<SYMBOL>/<timeframe>/<column>.bin
+    Each column is a raw little-endian array (timestamp int64 ms, prices/volume float64),
+    so a partition can be tail-read or memory-mapped without parsing.
+    gaps.bin holds (before, after) int64 pairs: holes the exchange has no candles for.
+    Writes are append-only except for the last stored candle, which is usually
+    still forming and gets overwritten on the next sync.
+    """
+    DTYPES = {
+        'timestamp': np.dtype('<i8'),
+        'open': np.dtype('<f8'),
+        'high': np.dtype('<f8'),
+        'low': np.dtype('<f8'),
+        'close': np.dtype('<f8'),
+        'volume': np.dtype('<f8'),
+    }
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- PATHS & LOCKS ---
+    def _partition_dir(self, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace('/', '').upper()
+        return os.path.join(self.root, safe_symbol, normalize_timeframe(timeframe))
+
+    def _column_path(self, symbol: str, timeframe: str, column: str) -> str:
+        return os.path.join(self._partition_dir(symbol, timeframe), f"{column}.bin")
+
+    def _gaps_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self._partition_dir(symbol, timeframe), "gaps.bin")
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        key = self._partition_dir(symbol, timeframe)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    # --- READ ---
+    def _row_count(self, symbol: str, timeframe: str) -> int:
+        """
+        Number of complete rows. If a crash left columns with different lengths,
+        they are truncated back to the shortest one.
+        """
+        counts = []
+        for col in OHLCV_COLUMNS:
+            path = self._column_path(symbol, timeframe, col)
+            if not os.path.exists(path):
+                return 0
+            counts.append(os.path.getsize(path) // self.DTYPES[col].itemsize)
+
+        rows = min(counts)
+        if any(c != rows for c in counts):
+            for col in OHLCV_COLUMNS:
+                path = self._column_path(symbol, timeframe, col)
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * self.DTYPES[col].itemsize)
+        return rows
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        with self._lock(symbol, timeframe):
+            return self._row_count(symbol, timeframe)
+
+    def _read_column(self, symbol: str, timeframe: str, column: str, start: int, count: int, mmap: bool = False) -> np.ndarray:
+        dtype = self.DTYPES[column]
+        path = self._column_path(symbol, timeframe, column)
+        if count <= 0:
+            return np.empty(0, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode='r', offset=start * dtype.itemsize, shape=(count,))
+        return np.fromfile(path, dtype=dtype, count=count, offset=start * dtype.itemsize)
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        with self._lock(symbol, timeframe):
+            if self._row_count(symbol, timeframe) == 0:
+                return None
+            return int(self._read_column(symbol, timeframe, 'timestamp', 0, 1)[0])
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        with self._lock(symbol, timeframe):
+            rows = self._row_count(symbol, timeframe)
+            if rows == 0:
+                return None
+            return int(self._read_column(symbol, timeframe, 'timestamp', rows - 1, 1)[0])
+
+    def _known_gaps(self, symbol: str, timeframe: str) -> set:
+        path = self._gaps_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return set()
+        pairs = np.fromfile(path, dtype=self.DTYPES['timestamp'])
+        return {(int(a), int(b)) for a, b in pairs[:len(pairs) // 2 * 2].reshape(-1, 2)}
+
+    def find_gaps(self, symbol: str, timeframe: str, start_ms: int = None) -> List[Tuple[int, int]]:
+        """
+        Internal holes in the stored series (e.g. left by a full-window fetch after a long
+        outage, see plan_fetch): [(last candle before, first candle after)], from start_ms on.
+        Holes recorded with mark_gap() (nothing to fetch on the exchange) are skipped.
+        """
+        ts = self.load(symbol, timeframe, mmap=True)['timestamp']
+        if len(ts) < 2:
+            return []
+        with self._lock(symbol, timeframe):
+            known = self._known_gaps(symbol, timeframe)
+        holes = np.flatnonzero(np.diff(ts) > timeframe_to_ms(timeframe))
+        # A hole straddling start_ms counts: its later part is inside the range
+        gaps = [(int(ts[i]), int(ts[i + 1])) for i in holes if start_ms is None or ts[i + 1] > start_ms]
+        return [gap for gap in gaps if gap not in known]
+
+    def mark_gap(self, symbol: str, timeframe: str, before_ms: int, after_ms: int):
+        """Records a hole the exchange has no candles for (delisting, maintenance window)."""
+        with self._lock(symbol, timeframe):
+            os.makedirs(self._partition_dir(symbol, timeframe), exist_ok=True)
+            with open(self._gaps_path(symbol, timeframe), 'ab') as f:
+                f.write(np.array([before_ms, after_ms], dtype=self.DTYPES['timestamp']).tobytes())
+
+    def load(self, symbol: str, timeframe: str, limit: int = None, start_ms: int = None, end_ms: int = None, mmap: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Returns {column: ndarray} for the requested slice.
+        - limit: last N rows (applied after the time filters)
+        - start_ms / end_ms: inclusive bounds on the candle open time
+        - mmap: return read-only memory maps instead of in-memory copies
+        """
+        with self._lock(symbol, timeframe):
+            rows = self._row_count(symbol, timeframe)
+            if rows == 0:
+                return {col: np.empty(0, dtype=self.DTYPES[col]) for col in OHLCV_COLUMNS}
+
+            lo, hi = 0, rows
+            if start_ms is not None or end_ms is not None:
+                ts = self._read_column(symbol, timeframe, 'timestamp', 0, rows, mmap=True)
+                if start_ms is not None:
+                    lo = int(np.searchsorted(ts, start_ms, side='left'))
+                if end_ms is not None:
+                    hi = int(np.searchsorted(ts, end_ms, side='right'))
+                del ts
+            if limit is not None:
+                lo = max(lo, hi - limit)
+
+            return {col: self._read_column(symbol, timeframe, col, lo, hi - lo, mmap=mmap) for col in OHLCV_COLUMNS}
+
+    def load_frame(self, symbol: str, timeframe: str, limit: int = None, start_ms: int = None, end_ms: int = None) -> pd.DataFrame:
+        """Same as load(), as the DataFrame shape used across the bot (timestamp as datetime)."""
+        cols = self.load(symbol, timeframe, limit=limit, start_ms=start_ms, end_ms=end_ms)
+        df = pd.DataFrame({col: cols[col] for col in OHLCV_COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    # --- WRITE ---
+    @staticmethod
+    def _normalize_rows(rows: Sequence[Sequence]) -> Dict[str, np.ndarray]:
+        """Klines/ccxt rows ([ts, o, h, l, c, v, ...], strings allowed) -> sorted, de-duplicated columns."""
+        arr = np.array([r[:6] for r in rows], dtype=object)
+        ts = arr[:, 0].astype(np.int64)
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        # Keep the LAST occurrence of each timestamp (freshest data wins)
+        keep = np.append(ts[1:] != ts[:-1], True)
+        out = {'timestamp': ts[keep]}
+        for i, col in enumerate(OHLCV_COLUMNS[1:], start=1):
+            out[col] = arr[order, i].astype(np.float64)[keep]
+        return out
+
+    def _append_columns(self, symbol: str, timeframe: str, cols: Dict[str, np.ndarray], truncate_to: int = None):
+        os.makedirs(self._partition_dir(symbol, timeframe), exist_ok=True)
+        for col in OHLCV_COLUMNS:
+            path = self._column_path(symbol, timeframe, col)
+            dtype = self.DTYPES[col]
+            with open(path, 'ab' if os.path.exists(path) else 'wb') as f:
+                if truncate_to is not None:
+                    f.truncate(truncate_to * dtype.itemsize)
+                f.write(np.ascontiguousarray(cols[col], dtype=dtype).tobytes())
+
+    def _rewrite_columns(self, symbol: str, timeframe: str, cols: Dict[str, np.ndarray]):
+        os.makedirs(self._partition_dir(symbol, timeframe), exist_ok=True)
+        for col in OHLCV_COLUMNS:
+            path = self._column_path(symbol, timeframe, col)
+            tmp = path + '.tmp'
+            np.ascontiguousarray(cols[col], dtype=self.DTYPES[col]).tofile(tmp)
+            os.replace(tmp, path)
+
+    def write(self, symbol: str, timeframe: str, rows: Sequence[Sequence]) -> int:
+        """
+        Merges candles into the partition. Returns the number of rows written.
+        Fast path: rows start at/after the last stored candle -> tail overwrite + append.
+        Slow path (backfill of older history): the partition is merged and rewritten.
+        """
+        if rows is None or len(rows) == 0:
+            return 0
+        new = self._normalize_rows(rows)
+
+        with self._lock(symbol, timeframe):
+            stored = self._row_count(symbol, timeframe)
+            if stored == 0:
+                self._append_columns(symbol, timeframe, new, truncate_to=0)
+                return len(new['timestamp'])
+
+            last_ts = int(self._read_column(symbol, timeframe, 'timestamp', stored - 1, 1)[0])
+            first_new = int(new['timestamp'][0])
+
+            if first_new >= last_ts:
+                # Overwrite the (possibly still forming) last candle if it was re-fetched
+                truncate_to = stored - 1 if first_new == last_ts else None
+                self._append_columns(symbol, timeframe, new, truncate_to=truncate_to)
+                return len(new['timestamp'])
+
+            # Backfill / overlap: merge everything and rewrite
+            old = {col: self._read_column(symbol, timeframe, col, 0, stored) for col in OHLCV_COLUMNS}
+            ts_all = np.concatenate([old['timestamp'], new['timestamp']])
+            order = np.argsort(ts_all, kind='stable')
+            ts_sorted = ts_all[order]
+            keep = np.append(ts_sorted[1:] != ts_sorted[:-1], True) # new rows come last -> they win
+            merged = {col: np.concatenate([old[col], new[col]])[order][keep] for col in OHLCV_COLUMNS}
+            self._rewrite_columns(symbol, timeframe, merged)
+            return len(new['timestamp'])
+
+    # --- DELTA FETCH PLANNING ---
+    def plan_fetch(self, symbol: str, timeframe: str, limit: int, now_ms: int) -> Optional[int]:
+        """
+        Decides how much must be downloaded to serve the last `limit` candles.
+        Returns the `since` (ms) for an incremental fetch starting at the last stored
+        candle (re-fetched because it may have been forming), or None when a full
+        `limit` window is needed (empty partition, not enough history, or a gap
+        larger than the window). In the last case the stored series keeps a hole before
+        the new window; get_historical_candles() backfills it (find_gaps).
+        """
+        with self._lock(symbol, timeframe):
+            rows = self._row_count(symbol, timeframe)
+            if rows < limit:
+                return None
+            last_ts = int(self._read_column(symbol, timeframe, 'timestamp', rows - 1, 1)[0])
+
+        missing = (now_ms - last_ts) // timeframe_to_ms(timeframe)
+        if missing >= limit:
+            return None
+        return last_ts
+
+
+_stores = {}
+_stores_guard = threading.Lock()
+
+def get_candle_store(exchange_id: str = 'binance', root: str = None) -> CandleStore:
+    """Process-wide store per exchange, so the legacy fetcher and MarketStream share partitions."""
+    if root is None:
+        from ..config import CANDLE_STORE_DIR
+        root = CANDLE_STORE_DIR
+    path = os.path.join(root, exchange_id)
+    with _stores_guard:
+        if path not in _stores:
+            _stores[path] = CandleStore(path)
+        return _stores[path]
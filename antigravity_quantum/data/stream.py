@@ -1,24 +1,46 @@
 import ccxt.async_support as ccxt
 import pandas as pd
 import asyncio
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
+from ..config import USE_CANDLE_STORE, USE_CANDLE_CACHE, WS_STREAM_URL, WS_BUFFER_SIZE, BINANCE_WEIGHT_PER_MINUTE
+from strategies.registry import indicator_pipeline, compute_indicators, compute_indicators_batch
+from .store import get_candle_store
+from .timeframes import timeframe_to_ms
+from .cache import candle_cache
+from .kline_stream import KlineStream, websockets
+from .ratelimit import WeightBucket, kline_weight
+
+# Columns added when the caller doesn't declare its indicators
+DEFAULT_INDICATORS = ('ema_20', 'ema_50', 'ema_200', 'adx')
+# Superset used for backtests (covers every Quantum strategy)
+HISTORICAL_INDICATORS = ('ema_20', 'ema_50', 'ema_200', 'rsi', 'bb_upper', 'bb_lower', 'atr', 'adx')
 
 class MarketStream:
     """
     Async Market Data Provider.
-    Currently uses REST Polling via CCXT (Async).
-    Can be upgraded to WebSockets (CCXT Pro) later.
+    REST Polling via CCXT (Async) by default. start_streaming() switches to a
+    multiplexed kline WebSocket: get_candles then reads the rolling buffers and
+    REST is only used to backfill them (first use, reconnects, missed candles).
+    Candles are persisted in the local CandleStore, so each poll only
+    downloads the candles newer than the last stored one.
     """
+    TIMEFRAMES = {
+        'BTC': '15m',  # Fast trend
+        'ETH': '15m',
+        'SOL': '5m',   # Scalping
+        'ADA': '1h',   # Grid/Swing
+        'default': '15m'
+    }
+
     def __init__(self, exchange_id='binance'):
         self.exchange_id = exchange_id
         self.exchange = getattr(ccxt, exchange_id)()
-        self.tf_map = {
-            'BTC': '15m',  # Fast trend
-            'ETH': '15m',
-            'SOL': '5m',   # Scalping
-            'ADA': '1h',   # Grid/Swing
-            'default': '15m'
-        }
+        self.store = get_candle_store(exchange_id) if USE_CANDLE_STORE else None
+        self.rate_limiter = WeightBucket(BINANCE_WEIGHT_PER_MINUTE)
+        self.tf_map = dict(self.TIMEFRAMES)
+        self.kline_stream = None
+        self._stream_task = None
 
     async def initialize(self):
         """Load markets"""
@@ -29,34 +51,119 @@ class MarketStream:
         except Exception as e:
             print(f"❌ Connection Failed: {e}")
 
-    async def get_candles(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+    def clock(self) -> float:
+        """Time source of this market (seconds). Live: wall clock; replays: the replay cursor."""
+        return time.time()
+
+    def timeframe_for(self, symbol: str) -> str:
+        """Resolve Timeframe based on asset config (Dynamic)"""
+        return self.tf_map.get(symbol.split('USDT')[0], self.tf_map['default'])
+
+    async def start_streaming(self, symbols: List[str], url: str = WS_STREAM_URL) -> bool:
+        """
+        Subscribes every USDT symbol to its kline stream on one connection.
+        Returns False (REST polling stays active) if websockets is unavailable.
+        """
+        if websockets is None:
+            print("⚠️ MarketStream: 'websockets' not installed. Staying on REST polling.")
+            return False
+
+        subscriptions = [(s, self.timeframe_for(s)) for s in symbols if s.endswith('USDT')]
+        if not subscriptions:
+            return False
+
+        self.kline_stream = KlineStream(subscriptions, url=url, buffer_size=WS_BUFFER_SIZE,
+                                        on_candle_closed=self._persist_closed_candle)
+        self._stream_task = asyncio.create_task(self.kline_stream.run())
+        return True
+
+    def _persist_closed_candle(self, symbol: str, timeframe: str, row: list):
+        # Keeps the CandleStore current so REST backfills stay tiny
+        if self.store is not None:
+            self.store.write(symbol, timeframe, [row])
+
+    async def wait_for_candle_close(self, timeout: float) -> set:
+        """Streaming mode: returns as soon as a candle closes. REST mode: plain sleep."""
+        if self.kline_stream is None:
+            await asyncio.sleep(timeout)
+            return set()
+        return await self.kline_stream.wait_for_close(timeout)
+
+    async def _get_streamed_candles(self, symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+        """Reads the WebSocket buffer, backfilling it via REST when it is not synced."""
+        buf = self.kline_stream.buffer(symbol, timeframe) if self.kline_stream else None
+        if buf is None:
+            return None
+        if not buf.ready(limit):
+            df = await self._fetch_ohlcv_delta(symbol, timeframe, limit)
+            ts = df['timestamp'].values.astype('datetime64[ms]').astype('int64').tolist()
+            rows = df[['open', 'high', 'low', 'close', 'volume']].values.tolist()
+            buf.seed([[t] + r for t, r in zip(ts, rows)])
+        return buf.frame(limit)
+
+    @staticmethod
+    def _format_symbol(symbol: str) -> str:
+        # symbol needs to be compatible with exchange (e.g. BTC/USDT)
+        # internal we might use BTCUSDT, ccxt needs BTC/USDT usually
+        return symbol.replace('USDT', '/USDT') if 'USDT' in symbol and '/' not in symbol else symbol
+
+    async def _fetch_ohlcv(self, formatted_symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List[list]:
+        """fetch_ohlcv behind the request-weight bucket (safe to call from concurrent scans)."""
+        await self.rate_limiter.acquire(kline_weight(limit))
+        ohlcv = await self.exchange.fetch_ohlcv(formatted_symbol, timeframe, since=since, limit=limit)
+
+        headers = getattr(self.exchange, 'last_response_headers', None) or {}
+        used = headers.get('x-mbx-used-weight-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is not None:
+            self.rate_limiter.observe_used_weight(int(used))
+        return ohlcv
+
+    async def _fetch_ohlcv_delta(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """
+        Last `limit` candles, downloading only what the CandleStore is missing.
+        """
+        formatted_symbol = self._format_symbol(symbol)
+
+        if self.store is None:
+            ohlcv = await self._fetch_ohlcv(formatted_symbol, timeframe, limit=limit)
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            return df
+
+        since = self.store.plan_fetch(symbol, timeframe, limit, now_ms=int(time.time() * 1000))
+        ohlcv = await self._fetch_ohlcv(formatted_symbol, timeframe, since=since, limit=limit)
+        self.store.write(symbol, timeframe, ohlcv)
+        return self.store.load_frame(symbol, timeframe, limit=limit)
+
+    async def fetch_candles(self, symbol: str, limit: int = 100) -> pd.DataFrame:
+        """Raw OHLCV window for the symbol's timeframe (no indicators). Raises on fetch errors."""
+        timeframe = self.timeframe_for(symbol)
+        # Streaming mode reads the kline buffer (no request in steady state).
+        # Shared cache: the legacy bot and other coroutines reuse/coalesce the same window
+        df = await self._get_streamed_candles(symbol, timeframe, limit)
+        if df is None:
+            if USE_CANDLE_CACHE:
+                df = await candle_cache.aget_or_fetch(symbol, timeframe, limit, lambda: self._fetch_ohlcv_delta(symbol, timeframe, limit))
+            else:
+                df = await self._fetch_ohlcv_delta(symbol, timeframe, limit)
+        return df
+
+    async def get_candles(self, symbol: str, limit: int = 100, indicators=None) -> Dict[str, Any]:
         """
         Fetches OHLCV data and returns a formatted dict ready for Strategy.analyze()
+        indicators: columns the strategy needs (strategy.required_indicators).
         """
         # 1. Resolve Timeframe based on asset config (Dynamic)
-        timeframe = self.tf_map.get(symbol.split('USDT')[0], self.tf_map['default'])
+        timeframe = self.timeframe_for(symbol)
         
         try:
-            # 2. Fetch (Async)
-            # symbol needs to be compatible with ecxchange (e.g. BTC/USDT)
-            # internal we might use BTCUSDT, ccxt needs BTC/USDT usually
-            formatted_symbol = symbol.replace('USDT', '/USDT') if 'USDT' in symbol and '/' not in symbol else symbol
-            
-            ohlcv = await self.exchange.fetch_ohlcv(formatted_symbol, timeframe, limit=limit)
+            # 2. Fetch (Async, delta against the CandleStore) -> DataFrame
+            df = await self.fetch_candles(symbol, limit)
             
-            # 3. Parse to DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
-            # 4. Add Basic Indicators (Lightweight)
-            # Ideally this moves to a 'Technicals' module, but keeping here for speed
-            df['ema_20'] = df['close'].ewm(span=20).mean()
-            df['ema_50'] = df['close'].ewm(span=50).mean()
-            df['ema_200'] = df['close'].ewm(span=200).mean()
-            
-            # ADX placeholder (Requires complex calc, mocking for prototype)
-            # In production, use pandas_ta or ta-lib
-            df['adx'] = 30.0 # Mock to allow Trend Strategy to trigger
+            # 4. Add Indicators (shared registry pipeline)
+            # Only the dependency closure of the requested columns is computed,
+            # once per (symbol, timeframe, candle), and reused across strategies/consumers
+            indicator_pipeline.compute(symbol, timeframe, df, indicators or DEFAULT_INDICATORS)
             
             return {
                 "symbol": symbol,
@@ -68,34 +175,42 @@ class MarketStream:
             print(f"⚠️ Data Fetch Error ({symbol}): {e}")
             return {"dataframe": pd.DataFrame()} # Empty DF
 
-    async def get_historical_candles(self, symbol: str, days: int = 30) -> pd.DataFrame:
+    def batch_indicators(self, frames: Dict[str, pd.DataFrame], indicators=None) -> Dict[str, Dict[str, Any]]:
         """
-        Fetches a large dataset for backtesting using pagination.
+        Indicators for many symbols at once: frames are grouped by timeframe and each
+        group is computed as (assets x time) matrices (strategies/batch.py).
+        Returns {symbol: market_data} in the same format as get_candles().
+        """
+        groups: Dict[str, Dict[str, pd.DataFrame]] = {}
+        for symbol, df in frames.items():
+            if df is not None and not df.empty:
+                groups.setdefault(self.timeframe_for(symbol), {})[symbol] = df
+
+        result = {}
+        for timeframe, group in groups.items():
+            for symbol, df in compute_indicators_batch(group, indicators or DEFAULT_INDICATORS).items():
+                result[symbol] = {"symbol": symbol, "timeframe": timeframe, "dataframe": df}
+        return result
+
+    async def _paginate_ohlcv(self, formatted_symbol: str, timeframe: str, since: int, until: int = None) -> List[list]:
+        """
+        Pages through fetch_ohlcv from `since` (1000 candles per page).
+        Stops at the present, or once candles reach `until` (already stored).
         """
-        timeframe = self.tf_map.get(symbol.split('USDT')[0], '15m')
-        formatted_symbol = symbol.replace('USDT', '/USDT') if 'USDT' in symbol and '/' not in symbol else symbol
-        
-        # Calculate start time
-        now = pd.Timestamp.now()
-        start_time = now - pd.Timedelta(days=days)
-        start_ts = int(start_time.timestamp() * 1000)
-        
         all_ohlcv = []
-        current_since = start_ts
-        
-        print(f"⏳ Fetching history for {symbol} ({days} days)...")
+        current_since = since
         
         for _ in range(10): # Safety limit 10 pages
             try:
-                ohlcv = await self.exchange.fetch_ohlcv(formatted_symbol, timeframe, since=current_since, limit=1000)
+                ohlcv = await self._fetch_ohlcv(formatted_symbol, timeframe, since=current_since, limit=1000)
                 if not ohlcv:
                     break
                 
                 all_ohlcv.extend(ohlcv)
                 current_since = ohlcv[-1][0] + 1 # Next ms
                 
-                # Check if we reached recent time
-                if len(ohlcv) < 1000:
+                # Check if we reached recent time (or the stored range)
+                if len(ohlcv) < 1000 or (until is not None and ohlcv[-1][0] >= until):
                     break
                     
                 await asyncio.sleep(0.2) # Rate limit protection
@@ -104,47 +219,63 @@ class MarketStream:
                 print(f"⚠️ History Fetch Error: {e}")
                 break
                 
-        if not all_ohlcv:
-            return pd.DataFrame()
+        return all_ohlcv
             
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        
-        # 4. Add Basic Indicators (Native Pandas Implementation)
-        close = df['close']
+    async def get_historical_candles(self, symbol: str, days: int = 30, indicators=None) -> pd.DataFrame:
+        """
+        Fetches a large dataset for backtesting using pagination.
+        indicators: columns to add (defaults to HISTORICAL_INDICATORS).
+        History already in the CandleStore is reused: only the older range
+        (backfill) and the candles after the last stored one are downloaded.
+        """
+        timeframe = self.timeframe_for(symbol)
+        formatted_symbol = self._format_symbol(symbol)
 
-        # EMAs
-        df['ema_20'] = close.ewm(span=20, adjust=False).mean()
-        df['ema_50'] = close.ewm(span=50, adjust=False).mean()
-        df['ema_200'] = close.ewm(span=200, adjust=False).mean()
-        
-        # RSI (14)
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands (20, 2)
-        sma_20 = close.rolling(window=20).mean()
-        std_20 = close.rolling(window=20).std()
-        df['upper_bb'] = sma_20 + (std_20 * 2)
-        df['lower_bb'] = sma_20 - (std_20 * 2)
-        
-        # Approximate ADX (Simplified TR/DX for prototype speed)
-        # Real ADX requires recursion, approximating with Volatility/Trend strength
-        # Using ATR-like measure relative to price
-        tr = df[['high', 'low', 'close']].max(axis=1) - df[['high', 'low', 'close']].min(axis=1)
-        atr_14 = tr.rolling(14).mean()
-        df['atr'] = atr_14
+        # Calculate start time
+        now = pd.Timestamp.now()
+        start_time = now - pd.Timedelta(days=days)
+        start_ts = int(start_time.timestamp() * 1000)
+
+        print(f"⏳ Fetching history for {symbol} ({days} days)...")
+
+        if self.store is None:
+            all_ohlcv = await self._paginate_ohlcv(formatted_symbol, timeframe, start_ts)
+            if not all_ohlcv:
+                return pd.DataFrame()
+            df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        else:
+            first_ts = self.store.first_timestamp(symbol, timeframe)
+            last_ts = self.store.last_timestamp(symbol, timeframe)
+
+            if first_ts is None:
+                self.store.write(symbol, timeframe, await self._paginate_ohlcv(formatted_symbol, timeframe, start_ts))
+            else:
+                if first_ts > start_ts:
+                    # Backfill the older range up to the first stored candle
+                    self.store.write(symbol, timeframe, await self._paginate_ohlcv(formatted_symbol, timeframe, start_ts, until=first_ts))
+                # Delta: from the last stored candle (may have been forming) to now
+                self.store.write(symbol, timeframe, await self._paginate_ohlcv(formatted_symbol, timeframe, last_ts))
+                # Holes left by full-window live fetches after an outage (see plan_fetch)
+                tf_ms = timeframe_to_ms(timeframe)
+                for prev_ts, next_ts in self.store.find_gaps(symbol, timeframe, start_ms=start_ts):
+                    rows = await self._paginate_ohlcv(formatted_symbol, timeframe, prev_ts + tf_ms, until=next_ts)
+                    if rows and not any(prev_ts < r[0] < next_ts for r in rows):
+                        # The exchange answered from after the hole: nothing there, never re-fetch it
+                        self.store.mark_gap(symbol, timeframe, prev_ts, next_ts)
+                    self.store.write(symbol, timeframe, rows)
+
+            df = self.store.load_frame(symbol, timeframe, start_ms=start_ts)
+            if df.empty:
+                return pd.DataFrame()
         
-        # Synthetic ADX-like filter: 
-        # If SMA slopes are aligned and Volatility is rising -> High Trend Strength
-        # This is a robust proxy 
-        df['adx'] = (abs(df['ema_20'] - df['ema_50']) / close) * 1000 
-        # Normalized logic: > 5 usually means strong divergence/trend
+        # 4. Add Indicators (same registry definitions as live trading)
+        compute_indicators(df, indicators or HISTORICAL_INDICATORS)
         
         return df
 
     async def close(self):
+        if self.kline_stream is not None:
+            self.kline_stream.stop()
+            self._stream_task.cancel()
         await self.exchange.close()
@@ -0,0 +1,46 @@
+"""
+Timeframe helpers shared by the data layer (store, cache, scheduler).
+Binance/CCXT interval strings -> milliseconds.
+Only intervals whose candles are aligned to the Unix epoch are listed
+(Binance weekly candles open on Monday, so '1w' is left out).
+"""
+import time
+
+TIMEFRAME_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 60 * 60_000,
+    '2h': 2 * 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '6h': 6 * 60 * 60_000,
+    '8h': 8 * 60 * 60_000,
+    '12h': 12 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+}
+
+def normalize_timeframe(timeframe: str) -> str:
+    """'1H' -> '1h', '1D' -> '1d'. Minutes stay lowercase ('1M' would be a month, unsupported)."""
+    tf = timeframe.strip()
+    if tf[-1:] in ('H', 'D', 'W'):
+        tf = tf[:-1] + tf[-1].lower()
+    return tf
+
+def timeframe_to_ms(timeframe: str) -> int:
+    tf = normalize_timeframe(timeframe)
+    if tf not in TIMEFRAME_MS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return TIMEFRAME_MS[tf]
+
+def candle_open_ms(timeframe: str, now_ms: int = None) -> int:
+    """Open time (ms) of the candle that is forming at now_ms."""
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    step = timeframe_to_ms(timeframe)
+    return (now_ms // step) * step
+
+def next_close_ms(timeframe: str, now_ms: int = None) -> int:
+    """Close time (ms) of the candle that is forming at now_ms."""
+    return candle_open_ms(timeframe, now_ms) + timeframe_to_ms(timeframe)
@@ -1,6 +1,9 @@
 import abc
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 @dataclass
 class Signal:
@@ -10,10 +13,18 @@ class Signal:
     price: float
     metadata: Dict[str, Any]
 
+def series_column(df: pd.DataFrame, name: str, default=np.nan) -> np.ndarray:
+    """Column as a float array, or `default` broadcast when missing (= row.get(name, default))."""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=np.float64)
+    return np.broadcast_to(np.asarray(default, dtype=np.float64), (len(df),))
+
 class IStrategy(abc.ABC):
     """
     Interface for all Trading Strategies.
     """
+    # Indicator columns analyze() reads (resolved by strategies/registry.py, dependencies included)
+    required_indicators: Tuple[str, ...] = ()
     
     @abc.abstractmethod
     async def analyze(self, market_data: Dict[str, Any]) -> Signal:
@@ -22,6 +33,16 @@ class IStrategy(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def analyze_series(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bulk analyze(): (actions, confidences) arrays for every row of df, where row i
+        is what analyze() returns on df.iloc[:i+1] ("HOLD"/0.0 where it returns None).
+        Must be vectorized and must not change strategy state.
+        Checked against analyze() by check_series_parity().
+        """
+        pass
+
     @abc.abstractmethod
     def calculate_entry_params(self, signal: Signal, wallet_balance: float) -> Dict[str, Any]:
         """
@@ -34,3 +55,23 @@ class IStrategy(abc.ABC):
     def name(self) -> str:
         """Strategy Name"""
         pass
+
+async def check_series_parity(strategy: IStrategy, df: pd.DataFrame, symbol: str = "TEST",
+                              start: int = 2, step: int = 1, tol: float = 1e-9) -> List[int]:
+    """
+    For each prefix df.iloc[:i+1] (i from start-1), compares the last element of
+    analyze_series() with analyze(). Returns the rows that disagree (empty = parity).
+    analyze() is primed on the first prefix, as BacktestEngine.signal_series() does (anchors
+    stateful strategies); after that analyze_series() runs first on each prefix: it must not
+    depend on state analyze() is about to set.
+    """
+    await strategy.analyze({"symbol": symbol, "timeframe": "15m", "dataframe": df.iloc[:start]})
+    mismatches = []
+    for end in range(start, len(df) + 1, step):
+        window = df.iloc[:end]
+        actions, confidence = strategy.analyze_series(window)
+        signal = await strategy.analyze({"symbol": symbol, "timeframe": "15m", "dataframe": window})
+        expected = (signal.action, signal.confidence) if signal else ("HOLD", 0.0)
+        if actions[-1] != expected[0] or abs(float(confidence[-1]) - float(expected[1])) > tol:
+            mismatches.append(end - 1)
+    return mismatches
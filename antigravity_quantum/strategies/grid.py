@@ -1,11 +1,14 @@
+import numpy as np
+import pandas as pd
 from typing import Dict, Any
-from .base import IStrategy, Signal
+from .base import IStrategy, Signal, series_column
 
 class GridTradingStrategy(IStrategy):
     """
     Grid Strategy for Sideways/Accumulation Assets (ADA).
     Logic: Divides range into N levels. Buy Low, Sell High.
     """
+    required_indicators = ('ema_200',)
     
     def __init__(self, grid_levels=10, grid_spacing_pct=0.01):
         self.grid_levels = grid_levels
@@ -53,13 +56,31 @@ class GridTradingStrategy(IStrategy):
             metadata={"grid_dev": dev}
         )
 
+    def analyze_series(self, df: pd.DataFrame):
+        """
+        The grid is anchored on the first analyze() call and every row uses that center.
+        Raises ValueError before it: anchoring here would use a later row's EMA200
+        (lookahead). BacktestEngine.signal_series() primes with analyze() first.
+        """
+        if self.base_price is None:
+            raise ValueError(f"{self.name}: grid not anchored; call analyze() on the warm-up window first")
+        close = series_column(df, 'close')
+        dev = (close - self.base_price) / self.base_price
+
+        buy = dev < -self.spacing * 2
+        sell = dev > self.spacing * 2
+        actions = np.select([buy, sell], ["BUY", "SELL"], "HOLD")
+        confidence = np.where(buy | sell, 0.8, 0.0)
+        return actions, confidence
+
     def calculate_entry_params(self, signal: Signal, wallet_balance: float) -> Dict[str, Any]:
         """
         Grid trades are small, frequent, no tight SL (usually uses cross margin or wide SL).
         """
+        side = 1 if signal.action == "BUY" else -1
         return {
             "leverage": 2, # Low leverage for Grid
             "size_pct": 0.02, # Small position (2%)
-            "stop_loss_price": signal.price * 0.85, # Wide SL (15%) for safety
-            "take_profit_price": signal.price * 1.02 # Quick TP (2%)
+            "stop_loss_price": signal.price * (1 - side * 0.15), # Wide SL (15%) for safety
+            "take_profit_price": signal.price * (1 + side * 0.02) # Quick TP (2%)
         }
@@ -1,7 +1,24 @@
+import numpy as np
+import pandas as pd
 from typing import Dict, Any
-from .base import IStrategy, Signal
+from .base import IStrategy, Signal, series_column
 
 class MeanReversionStrategy(IStrategy):
+    required_indicators = ('rsi', 'bb_lower', 'bb_upper', 'ema_20', 'ema_200')
+    REGISTRY_BB_STD = 2.0 # Width of the bb_* columns (strategies/registry.py)
+
+    def __init__(self, rsi_oversold: float = 30, rsi_overbought: float = 70, bb_std: float = 2.0):
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+        self.bb_std = bb_std
+
+    def _bands(self, upper, middle, lower):
+        """Bands at bb_std deviations, derived from the registry columns (scalars or arrays)."""
+        if self.bb_std == self.REGISTRY_BB_STD:
+            return upper, lower
+        std = (upper - middle) / self.REGISTRY_BB_STD
+        return middle + std * self.bb_std, middle - std * self.bb_std
+
     @property
     def name(self) -> str:
         return "MeanReversion (ETH)"
@@ -20,8 +37,7 @@ class MeanReversionStrategy(IStrategy):
         
         price = last_row.get('close', 0)
         rsi = last_row.get('rsi', 50)
-        lower_bb = last_row.get('lower_bb', 0)
-        upper_bb = last_row.get('upper_bb', 0)
+        upper_bb, lower_bb = self._bands(last_row.get('bb_upper', 0), last_row.get('bb_middle', 0), last_row.get('bb_lower', 0))
         middle_bb = last_row.get('ema_20', 0) # SMA 20 usually middle band
         ema_200 = last_row.get('ema_200', 0) # Macro Trend Filter
         
@@ -30,16 +46,16 @@ class MeanReversionStrategy(IStrategy):
         
         # BUY SIGNAL (Long)
         # Condition: Price < BB Lower AND RSI < 30 AND Price > EMA 200 (Uptrend)
-        if price < lower_bb and rsi < 30 and price > ema_200:
+        if price < lower_bb and rsi < self.rsi_oversold and price > ema_200:
             signal_type = "BUY"
             # Confidence increases as RSI gets lower
-            confidence = min((30 - rsi) / 20 + 0.5, 1.0)
+            confidence = min((self.rsi_oversold - rsi) / 20 + 0.5, 1.0)
             
         # SELL SIGNAL (Short)
         # Condition: Price > BB Upper AND RSI > 70 AND Price < EMA 200 (Downtrend)
-        elif price > upper_bb and rsi > 70 and price < ema_200:
+        elif price > upper_bb and rsi > self.rsi_overbought and price < ema_200:
             signal_type = "SELL"
-            confidence = min((rsi - 70) / 20 + 0.5, 1.0)
+            confidence = min((rsi - self.rsi_overbought) / 20 + 0.5, 1.0)
             
         # EXIT LOGIC (Reversion to mean)
         # We also want to exit Longs if they hit Upper Band, or Shorts if Lower Band
@@ -67,7 +83,7 @@ class MeanReversionStrategy(IStrategy):
         # (This would require knowing current position, which analyze() doesn't know fully yet)
         # Assuming simplistic engine compliance:
         
-        if price > upper_bb and rsi > 70:
+        if price > upper_bb and rsi > self.rsi_overbought:
              # Just signal SELL. Engine will close Long if exists.
              # If no Long, Engine will try to Open Short -> Checked by EMA 200 below?
              # Wait, engine logic: 
@@ -82,9 +98,9 @@ class MeanReversionStrategy(IStrategy):
              confidence = 0.9
 
         # If no sell condition, check Buy
-        elif price < lower_bb and rsi < 30 and price > ema_200:
+        elif price < lower_bb and rsi < self.rsi_oversold and price > ema_200:
              signal_type = "BUY"
-             confidence = min((30 - rsi) / 20 + 0.5, 1.0)
+             confidence = min((self.rsi_oversold - rsi) / 20 + 0.5, 1.0)
             
         # EXIT LOGIC (Reversion to mean)
         # If we just hit middle band, it's often a take profit point
@@ -101,6 +117,19 @@ class MeanReversionStrategy(IStrategy):
             metadata={"rsi": rsi, "bb_width": upper_bb - lower_bb}
         )
 
+    def analyze_series(self, df: pd.DataFrame):
+        # Same precedence as analyze(): the overbought exit (SELL) overrides everything
+        price = series_column(df, 'close', 0)
+        rsi = series_column(df, 'rsi', 50)
+        upper_bb, lower_bb = self._bands(series_column(df, 'bb_upper', 0), series_column(df, 'bb_middle', 0), series_column(df, 'bb_lower', 0))
+        ema_200 = series_column(df, 'ema_200', 0)
+
+        sell = (price > upper_bb) & (rsi > self.rsi_overbought)
+        buy = ~sell & (price < lower_bb) & (rsi < self.rsi_oversold) & (price > ema_200)
+        actions = np.select([sell, buy], ["SELL", "BUY"], "HOLD")
+        confidence = np.select([sell, buy], [0.9, np.minimum((self.rsi_oversold - rsi) / 20 + 0.5, 1.0)], 0.0)
+        return actions, confidence
+
     def calculate_entry_params(self, signal: Signal, wallet_balance: float) -> Dict[str, Any]:
         """
         Mean Reversion targets quick scalps.
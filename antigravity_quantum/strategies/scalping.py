@@ -1,7 +1,16 @@
+import numpy as np
+import pandas as pd
 from typing import Dict, Any
-from .base import IStrategy, Signal
+from .base import IStrategy, Signal, series_column
 
 class ScalpingStrategy(IStrategy):
+    required_indicators = ('rsi', 'adx', 'ema_200')
+
+    def __init__(self, rsi_long: float = 52, rsi_short: float = 48, adx_min: float = 20):
+        self.rsi_long = rsi_long
+        self.rsi_short = rsi_short
+        self.adx_min = adx_min
+
     @property
     def name(self) -> str:
         return "Scalping (High Vol)"
@@ -30,14 +39,14 @@ class ScalpingStrategy(IStrategy):
         # MOMENTUM LONG
         # RSI crosses above 52 (was 55), ADX > 20 (was 25)
         # FILTER: Price > EMA 200 (Only with trend)
-        if rsi > 52 and last['rsi'] > prev['rsi'] and adx > 20 and close > ema_200:
+        if rsi > self.rsi_long and last['rsi'] > prev['rsi'] and adx > self.adx_min and close > ema_200:
             signal_type = "BUY"
             confidence = 0.7 + (min(adx, 50)/200) # Boost conf with ADX
             
         # MOMENTUM SHORT
         # RSI crosses below 48 (was 45), ADX > 20
         # FILTER: Price < EMA 200 (Only with trend)
-        elif rsi < 48 and last['rsi'] < prev['rsi'] and adx > 20 and close < ema_200:
+        elif rsi < self.rsi_short and last['rsi'] < prev['rsi'] and adx > self.adx_min and close < ema_200:
             signal_type = "SELL"
             confidence = 0.7 + (min(adx, 50)/200)
             
@@ -52,6 +61,19 @@ class ScalpingStrategy(IStrategy):
             metadata={"strategy": "Scalping", "rsi": rsi, "adx": adx}
         )
 
+    def analyze_series(self, df: pd.DataFrame):
+        close = series_column(df, 'close')
+        rsi = series_column(df, 'rsi', 50)
+        adx = series_column(df, 'adx', 0)
+        ema_200 = series_column(df, 'ema_200', close)
+        prev_rsi = np.concatenate([[np.nan], rsi[:-1]])
+
+        buy = (rsi > self.rsi_long) & (rsi > prev_rsi) & (adx > self.adx_min) & (close > ema_200)
+        sell = ~buy & (rsi < self.rsi_short) & (rsi < prev_rsi) & (adx > self.adx_min) & (close < ema_200)
+        actions = np.select([buy, sell], ["BUY", "SELL"], "HOLD")
+        confidence = np.where(buy | sell, 0.7 + (np.minimum(adx, 50) / 200), 0.0)
+        return actions, confidence
+
     def calculate_entry_params(self, signal: Signal, wallet_balance: float) -> Dict[str, Any]:
         """
         Scalping: High Leverage, Tight Stops, Quick TP.
@@ -1,12 +1,17 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
-from .base import IStrategy, Signal
+from .base import IStrategy, Signal, series_column
 
 class TrendFollowingStrategy(IStrategy):
     """
     Classic Trend Following for Dominant Assets (BTC).
     Logic: EMA Crossover (20/50) + ADX > 25 Filter.
     """
+    required_indicators = ('ema_20', 'ema_50', 'adx', 'atr') # atr: SL/TP distance (calculate_entry_params)
+
+    def __init__(self, adx_min: float = 20):
+        self.adx_min = adx_min
     
     @property
     def name(self) -> str:
@@ -30,15 +35,16 @@ class TrendFollowingStrategy(IStrategy):
         ema_long = last_row.get('ema_50', 0)
         adx = last_row.get('adx', 0)
         price = last_row.get('close', 0)
+        atr = last_row.get('atr')
         
         signal_type = "HOLD"
         confidence = 0.0
         
-        if ema_short > ema_long and adx > 20:
+        if ema_short > ema_long and adx > self.adx_min:
             signal_type = "BUY"
             confidence = min(adx / 50, 1.0) # Normalize confidence
             
-        elif ema_short < ema_long and adx > 20:
+        elif ema_short < ema_long and adx > self.adx_min:
             signal_type = "SELL"
             confidence = min(adx / 50, 1.0)
             
@@ -47,9 +53,20 @@ class TrendFollowingStrategy(IStrategy):
             action=signal_type,
             confidence=confidence,
             price=price,
-            metadata={"adx": adx, "ema_diff": ema_short - ema_long}
+            metadata={"adx": adx, "ema_diff": ema_short - ema_long, **({"atr": atr} if atr is not None else {})}
         )
 
+    def analyze_series(self, df: pd.DataFrame):
+        ema_short = series_column(df, 'ema_20', 0)
+        ema_long = series_column(df, 'ema_50', 0)
+        adx = series_column(df, 'adx', 0)
+
+        buy = (ema_short > ema_long) & (adx > self.adx_min)
+        sell = (ema_short < ema_long) & (adx > self.adx_min)
+        actions = np.select([buy, sell], ["BUY", "SELL"], "HOLD")
+        confidence = np.where(buy | sell, np.minimum(adx / 50, 1.0), 0.0)
+        return actions, confidence
+
     def calculate_entry_params(self, signal: Signal, wallet_balance: float) -> Dict[str, Any]:
         """
         Trend strategies use wider stops (ATR * 2) and try to ride the wave.
@@ -0,0 +1,112 @@
+import asyncio
+import sys
+import os
+import time
+import numpy as np
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from benchmark_indicators import make_candles
+from strategies.registry import compute_indicators
+from antigravity_quantum.backtest.engine import BacktestEngine
+from antigravity_quantum.backtest.parallel import ParallelBacktestRunner
+from antigravity_quantum.backtest.legacy import backtest_squeeze_velocity
+from antigravity_quantum.data.stream import HISTORICAL_INDICATORS
+from antigravity_quantum.strategies.trend import TrendFollowingStrategy
+from antigravity_quantum.strategies.scalping import ScalpingStrategy
+from antigravity_quantum.strategies.grid import GridTradingStrategy
+from antigravity_quantum.strategies.mean_reversion import MeanReversionStrategy
+from antigravity_quantum.strategies.base import check_series_parity
+
+STRATEGIES = (TrendFollowingStrategy, ScalpingStrategy, GridTradingStrategy, MeanReversionStrategy)
+
+def same_result(loop: dict, vec: dict, tol: float = 1e-9) -> bool:
+    if loop['trades'] != vec['trades'] or abs(loop['final_balance'] - vec['final_balance']) > tol * loop['final_balance']:
+        return False
+    return all(a['type'] == b['type'] and a['time'] == b['time'] and abs(a['balance'] - b['balance']) <= tol * abs(a['balance']) + 1e-12
+               for a, b in zip(loop['history'], vec['history']))
+
+async def run_benchmark(days: int = 90):
+    """One asset, `days` of 15m candles: bar-by-bar loop vs. vectorized backtest."""
+    rng = np.random.default_rng(21)
+    n = days * 96
+    df = make_candles(n, rng)
+    df['close'] = df['close'] + 300 * np.sin(np.arange(n) / 40) # Ranges + trends -> trades for every strategy
+    compute_indicators(df, HISTORICAL_INDICATORS)
+
+    engine = BacktestEngine(['BENCHUSDT'])
+    print(f"⏱️ Backtest: Loop vs Vectorized ({days} days, {n:,} candles)")
+    print("〰️" * 30)
+    for strategy_cls in STRATEGIES:
+        start = time.perf_counter()
+        loop = await engine.backtest_asset('BENCHUSDT', strategy_cls(), df, vectorized=False)
+        t_loop = time.perf_counter() - start
+
+        t_vec = float('inf')
+        for _ in range(5): # Best of 5 (ms-scale, sensitive to GC after the loop)
+            start = time.perf_counter()
+            vec = await engine.backtest_asset('BENCHUSDT', strategy_cls(), df, vectorized=True)
+            t_vec = min(t_vec, time.perf_counter() - start)
+
+        icon = '✅' if same_result(loop, vec) else '❌'
+        print(f"   {icon} {strategy_cls.__name__:<24} loop {t_loop:7.2f} s | vectorized {t_vec * 1000:6.1f} ms | "
+              f"x{t_loop / t_vec:,.0f} | {vec['trades']} trades, ${vec['final_balance']:,.2f}")
+
+async def run_parity_check(n: int = 600, seeds: int = 3):
+    """analyze_series()[-1] == analyze() on every prefix, for every strategy."""
+    rng = np.random.default_rng(5)
+    print(f"\n🔎 analyze_series Parity ({seeds} x {n:,} candles, every prefix)")
+    print("〰️" * 30)
+    for strategy_cls in STRATEGIES:
+        mismatches = 0
+        for _ in range(seeds):
+            df = make_candles(n, rng)
+            df['close'] = df['close'] + 300 * np.sin(np.arange(n) / rng.uniform(10, 60))
+            compute_indicators(df, HISTORICAL_INDICATORS)
+            mismatches += len(await check_series_parity(strategy_cls(), df))
+        print(f"   {'✅' if mismatches == 0 else '❌'} {strategy_cls.__name__:<24} {mismatches} mismatching rows")
+
+def run_parallel_benchmark(assets: int = 12, days: int = 7, vectorized: bool = False):
+    """12 assets x 3 strategies: 1 worker vs. one per CPU core (loop mode = CPU-bound cells)."""
+    rng = np.random.default_rng(8)
+    histories = {}
+    for i in range(assets):
+        df = make_candles(days * 96, rng)
+        df['close'] = df['close'] + 300 * np.sin(np.arange(len(df)) / rng.uniform(10, 60))
+        histories[f"A{i}USDT"] = compute_indicators(df, HISTORICAL_INDICATORS)
+    strategies = {cls.__name__: cls() for cls in (ScalpingStrategy, GridTradingStrategy, MeanReversionStrategy)}
+
+    cores = os.cpu_count() or 1
+    print(f"\n⏱️ Parallel Runner: {assets} assets x {len(strategies)} strategies ({days} days, {'vectorized' if vectorized else 'loop'})")
+    print("〰️" * 30)
+    timings = {}
+    outputs = {}
+    for workers in sorted({1, cores}):
+        runner = ParallelBacktestRunner(strategies, workers=workers, vectorized=vectorized)
+        outputs[workers] = runner.summary(runner.run(histories))
+        timings[workers] = runner.elapsed
+        print(f"   {workers:>2} worker(s): {runner.elapsed:6.2f} s | x{timings[1] / runner.elapsed:.1f}")
+    print(f"   {'✅' if outputs[1] == outputs[cores] else '❌'} Same comparative table on {cores} core(s)")
+
+def run_legacy_benchmark(days: int = 365, assets: int = 3):
+    """Legacy StrategyEngine signals + long/short simulation over `days` of 15m candles per asset."""
+    rng = np.random.default_rng(11)
+    n = days * 96
+    print(f"\n⏱️ Squeeze & Velocity Backtest: {days} days of 15m ({n:,} candles) per asset")
+    print("〰️" * 30)
+    for i in range(assets):
+        df = make_candles(n, rng)
+        start = time.perf_counter()
+        result = backtest_squeeze_velocity(df)
+        elapsed = time.perf_counter() - start
+        print(f"   Asset {i + 1}: {elapsed * 1000:7.1f} ms | {result['trades']} trades | {result['spot_signals']} spot signals | ROI {result['roi']:+.2f}%")
+
+async def main():
+    await run_benchmark()
+    await run_parity_check()
+    run_legacy_benchmark()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    run_parallel_benchmark()
@@ -0,0 +1,75 @@
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from utils.execution import ExecutionDispatcher
+
+ROUND_TRIP_S = 0.05 # Simulated exchange latency per REST call
+CALLS_PER_ORDER = 4 # Balance + ticker + entry + SL/TP batch (positions come from the account stream)
+
+class _ExchangeStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive: sessions reuse their pooled connection
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(ROUND_TRIP_S)
+        body = b'{"status": "FILLED"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class _StandInSession:
+    """TradingSession stand-in: same call pattern as execute_long_position, over its own HTTP pool."""
+    def __init__(self, chat_id: int, url: str):
+        self.chat_id = chat_id
+        self.url = url
+        self.http = requests.Session()
+
+    def execute_long_position(self, symbol, atr=None):
+        for _ in range(CALLS_PER_ORDER):
+            self.http.post(self.url, json={"symbol": symbol}).raise_for_status()
+        return True, f"Long {symbol}"
+
+def run_benchmark(session_counts=(1, 10, 100)):
+    """Signal -> fill latency of the last session: one-by-one loop vs. ExecutionDispatcher fan-out."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ExchangeStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/fapi/v1/order"
+    dispatcher = ExecutionDispatcher()
+
+    print(f"⏱️ Signal Fan-out ({CALLS_PER_ORDER} calls x {ROUND_TRIP_S * 1000:.0f} ms per order, {dispatcher.workers} workers)")
+    print("〰️" * 30)
+    for n in session_counts:
+        sessions = [_StandInSession(i, url) for i in range(n)]
+        for s in sessions: # Warm the connection pools (steady state of a running bot)
+            s.execute_long_position("BTCUSDT")
+
+        start = time.perf_counter()
+        for s in sessions:
+            s.execute_long_position("BTCUSDT")
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = dispatcher.fan_out((s, s.execute_long_position, "BTCUSDT") for s in sessions)
+        t_fan = time.perf_counter() - start
+
+        icon = '✅' if all(r == (True, "Long BTCUSDT") for r in results) else '❌'
+        print(f"   {icon} {n:>3} sessions | sequential {t_loop:6.2f} s | fan-out {t_fan:5.2f} s | x{t_loop / t_fan:,.1f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,139 @@
+import sys
+import os
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from strategies.indicators import calculate_wma, calculate_hma
+from strategies.registry import RegistryIndicatorState, compute_indicators, compute_indicators_batch
+from strategies.engine import StrategyEngine
+
+def wma_rolling_apply(series: pd.Series, period: int) -> pd.Series:
+    """Previous implementation (Python lambda per row), kept as the reference."""
+    return series.rolling(period).apply(lambda x: ((x * np.arange(1, period + 1)).sum()) / (np.arange(1, period + 1).sum()), raw=True)
+
+def hma_rolling_apply(series: pd.Series, period: int = 55) -> pd.Series:
+    half_period = int(period / 2)
+    sqrt_period = int(np.sqrt(period))
+    raw_hma = (2 * wma_rolling_apply(series, half_period)) - wma_rolling_apply(series, period)
+    return wma_rolling_apply(raw_hma, sqrt_period)
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(sizes=(200, 100_000), period: int = 55):
+    rng = np.random.default_rng(42)
+    print(f"⏱️ WMA/HMA Benchmark (period {period})")
+    print("〰️" * 30)
+
+    for n in sizes:
+        close = pd.Series(40000 + rng.normal(0, 50, n).cumsum())
+        repeat = 20 if n <= 1000 else 2
+
+        # Same output (bit-for-bit, NaN warmup included)
+        ref = hma_rolling_apply(close, period)
+        new = calculate_hma(close, period)
+        identical = np.array_equal(ref.values, new.values, equal_nan=True)
+
+        for name, old_fn, new_fn in (
+            ("WMA", lambda: wma_rolling_apply(close, period), lambda: calculate_wma(close, period)),
+            ("HMA", lambda: hma_rolling_apply(close, period), lambda: calculate_hma(close, period)),
+        ):
+            t_old = best_of(old_fn, repeat)
+            t_new = best_of(new_fn, repeat)
+            print(f"   {name} n={n:>7,}: rolling.apply {t_old * 1000:9.2f} ms | numpy {t_new * 1000:7.2f} ms | x{t_old / t_new:,.0f}")
+
+        print(f"   {'✅' if identical else '❌'} n={n:,}: HMA output identical to rolling.apply")
+
+def make_candles(n: int, rng) -> pd.DataFrame:
+    close = 40000 + rng.normal(0, 50, n).cumsum()
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(n) * 900_000, unit='ms'),
+        'open': close + rng.normal(0, 5, n),
+        'high': close + np.abs(rng.normal(0, 20, n)),
+        'low': close - np.abs(rng.normal(0, 20, n)),
+        'close': close,
+        'volume': np.abs(rng.normal(1000, 100, n))
+    })
+
+def run_incremental_benchmark(sizes=(200, 2_000, 20_000)):
+    """Cost of ONE new candle: full StrategyEngine recompute vs. incremental update."""
+    rng = np.random.default_rng(7)
+    print("\n⏱️ New Candle Cost: Batch vs Incremental (StrategyEngine indicators)")
+    print("〰️" * 30)
+
+    for n in sizes:
+        df = make_candles(n + 1, rng)
+        state = RegistryIndicatorState.from_dataframe(df.iloc[:n], columns=StrategyEngine.REQUIRED_INDICATORS)
+        candle = df.iloc[n].to_dict()
+
+        t_batch = best_of(lambda: StrategyEngine(df).calculate_indicators(), 3)
+        t_inc = best_of(lambda: state.update(candle), 20) # Same candle -> replaced, state stays valid
+        print(f"   n={n:>6,}: batch {t_batch * 1000:8.2f} ms | incremental {t_inc * 1000:6.3f} ms | x{t_batch / t_inc:,.0f}")
+
+def run_batch_benchmark(universes=(22, 300), n: int = 500):
+    """Whole asset universe: one compute_indicators() per asset vs. one batch over (assets x time) matrices."""
+    rng = np.random.default_rng(11)
+    columns = StrategyEngine.REQUIRED_INDICATORS
+    print(f"\n⏱️ Asset Universe: Per-Asset vs Batch Indicators ({n} candles)")
+    print("〰️" * 30)
+
+    for assets in universes:
+        # Uneven histories (recent listings) -> right-aligned NaN padding in the batch
+        frames = {f"A{i}USDT": make_candles(n - (i % 5) * 40, rng) for i in range(assets)}
+
+        per_asset = lambda: {s: compute_indicators(df.copy(), columns) for s, df in frames.items()}
+        t_loop = best_of(per_asset, 3)
+        t_batch = best_of(lambda: compute_indicators_batch(frames, columns), 3)
+
+        ref, out = per_asset(), compute_indicators_batch(frames, columns)
+        worst = max(
+            np.nanmax(np.abs(ref[s][c].to_numpy(float) - out[s][c].to_numpy(float)), initial=0.0)
+            for s in frames for c in columns
+        )
+        print(f"   {assets:>4} assets: per-asset {t_loop * 1000:8.1f} ms | batch {t_batch * 1000:7.1f} ms | x{t_loop / t_batch:,.1f} | max |diff| {worst:.1e}")
+
+def traced_allocation(fn) -> int:
+    """Peak bytes allocated by one call of fn (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        return peak - base
+    finally:
+        tracemalloc.stop()
+
+def run_analysis_benchmark(sizes=(200, 1_000)):
+    """Cost of ONE StrategyEngine.analyze(): DataFrame copy + new columns vs. zero-copy arrays/buffers."""
+    rng = np.random.default_rng(3)
+    print("\n⏱️ StrategyEngine.analyze(): Copy vs Zero-Copy")
+    print("〰️" * 30)
+
+    for n in sizes:
+        df = make_candles(n, rng)
+        for label, kwargs in (("batch", {}), ("pipeline", {"symbol": f"BENCH{n}", "timeframe": "15m"})):
+            copy_fn = lambda: StrategyEngine(df, zero_copy=False, **kwargs).analyze()
+            zero_fn = lambda: StrategyEngine(df, zero_copy=True, **kwargs).analyze()
+            zero_fn() # Warm up: buffers allocated / pipeline seeded once
+
+            t_copy, t_zero = best_of(copy_fn, 10), best_of(zero_fn, 10)
+            m_copy, m_zero = traced_allocation(copy_fn), traced_allocation(zero_fn)
+            print(f"   n={n:>5,} {label:<8}: copy {t_copy * 1000:6.2f} ms / {m_copy / 1024:7.0f} KiB | "
+                  f"zero-copy {t_zero * 1000:6.2f} ms / {m_zero / 1024:6.0f} KiB | x{t_copy / t_zero:.1f} time, x{m_copy / max(m_zero, 1):.1f} memory")
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_incremental_benchmark()
+    run_batch_benchmark()
+    run_analysis_benchmark()
@@ -1,7 +1,11 @@
 import os
+import time
 import yfinance as yf
 import pandas as pd
 from binance.client import Client
+from antigravity_quantum.config import USE_CANDLE_STORE, USE_CANDLE_CACHE
+from antigravity_quantum.data.cache import candle_cache
+from antigravity_quantum.data.store import get_candle_store
 
 # Initialize Binance Client
 # Use environment variables if present, otherwise default to public mode
@@ -90,9 +94,64 @@ def resolve_symbol(text):
         
     return s
 
+def _klines_to_df(klines) -> pd.DataFrame:
+    """Binance Klines (lista cruda) -> DataFrame OHLCV."""
+    df = pd.DataFrame(klines, columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume', 
+        'close_time', 'quote_asset_volume', 'number_of_trades', 
+        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+    ])
+    df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = df[col].astype(float)
+    return df
+
+def _fetch_binance_candles(binance_client, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+    """
+    Descarga velas de Binance pasando por el Candle Store local.
+    Solo se piden las velas posteriores a la última guardada (delta fetch);
+    la ventana completa se descarga únicamente en frío o tras un hueco mayor que 'limit'.
+    Si el store falla, se hace la descarga completa de siempre.
+    """
+    if not USE_CANDLE_STORE:
+        return _klines_to_df(binance_client.get_klines(symbol=symbol, interval=timeframe, limit=limit))
+
+    store = get_candle_store('binance')
+    try:
+        since = store.plan_fetch(symbol, timeframe, limit, now_ms=int(time.time() * 1000))
+    except Exception as e:
+        print(f"⚠️ Candle Store read failed for {symbol} ({e}). Full fetch.")
+        return _klines_to_df(binance_client.get_klines(symbol=symbol, interval=timeframe, limit=limit))
+
+    if since is None:
+        klines = binance_client.get_klines(symbol=symbol, interval=timeframe, limit=limit)
+    else:
+        klines = binance_client.get_klines(symbol=symbol, interval=timeframe, startTime=since, limit=limit)
+
+    try:
+        store.write(symbol, timeframe, klines)
+        return store.load_frame(symbol, timeframe, limit=limit)
+    except Exception as e:
+        print(f"⚠️ Candle Store write failed for {symbol} ({e}). Full fetch.")
+        if since is None:
+            return _klines_to_df(klines)
+        return _klines_to_df(binance_client.get_klines(symbol=symbol, interval=timeframe, limit=limit))
+
 def get_market_data(symbol: str, timeframe: str = '15m', limit: int = 100) -> pd.DataFrame:
     """
     Fetches market data from Binance (Crypto) or YFinance (Stocks).
+    Goes through the shared candle cache: repeated calls for the same
+    (symbol, timeframe, limit) within one candle hit memory, and concurrent
+    calls are coalesced into a single exchange request.
+    """
+    if not USE_CANDLE_CACHE:
+        return _get_market_data_uncached(symbol, timeframe, limit)
+    return candle_cache.get_or_fetch(symbol, timeframe, limit, lambda: _get_market_data_uncached(symbol, timeframe, limit))
+
+def _get_market_data_uncached(symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+    """
+    Fetch real (sin caché) desde Binance (Crypto) o YFinance (Stocks).
     """
     expected_cols = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
     
@@ -109,14 +168,14 @@ def get_market_data(symbol: str, timeframe: str = '15m', limit: int = 100) -> pd
             if not client:
                 return pd.DataFrame(columns=expected_cols)
                 
-            # Fetch Klines
+            # Fetch Klines (Delta fetch via Candle Store)
             try:
-                klines = client.get_klines(symbol=symbol, interval=timeframe, limit=limit)
+                df = _fetch_binance_candles(client, symbol, timeframe, limit)
             except Exception as e:
                 print(f"⚠️ Authenticated fetch failed for {symbol} ({e}). Retrying with Public Client...")
                 try:
                     public_client = Client(tld='com', requests_params=request_params)
-                    klines = public_client.get_klines(symbol=symbol, interval=timeframe, limit=limit)
+                    df = _fetch_binance_candles(public_client, symbol, timeframe, limit)
                 except Exception as e2:
                      print(f"❌ Public fetch also failed for {symbol}: {e2}")
                      try:
@@ -140,19 +199,8 @@ def get_market_data(symbol: str, timeframe: str = '15m', limit: int = 100) -> pd
                          print(f"❌ YF Fallback failed: {ex_yf}")
                      return pd.DataFrame(columns=expected_cols)
             
-            if klines is None or len(klines) == 0:
+            if df is None or df.empty:
                 return pd.DataFrame(columns=expected_cols)
-            
-            # Binance Klines to DF
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume', 
-                'close_time', 'quote_asset_volume', 'number_of_trades', 
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = df[col].astype(float)
             return df
 
         # --- STOCK (ALPACA or YFINANCE) ---
@@ -0,0 +1,28 @@
+import asyncio
+import sys
+import os
+import argparse
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from antigravity_quantum.backtest.event_replay import EventReplay
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replays recorded candles through the live QuantumEngine (virtual time).")
+    parser.add_argument('symbols', nargs='*', default=['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT', 'ADAUSDT'])
+    parser.add_argument('--root', default=None, help="Candle store directory (see record_candles.py)")
+    parser.add_argument('--dispatch', action='store_true', help="Also print each signal as it is dispatched")
+    args = parser.parse_args()
+
+    dispatch = (lambda s: print(f"⚡ REPLAY DISPATCH: {s.action} on {s.symbol} @ {s.price:.4f}")) if args.dispatch else None
+    replay = EventReplay(args.symbols, root=args.root, dispatch=dispatch)
+    signals = await replay.run()
+    replay.print_report()
+    if not signals.empty:
+        print(signals.tail(10).to_string(index=False))
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
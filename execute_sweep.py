@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import os
+import numpy as np
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from antigravity_quantum.backtest.parallel import load_histories
+from antigravity_quantum.backtest.sweep import ParameterSweep
+from antigravity_quantum.backtest.robustness import WalkForward, monte_carlo, print_distribution
+from antigravity_quantum.strategies.scalping import ScalpingStrategy
+from antigravity_quantum.strategies.grid import GridTradingStrategy
+from antigravity_quantum.strategies.mean_reversion import MeanReversionStrategy
+
+# Parameter ranges per strategy (defaults: RSI 52/48 + ADX 20, spacing 1%, RSI 30/70 + BB 2.0)
+SWEEPS = {
+    ScalpingStrategy: {
+        'rsi_long': range(50, 61),
+        'rsi_short': range(40, 51),
+        'adx_min': range(15, 40, 5)
+    },
+    GridTradingStrategy: {
+        'grid_spacing_pct': np.round(np.arange(0.0025, 0.0301, 0.0025), 4)
+    },
+    MeanReversionStrategy: {
+        'rsi_oversold': np.arange(20, 40.1, 2.5),
+        'rsi_overbought': np.arange(60, 80.1, 2.5),
+        'bb_std': np.arange(1.5, 3.01, 0.25)
+    }
+}
+
+async def main():
+    try:
+        assets = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT', 
+                  'ADAUSDT', 'LTCUSDT', 'LINKUSDT', 'DOGEUSDT', 'AVAXUSDT', 
+                  'ZECUSDT', 'SUIUSDT']
+        capital_per_asset = 1000.0 / len(assets)
+        days = 90
+
+        # History + indicators: once per asset, shared by every combination
+        histories = await load_histories(assets, days=days)
+
+        for strategy_cls, grid in SWEEPS.items():
+            # --walk-forward: optimize per fold, score out-of-sample + Monte Carlo of those trades
+            if '--walk-forward' in sys.argv:
+                wf = WalkForward(strategy_cls, grid, folds=4, initial_capital=capital_per_asset)
+                wf.print_report(wf.run(histories))
+                print_distribution(f"{strategy_cls.__name__} (out-of-sample trades)",
+                                   monte_carlo(wf.returns, n_sims=10_000, initial_capital=capital_per_asset))
+                continue
+            sweep = ParameterSweep(strategy_cls, grid, initial_capital=capital_per_asset)
+            sweep.print_report(sweep.run(histories))
+
+    except Exception as e:
+        print(f"❌ CRITICAL ERROR IN SWEEP: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
@@ -11,11 +11,14 @@ from dotenv import load_dotenv
 
 # Importar módulos internos
 from data.fetcher import get_market_data, resolve_symbol
+from antigravity_quantum.data.cache import candle_cache
+from antigravity_quantum.core.scheduler import CandleScheduler
 from antigravity_quantum.config import ENABLED_STRATEGIES, DISABLED_ASSETS
 
 from strategies.engine import StrategyEngine
 from strategies.shark_mode import SharkSentinel
 from utils.trading_manager import SessionManager
+from utils.execution import execution_dispatcher
 from utils.personalities import PersonalityManager
 from utils.system_state_manager import SystemStateManager 
 from utils.ai_analyst import QuantumAnalyst 
@@ -131,7 +134,7 @@ def process_asset(asset):
             return False, "No Data"
         
         # 2. Análisis Micro (Spot + Futuros)
-        engine = StrategyEngine(df)
+        engine = StrategyEngine(df, symbol=asset, timeframe='15m')
         res = engine.analyze()
         
         # --- 3. LAZY FETCHING (MTF - 1H) ---
@@ -812,6 +815,17 @@ def handle_debug(message):
     except:
         ai_status = "❌ Error"
 
+    # 4. Candle Cache (compartida Bot + Quantum)
+    cs = candle_cache.stats()
+    cache_status = f"{cs['hits']} hit / {cs['misses']} miss / {cs['coalesced']} coalesced ({cs['hit_rate']:.0%})"
+
+    # 5. Ciclo Quantum (escaneo concurrente)
+    cyc = quantum_bridge.engine.cycle_stats if quantum_bridge else {}
+    if cyc:
+        cycle_status = f"{cyc['wall_s']:.2f}s ({cyc['assets']} activos, secuencial {cyc['serial_s']:.2f}s, x{cyc['speedup']:.1f})"
+    else:
+        cycle_status = "Sin datos"
+
     # Report Build
     report = (
         "🕵️ *DIAGNÓSTICO QUANTUM*\n"
@@ -824,7 +838,9 @@ def handle_debug(message):
         "🧠 *COGNICIÓN*\n"
         f"`Feed :` {pub_status}\n"
         f"`Motor:` {strat_status}\n"
-        f"`IA   :` {ai_status}\n\n"
+        f"`IA   :` {ai_status}\n"
+        f"`Cache:` {cache_status}\n"
+        f"`Ciclo:` {cycle_status}\n\n"
         
         "🔑 *CREDENCIALES*\n"
         f"`🔶 Binance:` {has_bin}  `🦙 Alpaca:` {has_alp}"
@@ -1103,6 +1119,9 @@ def run_trading_loop():
     last_alert_prices = {}
     last_signals = {} # Tracks 'BUY', 'SELL' etc per asset
 
+    # Scheduler: process_asset analiza velas de 15m -> solo re-escanear tras cada cierre
+    scheduler = CandleScheduler(lambda asset: '15m')
+
     while True:
         # QUANTUM BYPASS
         if USE_QUANTUM_ENGINE:
@@ -1110,19 +1129,30 @@ def run_trading_loop():
             time.sleep(30)
             continue
             
+        active_assets = []
         try:
+            # Activos de Grupos Activos cuya vela de 15m ya cerró
+            active_assets = [a for g, assets in ASSET_GROUPS.items() if GROUP_CONFIG.get(g, False) for a in assets]
+            due_assets = set(scheduler.due(active_assets))
+            scheduler.mark_scanned(due_assets)
+
             # Iterar Grupos Activos
             for group_name, assets in ASSET_GROUPS.items():
                 if not GROUP_CONFIG.get(group_name, False):
                     continue
                     
                 for asset in assets:
+                    if asset not in due_assets:
+                        continue
                     try:
                         current_time = time.time()
                         
                         # 1. PROCESS FIRST (Always Monitor)
                         success, res = process_asset(asset)
-                        if not success: continue
+                        if not success:
+                            if res != "Asset in Blacklist":
+                                scheduler.mark_failed([asset])
+                            continue
                         
                         m = res['metrics']
                         curr_price = m['close']
@@ -1174,9 +1204,9 @@ def run_trading_loop():
                                 f"Razón: {res['reason_spot']}"
                             )
                             
-                            # Iterate Sessions
+                            # Deliver to every session at once (PILOT buys execute in parallel)
                             all_sessions = session_manager.get_all_sessions()
-                            for session in all_sessions:
+                            def deliver_spot(session):
                                 mode = session.config.get('mode', 'WATCHER')
                                 cid = session.chat_id
                                 
@@ -1207,6 +1237,7 @@ def run_trading_loop():
                                     # WATCHER
                                     bot.send_message(cid, base_msg, parse_mode='Markdown')
 
+                            execution_dispatcher.fan_out((s, deliver_spot, s) for s in all_sessions)
                             continue # Stop here for Spot signals
                             
                         # FUTUROS ALERTS (Con State)
@@ -1276,8 +1307,10 @@ def run_trading_loop():
                         # We cannot prepare a single text because each session might have a different personality.
                         # We defer message generation to the dispatch loop.
 
-                        # Dispatch
-                        for session in all_sessions:
+                        # Dispatch: one job per session, all sessions concurrently.
+                        # deliver() returns the asset state it observed (or None); shared state
+                        # (pos_state) is only written here, after fan_out, on this thread.
+                        def deliver(session):
                             mode = session.mode
                             cid = session.chat_id
                             p_key = session.config.get('personality', 'NEXUS')
@@ -1329,9 +1362,8 @@ def run_trading_loop():
                                         ok, res_msg = session.execute_close_position(asset)
                                         # PHANTOM CLOSE CHECK
                                         if not ok and "No open position" in res_msg:
-                                            # Silent correct
-                                            pos_state[asset] = 'NEUTRAL'
-                                            continue 
+                                            # Silent correct (applied after fan_out)
+                                            return 'NEUTRAL'
                                         
                                     # Dynamic Pilot Action Msg (Generic wrapper)
                                     final_msg = f"🤖 **PILOT ACTION**\n{res_msg}"
@@ -1384,13 +1416,16 @@ def run_trading_loop():
                             except Exception as e:
                                 print(f"Error dispatching to {cid}: {e}")
 
-                        # 3. PROCESS CIRCUIT BREAKER (Safety)
-                        triggered, msg = session.check_circuit_breaker()
-                        if triggered:
-                             # Dynamic Message
-                             p_key = session.config.get('personality', 'NEXUS')
-                             cb_msg = personality_manager.get_message(p_key, 'CB_TRIGGER')
-                             bot.send_message(cid, cb_msg, parse_mode='Markdown')
+                            # 3. PROCESS CIRCUIT BREAKER (Safety)
+                            triggered, msg = session.check_circuit_breaker()
+                            if triggered:
+                                 # Dynamic Message
+                                 cb_msg = personality_manager.get_message(p_key, 'CB_TRIGGER')
+                                 bot.send_message(cid, cb_msg, parse_mode='Markdown')
+
+                        outcomes = execution_dispatcher.fan_out((s, deliver, s) for s in all_sessions)
+                        if 'NEUTRAL' in outcomes:
+                            pos_state[asset] = 'NEUTRAL'
 
                     except Exception as e:
                         print(f"⚠️ Error procesando {asset}: {e}")
@@ -1403,7 +1438,8 @@ def run_trading_loop():
         except Exception as e:
             print(f"❌ Error CRÍTICO en bucle de trading: {e}")
             
-        time.sleep(60)
+        # Dormir hasta el próximo cierre (máx. 60s para detectar cambios de /toggle)
+        time.sleep(min(60, scheduler.seconds_until_next(active_assets)) if active_assets else 60)
 
 # --- QUANTUM BRIDGE INTEGRATION ---
 from antigravity_quantum.bridge import QuantumBridge
@@ -1437,10 +1473,10 @@ def dispatch_quantum_signal(signal):
         
         if not action_needed: return
 
-        # Iterate Sessions
+        # Iterate Sessions: one job per session, all sessions concurrently
         all_sessions = session_manager.get_all_sessions()
         
-        for session in all_sessions:
+        def deliver(session):
             mode = session.config.get('mode', 'WATCHER')
             cid = session.chat_id
             p_key = session.config.get('personality', 'NEXUS')
@@ -1460,7 +1496,7 @@ def dispatch_quantum_signal(signal):
                 # Decision: SUPPRESS "Closing Position" message if no position exists.
                 # Maybe send a generic "Sell Signal" instead? 
                 # For now, let's suppress to avoid confusion as requested.
-                continue 
+                return 
 
             # Prepare Message
             msg_text = ""
@@ -1510,6 +1546,8 @@ def dispatch_quantum_signal(signal):
             except Exception as e:
                 print(f"⚠️ Dispatch Error {cid}: {e}")
 
+        execution_dispatcher.fan_out((s, deliver, s) for s in all_sessions)
+
     except Exception as e:
         print(f"❌ Quantum Dispatch Critical: {e}")
 
@@ -0,0 +1,32 @@
+import asyncio
+import sys
+import os
+import argparse
+
+# Ensure root is in path
+sys.path.append(os.getcwd())
+
+from antigravity_quantum.data.replay import CandleRecorder
+
+async def main():
+    parser = argparse.ArgumentParser(description="Records live candles to disk for offline replays/backtests.")
+    parser.add_argument('symbols', nargs='*', default=['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT', 'ADAUSDT'])
+    parser.add_argument('--days', type=int, default=0, help="History to backfill first (days)")
+    parser.add_argument('--duration', type=float, default=None, help="Stop after N seconds (default: until Ctrl+C)")
+    parser.add_argument('--root', default=None, help="Store directory (default: CANDLE_STORE_DIR)")
+    args = parser.parse_args()
+
+    recorder = CandleRecorder(args.symbols, root=args.root)
+    print(f"📼 Recording {len(args.symbols)} symbols -> {recorder.store.root}")
+    try:
+        await recorder.run(duration=args.duration, backfill_days=args.days)
+    finally:
+        print(f"📼 Recorded {recorder.recorded} candles")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
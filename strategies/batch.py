@@ -0,0 +1,199 @@
+"""
+Indicadores en lote sobre matrices 2-D (activos x tiempo).
+Todo el universo de activos se calcula en una sola pasada vectorizada:
+las recursiones (EMA / Wilder) recorren el tiempo una vez con vectores de activos,
+las ventanas móviles usan sliding_window_view sobre el eje temporal.
+Las series más cortas se alinean a la derecha (relleno NaN a la izquierda),
+lo que reproduce exactamente el cálculo por activo de strategies/indicators.py.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Tuple
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Máximo de elementos temporales por bloque en las ventanas ponderadas
+_BLOCK_ELEMENTS = 1 << 21
+
+
+# --- PRIMITIVAS ---
+def ewm2d(x: np.ndarray, com: float = None, span: float = None, alpha: float = None,
+          adjust: bool = True, min_periods: int = 0) -> np.ndarray:
+    """
+    pandas ewm(...).mean() fila a fila. Se delega en el ewm de pandas sobre la
+    traspuesta (una columna por activo): misma recursión, en código compilado.
+    """
+    frame = pd.DataFrame(np.asarray(x, dtype=np.float64).T, copy=False)
+    return frame.ewm(com=com, span=span, alpha=alpha, adjust=adjust, min_periods=min_periods).mean().to_numpy().T
+
+def _windows(x: np.ndarray, period: int) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(x, period, axis=1)
+
+def _rolling(x: np.ndarray, period: int, reducer) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if period <= x.shape[1]:
+        out[:, period - 1:] = reducer(_windows(x, period))
+    return out
+
+def rolling_mean2d(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling(x, period, lambda w: w.mean(axis=-1))
+
+def rolling_std2d(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling(x, period, lambda w: w.std(axis=-1, ddof=1))
+
+def rolling_min2d(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling(x, period, lambda w: w.min(axis=-1))
+
+def rolling_max2d(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling(x, period, lambda w: w.max(axis=-1))
+
+def shift2d(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+def bfill2d(x: np.ndarray) -> np.ndarray:
+    """Rellena hacia atrás a lo largo del tiempo (= Series.bfill por activo)."""
+    n_time = x.shape[1]
+    idx = np.where(np.isnan(x), n_time, np.arange(n_time))
+    idx = np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+    padded = np.concatenate([x, np.full((x.shape[0], 1), np.nan)], axis=1)
+    return np.take_along_axis(padded, idx, axis=1)
+
+def _nan_to_zero(x: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(x), 0.0, x)
+
+def leading_nan2d(x: np.ndarray) -> np.ndarray:
+    """Máscara del relleno de alineación (NaN iniciales de cada fila)."""
+    return np.logical_and.accumulate(np.isnan(x), axis=1)
+
+
+# --- INDICADORES (mismas fórmulas que strategies/indicators.py) ---
+def ema2d(close: np.ndarray, period: int = 200) -> np.ndarray:
+    return ewm2d(close, span=period, adjust=False)
+
+def wma2d(x: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if period < 1 or x.shape[1] < period:
+        return out
+    weights = np.arange(1, period + 1, dtype=np.float64)
+    weight_sum = weights.sum()
+    windows = _windows(x, period)
+    rows = max(1, _BLOCK_ELEMENTS // (windows.shape[1] * period))
+    for start in range(0, x.shape[0], rows):
+        out[start:start + rows, period - 1:] = (windows[start:start + rows] * weights).sum(axis=-1) / weight_sum
+    return out
+
+def hma2d(close: np.ndarray, period: int = 55) -> np.ndarray:
+    half_period = int(period / 2)
+    sqrt_period = int(np.sqrt(period))
+    raw_hma = (2 * wma2d(close, half_period)) - wma2d(close, period)
+    return wma2d(raw_hma, sqrt_period)
+
+def rsi2d(close: np.ndarray, period: int = 14) -> np.ndarray:
+    # ewm con adjust=True: el relleno debe quedar en NaN (no en 0) para no sumar peso
+    pad = leading_nan2d(close)
+    delta = close - shift2d(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gain = np.where(pad, np.nan, np.where(delta > 0, delta, 0.0))
+        loss = np.where(pad, np.nan, np.where(delta < 0, -delta, 0.0))
+        # Una sola recursión para ganancias y pérdidas (apiladas por filas)
+        avg_gain, avg_loss = np.split(ewm2d(np.vstack([gain, loss]), com=period - 1, min_periods=period), 2)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return np.where(pad, np.nan, _nan_to_zero(rsi))
+
+def stoch_rsi2d(rsi: np.ndarray, period: int = 14, k_period: int = 3, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    pad = leading_nan2d(rsi)
+    min_rsi = rolling_min2d(rsi, period)
+    max_rsi = rolling_max2d(rsi, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stoch = np.where(pad, np.nan, _nan_to_zero((rsi - min_rsi) / (max_rsi - min_rsi)) * 100)
+    k_line = rolling_mean2d(stoch, k_period)
+    d_line = rolling_mean2d(k_line, d_period)
+    return _nan_to_zero(k_line), _nan_to_zero(d_line)
+
+def bollinger2d(close: np.ndarray, period: int = 20, std_dev: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    middle = rolling_mean2d(close, period)
+    std = rolling_std2d(close, period)
+    upper = middle + (std * std_dev)
+    lower = middle - (std * std_dev)
+    return (_nan_to_zero(bfill2d(upper)), _nan_to_zero(bfill2d(middle)), _nan_to_zero(bfill2d(lower)))
+
+def true_range2d(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = shift2d(close)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+def atr2d(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return ewm2d(true_range2d(high, low, close), alpha=1 / period, adjust=False)
+
+def keltner2d(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 20, multiplier: float = 1.5):
+    central = ema2d(close, period)
+    atr = atr2d(high, low, close, period)
+    return central + (atr * multiplier), central, central - (atr * multiplier)
+
+def adx2d(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14):
+    tr = true_range2d(high, low, close)
+    up_move = high - shift2d(high)
+    down_move = shift2d(low) - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+        alpha = 1 / period
+        tr_smooth, plus_smooth, minus_smooth = np.split(ewm2d(np.vstack([tr, plus_dm, minus_dm]), alpha=alpha, adjust=False), 3)
+        plus_di = 100 * (plus_smooth / tr_smooth)
+        minus_di = 100 * (minus_smooth / tr_smooth)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = ewm2d(dx, alpha=alpha, adjust=False)
+    return _nan_to_zero(adx), _nan_to_zero(plus_di), _nan_to_zero(minus_di)
+
+
+# --- ALINEACIÓN DEL UNIVERSO ---
+class AssetMatrix:
+    """
+    Universo de activos como matrices (activos x tiempo), alineadas a la derecha
+    (la última vela de cada activo en la última columna).
+    """
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+        self.lengths = np.array([len(frames[s]) for s in self.symbols], dtype=np.int64)
+        n_time = int(self.lengths.max()) if len(self.lengths) else 0
+        self.frames = {s: frames[s] for s in self.symbols}
+        self.columns: Dict[str, np.ndarray] = {}
+
+        for col in OHLCV:
+            mat = np.full((len(self.symbols), n_time), np.nan)
+            for i, s in enumerate(self.symbols):
+                mat[i, n_time - self.lengths[i]:] = frames[s][col].to_numpy(dtype=np.float64)
+            self.columns[col] = mat
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], symbol: str = '') -> "AssetMatrix":
+        """Un solo activo a partir de sus columnas 1-D: matrices (1 x n) que son vistas, sin copia."""
+        matrix = cls.__new__(cls)
+        matrix.symbols = [symbol]
+        matrix.lengths = np.array([len(columns['close'])], dtype=np.int64)
+        matrix.frames = {}
+        matrix.columns = {col: np.asarray(arr, dtype=np.float64)[None, :] for col, arr in columns.items()}
+        return matrix
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self.columns[col]
+
+    def __setitem__(self, col: str, mat: np.ndarray):
+        self.columns[col] = mat
+
+    def __contains__(self, col: str) -> bool:
+        return col in self.columns
+
+    def row(self, symbol: str, col: str) -> np.ndarray:
+        """Vista (sin copia) de la serie de un activo, sin el relleno."""
+        i = self.symbols.index(symbol)
+        return self.columns[col][i, self.columns[col].shape[1] - self.lengths[i]:]
+
+    def frame(self, symbol: str, columns: Iterable[str]) -> pd.DataFrame:
+        """DataFrame del activo: sus velas originales + las columnas pedidas (vistas de las matrices)."""
+        df = self.frames[symbol]
+        # Un solo concat: insertar columna a columna cuesta más que el propio cálculo
+        extra = pd.DataFrame({col: self.row(symbol, col) for col in columns if col not in df.columns}, index=df.index)
+        return pd.concat([df, extra], axis=1, copy=False)
@@ -1,18 +1,22 @@
+import threading
 import pandas as pd
 import numpy as np
 
 # Importar cálculos vectorizados desde indicadores (Principio DRY)
-from strategies.indicators import (
-    calculate_hma,
-    calculate_bollinger_bands,
-    calculate_keltner_channels,
-    calculate_adx,
-    calculate_rsi,
-    calculate_adx_slope,
-    calculate_ema,
-    calculate_stoch_rsi,
-    calculate_atr
-)
+from strategies.indicators import calculate_ema
+from strategies.registry import BASE_COLUMNS, IndicatorBuffers, compute_indicators, indicator_pipeline
+
+# Estado de futuros y filtro MTF de analyze(), en orden de prioridad
+FUTURES_SIGNALS = ('WAIT', 'BUY', 'SHORT', 'CLOSE_LONG', 'CLOSE_SHORT', 'EXIT_ALL')
+MACRO_EMA_PERIOD = 200
+MACRO_BAR_MS = 3_600_000 # 1H
+
+# Buffers de indicadores reutilizados entre escaneos (uno por hilo)
+_analysis_buffers = threading.local()
+
+def _zero_copy_default() -> bool:
+    from antigravity_quantum.config import USE_ZERO_COPY_ANALYSIS
+    return USE_ZERO_COPY_ANALYSIS
 
 class StrategyEngine:
     """
@@ -20,12 +24,40 @@ class StrategyEngine:
     Diseñado para alta eficiencia (Vectorizado con Pandas/Numpy).
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # Columnas que necesita analyze() (el registro resuelve dependencias, ej. stoch -> rsi)
+    REQUIRED_INDICATORS = (
+        'hma_55',                   # 1. HMA (55)
+        'bb_upper', 'bb_lower',     # 2. Bandas de Bollinger (20, 2.0)
+        'kc_upper', 'kc_lower',     # 3. Canales de Keltner (20, 1.5)
+        'adx',                      # 4. ADX (14)
+        'rsi',                      # 5. RSI (14)
+        'atr',                      # 6. ATR (14) - Para Stop Loss Dinámico
+        'ema_200',                  # 7. EMA (200) - Spot
+        'stoch_k', 'stoch_d',       # 8. StochRSI (14, 3, 3) - Spot
+        'vol_sma'                   # 9. Volumen SMA (20)
+    )
+
+    def __init__(self, data: pd.DataFrame, symbol: str = None, timeframe: str = None, zero_copy: bool = None):
         """
         Inicializa con Datos OHLCV.
+        symbol/timeframe (opcional): activa el pipeline compartido de indicadores
+        (cálculo una vez por vela, incremental, reutilizado entre consumidores).
+        zero_copy (por defecto USE_ZERO_COPY_ANALYSIS): no copia `data` ni le añade
+        columnas; los indicadores quedan en self.columns (arrays de solo lectura).
         """
-        self.df = data.copy()
+        self.zero_copy = _zero_copy_default() if zero_copy is None else zero_copy
+        self.df = data if self.zero_copy else data.copy()
+        self.columns = {} # columna -> np.ndarray (velas + indicadores)
         self.metrics = {}
+        self.symbol = symbol
+        self.timeframe = timeframe
+
+    @staticmethod
+    def _buffers() -> IndicatorBuffers:
+        buffers = getattr(_analysis_buffers, 'buffers', None)
+        if buffers is None:
+            buffers = _analysis_buffers.buffers = IndicatorBuffers(StrategyEngine.REQUIRED_INDICATORS)
+        return buffers
         
     def calculate_indicators(self):
         """
@@ -34,41 +66,21 @@ class StrategyEngine:
         if self.df.empty:
             return
 
-        # --- INDICADORES COMUNES & FUTUROS ---
-        # 1. HMA (55)
-        self.df['hma_55'] = calculate_hma(self.df['close'], period=55)
-        
-        # 2. Bandas de Bollinger (20, 2.0)
-        bb = calculate_bollinger_bands(self.df['close'], period=20, std_dev=2.0)
-        self.df['bb_upper'] = bb['upper']
-        self.df['bb_lower'] = bb['lower']
-        
-        # 3. Canales de Keltner (20, 1.5)
-        kc = calculate_keltner_channels(self.df, period=20, multiplier=1.5)
-        self.df['kc_upper'] = kc['upper']
-        self.df['kc_lower'] = kc['lower']
-        
-        # 4. ADX (14)
-        adx_df = calculate_adx(self.df, period=14)
-        self.df['adx'] = adx_df['adx']
-        
-        # 5. RSI (14)
-        self.df['rsi'] = calculate_rsi(self.df['close'], period=14)
-        
-        # 6. ATR (14) - Para Stop Loss Dinámico
-        self.df['atr'] = calculate_atr(self.df, period=14)
-
-        # --- INDICADORES EXTRA PARA SPOT ---
-        # 7. EMA (200)
-        self.df['ema_200'] = calculate_ema(self.df['close'], period=200)
-
-        # 8. StochRSI (14, 3, 3)
-        stoch = calculate_stoch_rsi(self.df['rsi'], period=14, k_period=3, d_period=3)
-        self.df['stoch_k'] = stoch['k']
-        self.df['stoch_d'] = stoch['d']
+        if not self.zero_copy:
+            if self.symbol:
+                indicator_pipeline.compute(self.symbol, self.timeframe, self.df, self.REQUIRED_INDICATORS)
+            else:
+                compute_indicators(self.df, self.REQUIRED_INDICATORS)
+            self.columns = {col: self.df[col].to_numpy() for col in self.df.columns if col != 'timestamp'}
+            return
 
-        # 9. Volumen SMA (20)
-        self.df['vol_sma'] = self.df['volume'].rolling(20).mean()
+        # Zero-copy: columnas OHLCV leídas como vistas, indicadores en buffers reutilizados
+        candles = {col: self.df[col].to_numpy(dtype=np.float64) for col in BASE_COLUMNS}
+        if self.symbol:
+            indicators = indicator_pipeline.arrays(self.symbol, self.timeframe, self.df, self.REQUIRED_INDICATORS)
+        else:
+            indicators = self._buffers().compute(candles)
+        self.columns = {**candles, **indicators}
 
     def analyze(self) -> dict:
         """
@@ -86,8 +98,10 @@ class StrategyEngine:
 
         self.calculate_indicators()
         
-        curr = self.df.iloc[-1]
-        prev = self.df.iloc[-2]
+        # Acceso escalar a los arrays (sin construir filas de pandas)
+        cols = self.columns
+        curr = {col: arr[-1] for col, arr in cols.items()}
+        prev = {col: arr[-2] for col, arr in cols.items()}
         
         # --- 1. ANÁLISIS SPOT (Mean Reversion) ---
         # Precio < BB Inferior Y RSI < 40 Y StochRSI Cruce Alcista en zona baja (<20)
@@ -115,7 +129,7 @@ class StrategyEngine:
         # Definiciones
         is_squeeze = (curr['bb_upper'] < curr['kc_upper']) and (curr['bb_lower'] > curr['kc_lower'])
         # Squeeze reciente (últimas 5 velas)
-        recent_squeeze = any((self.df['bb_upper'].iloc[i] < self.df['kc_upper'].iloc[i]) for i in range(-5, -1))
+        recent_squeeze = bool((cols['bb_upper'][-5:-1] < cols['kc_upper'][-5:-1]).any())
         
         breakout_up = (curr['close'] > curr['bb_upper'])
         momentum_bullish = (curr['rsi'] > 50)
@@ -191,6 +205,87 @@ class StrategyEngine:
             "metrics": final_metrics
         }
 
+    def analyze_series(self, mtf: bool = True) -> pd.DataFrame:
+        """
+        analyze() vectorizado sobre TODO el histórico (backtests).
+        Fila i = lo que analyze() devuelve con las velas 0..i (WAIT/False con < 200 velas):
+        - signal_spot (bool), signal_futures (str de FUTURES_SIGNALS)
+        - trend_1h: tendencia macro de macro_trend_series() (filtro MTF de process_asset
+          aplicado a BUY/SHORT si mtf=True)
+        Sin textos de razón. Los indicadores se calculan una vez sobre toda la serie.
+        """
+        n = len(self.df)
+        candles = {col: self.df[col].to_numpy(dtype=np.float64) for col in BASE_COLUMNS}
+        cols = {**candles, **IndicatorBuffers(self.REQUIRED_INDICATORS).compute(candles)}
+
+        def prev(arr):
+            out = np.empty_like(arr)
+            out[0] = np.nan
+            out[1:] = arr[:-1]
+            return out
+
+        close, hma, rsi, adx = cols['close'], cols['hma_55'], cols['rsi'], cols['adx']
+        adx_prev = prev(adx)
+        valid = np.arange(n) >= 199 # Mismo requisito de 200 velas
+
+        # --- SPOT (Mean Reversion) ---
+        stoch_k, stoch_d = cols['stoch_k'], cols['stoch_d']
+        stoch_cross = (prev(stoch_k) < prev(stoch_d)) & (stoch_k > stoch_d) & (stoch_k < 20)
+        spot = valid & (close < cols['bb_lower']) & (rsi < 40) & stoch_cross
+
+        # --- FUTUROS (Squeeze & Velocity) ---
+        # Squeeze reciente: alguna de las 4 velas anteriores con BB superior < KC superior
+        squeezed = np.concatenate([[0], np.cumsum(cols['bb_upper'] < cols['kc_upper'])])
+        idx = np.arange(n)
+        recent_squeeze = squeezed[idx] - squeezed[np.clip(idx - 4, 0, None)] > 0
+
+        adx_rising = adx > adx_prev
+        setup = recent_squeeze | (adx > 20)
+        long_entry = (close > cols['bb_upper']) & (close > hma) & (rsi > 50) & adx_rising & setup
+        short_entry = (close < cols['bb_lower']) & (close < hma) & (rsi < 50) & adx_rising & setup & ~long_entry
+        adx_collapse = (adx_prev > 30) & (adx < 25)
+
+        futures = np.select(
+            [long_entry, short_entry, close < hma, close > hma, adx_collapse],
+            ['BUY', 'SHORT', 'CLOSE_LONG', 'CLOSE_SHORT', 'EXIT_ALL'],
+            default='WAIT'
+        ).astype(object)
+        futures[~valid] = 'WAIT'
+
+        # --- FILTRO MTF (1H): Long no en BEAR, Short no en BULL ---
+        trend_1h = self.macro_trend_series(self.df)
+        if mtf:
+            futures[(futures == 'BUY') & (trend_1h == 'BEAR')] = 'WAIT'
+            futures[(futures == 'SHORT') & (trend_1h == 'BULL')] = 'WAIT'
+
+        return pd.DataFrame({'signal_spot': spot, 'signal_futures': futures, 'trend_1h': trend_1h}, index=self.df.index)
+
+    @staticmethod
+    def macro_trend_series(df: pd.DataFrame) -> np.ndarray:
+        """
+        analyze_macro_trend() en cada vela de `df` (ej. 15m) con la serie 1H remuestreada:
+        la vela 1H en formación cierra al precio actual (como la descarga en vivo) y su
+        EMA 200 parte de la EMA de las horas ya cerradas. NEUTRAL con < 200 velas 1H.
+        """
+        n = len(df)
+        if n == 0:
+            return np.array([], dtype=object)
+        close = df['close'].to_numpy(dtype=np.float64)
+        hours = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64) // MACRO_BAR_MS
+
+        new_hour = np.concatenate([[True], hours[1:] != hours[:-1]])
+        hour_idx = np.cumsum(new_hour) - 1 # Posición de la vela 1H de cada fila
+        last_of_hour = np.concatenate([np.flatnonzero(new_hour[1:]), [n - 1]])
+        ema_closed = calculate_ema(pd.Series(close[last_of_hour]), period=MACRO_EMA_PERIOD).to_numpy()
+
+        alpha = 2 / (MACRO_EMA_PERIOD + 1)
+        ema_before = np.where(hour_idx > 0, ema_closed[np.clip(hour_idx - 1, 0, None)], close)
+        ema_live = np.where(hour_idx > 0, alpha * close + (1 - alpha) * ema_before, close)
+
+        trend = np.select([close > ema_live, close < ema_live], ['BULL', 'BEAR'], default='NEUTRAL').astype(object)
+        trend[hour_idx + 1 < MACRO_EMA_PERIOD] = 'NEUTRAL'
+        return trend
+
     def analyze_macro_trend(self, df_macro: pd.DataFrame) -> str:
         """
         Analiza la tendencia MACRO (ej. 1H o 4H) para filtrar señales.
@@ -1,3 +1,8 @@
+import abc
+import threading
+from collections import deque
+from typing import Dict
+
 import pandas as pd
 import numpy as np
 
@@ -126,12 +131,32 @@ def calculate_ema(series: pd.Series, period: int = 200) -> pd.Series:
     """
     return series.ewm(span=period, adjust=False).mean()
 
+# Máximo de elementos temporales (filas x periodo) por bloque en calculate_wma
+_WMA_BLOCK_ELEMENTS = 1 << 20
+
 def calculate_wma(series: pd.Series, period: int) -> pd.Series:
     """
     Calcula Media Móvil Ponderada (WMA).
     weights: [1, 2, ..., period]
+    Vectorizado con ventanas deslizantes de NumPy (sin lambda por fila).
+    Misma suma por ventana que rolling().apply -> resultado idéntico (NaN incluido).
     """
-    return series.rolling(period).apply(lambda x: ((x * np.arange(1, period + 1)).sum()) / (np.arange(1, period + 1).sum()), raw=True)
+    values = series.to_numpy(dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if period < 1 or len(values) < period:
+        return pd.Series(out, index=series.index, name=series.name)
+
+    weights = np.arange(1, period + 1, dtype=np.float64)
+    weight_sum = weights.sum()
+    windows = np.lib.stride_tricks.sliding_window_view(values, period) # Vista sin copia
+
+    # Por bloques para acotar la memoria temporal en series largas
+    step = max(1, _WMA_BLOCK_ELEMENTS // period)
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        out[period - 1 + start:period - 1 + start + len(block)] = (block * weights).sum(axis=1) / weight_sum
+
+    return pd.Series(out, index=series.index, name=series.name)
 
 def calculate_hma(series: pd.Series, period: int = 55) -> pd.Series:
     """
@@ -249,3 +274,470 @@ def calculate_keltner_channels(df: pd.DataFrame, period: int = 20, multiplier: f
         'central': central,
         'lower': lower
     })
+
+
+# --- INDICADORES INCREMENTALES (Estado en streaming, O(1) por vela nueva) ---
+# Misma matemática que las funciones vectorizadas de arriba, pero con estado:
+# update(candle) procesa UNA vela en lugar de recalcular toda la ventana.
+# Las EMA/Wilder replican el algoritmo de pandas ewm (mismos resultados);
+# las ventanas móviles (SMA, Bollinger, Stoch) coinciden dentro de tolerancia float.
+
+_INCREMENTAL_TYPES = {}
+
+def _ewm_alpha(com: float = None, span: float = None, alpha: float = None) -> float:
+    """Alpha tal como lo deriva pandas (todo pasa por el centro de masa)."""
+    if span is not None:
+        com = (span - 1) / 2.0
+    elif alpha is not None:
+        com = 1.0 / alpha - 1.0
+    return 1.0 / (1.0 + com)
+
+def _value(candle, source: str = 'close') -> float:
+    """Acepta un número o una vela (dict / fila) y devuelve el campo `source`."""
+    if isinstance(candle, (int, float, np.number)):
+        return float(candle)
+    return float(candle[source])
+
+def _div(a: float, b: float) -> float:
+    """División con semántica NumPy (x/0 -> inf, 0/0 -> NaN) como en las series."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+def _nan_to(value: float, fill: float = 0.0) -> float:
+    return fill if value != value else value
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    """max(H-L, |H-Cprev|, |L-Cprev|) ignorando NaN (como concat(...).max(axis=1))."""
+    candidates = [v for v in (high - low, abs(high - prev_close), abs(low - prev_close)) if v == v]
+    return max(candidates) if candidates else float('nan')
+
+
+class IncrementalIndicator(abc.ABC):
+    """
+    Base de los indicadores incrementales.
+    update(candle) -> valor actual. El estado es serializable (to_dict / from_dict)
+    y se copia barato con snapshot() / restore().
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _INCREMENTAL_TYPES[cls.__name__] = cls
+
+    @abc.abstractmethod
+    def update(self, candle):
+        """Procesa una vela y devuelve el valor actual."""
+        pass
+
+    def snapshot(self) -> dict:
+        """Copia del estado (escalares, deques, arrays e indicadores anidados), sin pasar por deepcopy."""
+        return {k: _copy_state(v) for k, v in self.__dict__.items()}
+
+    def restore(self, snapshot: dict):
+        """Vuelve al estado de un snapshot(), que sigue siendo válido para otro restore()."""
+        self.__dict__.update({k: _copy_state(v) for k, v in snapshot.items()})
+
+    def to_dict(self) -> dict:
+        return {"type": type(self).__name__, "state": {k: _encode_state(v) for k, v in self.__dict__.items()}}
+
+    @staticmethod
+    def from_dict(data: dict) -> "IncrementalIndicator":
+        obj = _INCREMENTAL_TYPES[data['type']].__new__(_INCREMENTAL_TYPES[data['type']])
+        obj.__dict__.update({k: _decode_state(v) for k, v in data['state'].items()})
+        return obj
+
+def _copy_state(value):
+    if isinstance(value, IncrementalIndicator):
+        obj = type(value).__new__(type(value))
+        obj.__dict__.update(value.snapshot())
+        return obj
+    if isinstance(value, deque):
+        return deque(value, maxlen=value.maxlen)
+    if isinstance(value, (np.ndarray, list, dict)):
+        return value.copy()
+    return value
+
+def _encode_state(value):
+    if isinstance(value, IncrementalIndicator):
+        return value.to_dict()
+    if isinstance(value, deque):
+        return {"deque": list(value), "maxlen": value.maxlen}
+    if isinstance(value, np.ndarray):
+        return {"array": value.tolist()}
+    return value
+
+def _decode_state(value):
+    if isinstance(value, dict):
+        if 'type' in value and 'state' in value:
+            return IncrementalIndicator.from_dict(value)
+        if 'deque' in value:
+            return deque(value['deque'], maxlen=value['maxlen'])
+        if 'array' in value:
+            return np.array(value['array'], dtype=np.float64)
+    return value
+
+
+class EWMState(IncrementalIndicator):
+    """
+    Media exponencial incremental, réplica de pandas ewm(...).mean()
+    (adjust, min_periods y NaN intermedios con ignore_na=False).
+    """
+    def __init__(self, com: float = None, span: float = None, alpha: float = None, adjust: bool = True, min_periods: int = 0):
+        self.alpha = _ewm_alpha(com=com, span=span, alpha=alpha)
+        self.adjust = adjust
+        self.min_periods = max(int(min_periods), 1)
+        self.weighted = float('nan')
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def update(self, candle) -> float:
+        x = _value(candle)
+        is_obs = x == x
+        if not self.started:
+            self.started = True
+            self.weighted = x
+            self.nobs = int(is_obs)
+            return self.value
+
+        self.nobs += int(is_obs)
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if self.weighted != x:
+                    self.weighted = ((self.old_wt * self.weighted) + (new_wt * x)) / (self.old_wt + new_wt)
+                if self.adjust:
+                    self.old_wt += new_wt
+                else:
+                    self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.weighted if self.nobs >= self.min_periods else float('nan')
+
+
+class EMAState(IncrementalIndicator):
+    """EMA incremental (= calculate_ema con adjust=False; adjust=True para ewm(span) por defecto)."""
+    def __init__(self, period: int = 200, adjust: bool = False, source: str = 'close'):
+        self.source = source
+        self.ewm = EWMState(span=period, adjust=adjust)
+
+    def update(self, candle) -> float:
+        return self.ewm.update(_value(candle, self.source))
+
+
+class SMAState(IncrementalIndicator):
+    """Media simple (= rolling(period).mean())."""
+    def __init__(self, period: int = 20, source: str = 'close'):
+        self.period = period
+        self.source = source
+        self.window = deque(maxlen=period)
+
+    def update(self, candle) -> float:
+        self.window.append(_value(candle, self.source))
+        if len(self.window) < self.period:
+            return float('nan')
+        return float(np.mean(self.window))
+
+
+class WMAState(IncrementalIndicator):
+    """WMA incremental (= calculate_wma). Coste O(period) por vela, independiente del histórico."""
+    def __init__(self, period: int, source: str = 'close'):
+        self.period = period
+        self.source = source
+        self.window = deque(maxlen=period)
+
+    def update(self, candle) -> float:
+        self.window.append(_value(candle, self.source))
+        if len(self.window) < self.period:
+            return float('nan')
+        weights = np.arange(1, self.period + 1, dtype=np.float64)
+        return float((np.array(self.window) * weights).sum() / weights.sum())
+
+
+class HMAState(IncrementalIndicator):
+    """HMA incremental (= calculate_hma): WMA(2 * WMA(n/2) - WMA(n), sqrt(n))."""
+    def __init__(self, period: int = 55, source: str = 'close'):
+        self.source = source
+        self.wma_half = WMAState(int(period / 2))
+        self.wma_full = WMAState(period)
+        self.wma_sqrt = WMAState(int(np.sqrt(period)))
+
+    def update(self, candle) -> float:
+        x = _value(candle, self.source)
+        raw_hma = (2 * self.wma_half.update(x)) - self.wma_full.update(x)
+        return self.wma_sqrt.update(raw_hma)
+
+
+class RSIState(IncrementalIndicator):
+    """RSI incremental con suavizado de Wilder (= calculate_rsi, NaN iniciales -> 0)."""
+    def __init__(self, period: int = 14, source: str = 'close'):
+        self.source = source
+        self.prev = None
+        self.avg_gain = EWMState(com=period - 1, min_periods=period)
+        self.avg_loss = EWMState(com=period - 1, min_periods=period)
+
+    def update(self, candle) -> float:
+        x = _value(candle, self.source)
+        delta = float('nan') if self.prev is None else x - self.prev
+        self.prev = x
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        rs = _div(self.avg_gain.update(gain), self.avg_loss.update(loss))
+        return _nan_to(100 - _div(100, 1 + rs))
+
+
+class StochRSIState(IncrementalIndicator):
+    """StochRSI incremental (= calculate_stoch_rsi). Se alimenta con valores de RSI, no precio."""
+    def __init__(self, period: int = 14, k_period: int = 3, d_period: int = 3):
+        self.period = period
+        self.rsi_window = deque(maxlen=period)
+        self.stoch_window = deque(maxlen=k_period)
+        self.k_window = deque(maxlen=d_period)
+
+    def update(self, candle) -> dict:
+        rsi = _value(candle, 'rsi')
+        self.rsi_window.append(rsi)
+
+        stoch = float('nan')
+        if len(self.rsi_window) == self.period:
+            lo, hi = min(self.rsi_window), max(self.rsi_window)
+            stoch = _div(rsi - lo, hi - lo)
+        self.stoch_window.append(_nan_to(stoch) * 100)
+
+        k = float(np.mean(self.stoch_window)) if len(self.stoch_window) == self.stoch_window.maxlen else float('nan')
+        self.k_window.append(k)
+        d = float(np.mean(self.k_window)) if len(self.k_window) == self.k_window.maxlen else float('nan')
+        return {'k': _nan_to(k), 'd': _nan_to(d)}
+
+
+class BollingerState(IncrementalIndicator):
+    """
+    Bandas de Bollinger incrementales (= calculate_bollinger_bands).
+    Durante el calentamiento (< period velas) devuelve NaN: la versión vectorizada rellena hacia atrás (bfill).
+    """
+    def __init__(self, period: int = 20, std_dev: float = 2, source: str = 'close'):
+        self.period = period
+        self.std_dev = std_dev
+        self.source = source
+        self.window = deque(maxlen=period)
+
+    def update(self, candle) -> dict:
+        self.window.append(_value(candle, self.source))
+        if len(self.window) < self.period:
+            nan = float('nan')
+            return {'upper': nan, 'middle': nan, 'lower': nan}
+        arr = np.array(self.window)
+        middle = float(arr.mean())
+        std = float(arr.std(ddof=1))
+        return {'upper': middle + (std * self.std_dev), 'middle': middle, 'lower': middle - (std * self.std_dev)}
+
+
+class ATRState(IncrementalIndicator):
+    """ATR incremental (= calculate_atr, suavizado tipo Wilder)."""
+    def __init__(self, period: int = 14):
+        self.prev_close = float('nan')
+        self.ewm = EWMState(alpha=1 / period, adjust=False)
+
+    def update(self, candle) -> float:
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        return self.ewm.update(tr)
+
+
+class ADXState(IncrementalIndicator):
+    """ADX / DI+ / DI- incrementales (= calculate_adx, NaN -> 0)."""
+    def __init__(self, period: int = 14):
+        nan = float('nan')
+        self.prev_high, self.prev_low, self.prev_close = nan, nan, nan
+        self.tr_smooth = EWMState(alpha=1 / period, adjust=False)
+        self.plus_dm_smooth = EWMState(alpha=1 / period, adjust=False)
+        self.minus_dm_smooth = EWMState(alpha=1 / period, adjust=False)
+        self.adx_smooth = EWMState(alpha=1 / period, adjust=False)
+
+    def update(self, candle) -> dict:
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        tr = _true_range(high, low, self.prev_close)
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        plus_dm = up_move if (up_move > down_move) and (up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move) and (down_move > 0) else 0.0
+
+        tr_s = self.tr_smooth.update(tr)
+        plus_di = 100 * _div(self.plus_dm_smooth.update(plus_dm), tr_s)
+        minus_di = 100 * _div(self.minus_dm_smooth.update(minus_dm), tr_s)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        adx = self.adx_smooth.update(dx)
+        return {'adx': _nan_to(adx), 'plus_di': _nan_to(plus_di), 'minus_di': _nan_to(minus_di)}
+
+
+class KeltnerState(IncrementalIndicator):
+    """Canales de Keltner incrementales (= calculate_keltner_channels)."""
+    def __init__(self, period: int = 20, multiplier: float = 1.5):
+        self.multiplier = multiplier
+        self.ema = EMAState(period)
+        self.atr = ATRState(period)
+
+    def update(self, candle) -> dict:
+        central = self.ema.update(candle)
+        atr = self.atr.update(candle)
+        return {'upper': central + (atr * self.multiplier), 'central': central, 'lower': central - (atr * self.multiplier)}
+
+
+def _candle_ts(candle):
+    """Open time en ms (int) de una vela, o None si no trae timestamp."""
+    ts = candle.get('timestamp') if hasattr(candle, 'get') else None
+    if ts is None:
+        return None
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    return int(pd.Timestamp(ts).value // 10**6)
+
+
+class IndicatorState(abc.ABC):
+    """
+    Conjunto de indicadores incrementales de una serie (símbolo, timeframe).
+    - from_dataframe(df): siembra recorriendo el histórico una sola vez.
+    - update(candle): O(1) por vela. Si llega otra vez la misma vela (aún formándose),
+      se reemplaza en lugar de sumarse.
+    - sync(df) / apply(df): alimenta solo las velas nuevas de df y escribe las columnas.
+    - to_dict() / from_dict(): persistencia (JSON).
+    Subclases definen _build() (indicadores) y _compute(candle) (fila de columnas);
+    ver RegistryIndicatorState en strategies/registry.py.
+    """
+    COLUMNS = ()
+
+    def __init__(self, history: int = 500):
+        self.indicators = self._build()
+        self.history = deque(maxlen=history) # (timestamp_ms, {columna: valor})
+        self.last_ts = None
+        self._base = None # snapshot() de los indicadores antes de la última vela (por si se reemplaza)
+        self._lock = threading.RLock()
+
+    @abc.abstractmethod
+    def _build(self) -> Dict[str, IncrementalIndicator]:
+        """Indicadores nuevos (sin velas), por nombre."""
+        pass
+
+    @abc.abstractmethod
+    def _compute(self, candle) -> Dict[str, float]:
+        """Actualiza self.indicators con la vela y devuelve su fila de columnas."""
+        pass
+
+    def update(self, candle) -> Dict[str, float]:
+        with self._lock:
+            ts = _candle_ts(candle)
+            if ts is not None and self.last_ts is not None:
+                if ts < self.last_ts:
+                    return self.history[-1][1] # Vela antigua: ignorar
+                if ts == self.last_ts and self._base is not None:
+                    for name, ind in self.indicators.items():
+                        ind.restore(self._base[name])
+                    self.history.pop()
+
+            if ts is None:
+                self._base = None # Sin timestamp no hay reemplazo posible
+            elif ts != self.last_ts or self._base is None:
+                # Solo al abrir una vela nueva: los reemplazos vuelven al mismo snapshot
+                self._base = {name: ind.snapshot() for name, ind in self.indicators.items()}
+            row = self._compute(candle)
+            self.history.append((ts, row))
+            self.last_ts = ts
+            return row
+
+    @property
+    def current(self) -> Dict[str, float]:
+        return self.history[-1][1] if self.history else {}
+
+    def reset(self):
+        with self._lock:
+            self.indicators = self._build()
+            self.history.clear()
+            self.last_ts = None
+            self._base = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, history: int = None, **kwargs) -> "IndicatorState":
+        state = cls(history=history or max(len(df), 1), **kwargs)
+        state.sync(df)
+        return state
+
+    def sync(self, df: pd.DataFrame) -> "IndicatorState":
+        """
+        Alimenta las velas de df posteriores (o igual) a la última procesada.
+        Si df no contiene esa vela (hueco o serie nueva), se vuelve a sembrar desde df.
+        """
+        with self._lock:
+            if df.empty:
+                return self
+            ts = (df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+                  if 'timestamp' in df.columns else None)
+
+            start = 0
+            if ts is not None and self.last_ts is not None:
+                pos = int(np.searchsorted(ts, self.last_ts))
+                if pos < len(ts) and ts[pos] == self.last_ts:
+                    start = pos
+                else:
+                    self.reset()
+            elif ts is None:
+                self.reset()
+
+            cols = [c for c in ('open', 'high', 'low', 'close', 'volume') if c in df.columns]
+            values = df[cols].to_numpy(dtype=np.float64)
+            for i in range(start, len(df)):
+                candle = dict(zip(cols, values[i]))
+                if ts is not None:
+                    candle['timestamp'] = int(ts[i])
+                self.update(candle)
+            return self
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Escribe las columnas del histórico en df (alineadas por timestamp, o por posición)."""
+        with self._lock:
+            rows = list(self.history)
+        hist = pd.DataFrame([r for _, r in rows], columns=list(self.COLUMNS))
+        if 'timestamp' in df.columns and rows and rows[0][0] is not None:
+            hist.index = pd.to_datetime([t for t, _ in rows], unit='ms')
+            hist = hist.reindex(pd.DatetimeIndex(df['timestamp']))
+        else:
+            hist = hist.iloc[-len(df):]
+            hist = pd.concat([pd.DataFrame(np.nan, index=range(len(df) - len(hist)), columns=hist.columns), hist])
+        for col in self.COLUMNS:
+            df[col] = hist[col].to_numpy()
+        return df
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "type": type(self).__name__,
+                "columns": list(self.COLUMNS),
+                "history_size": self.history.maxlen,
+                "last_ts": self.last_ts,
+                "indicators": {k: v.to_dict() for k, v in self.indicators.items()},
+                "base": ({k: {"type": type(self.indicators[k]).__name__, "state": {a: _encode_state(v) for a, v in snap.items()}}
+                          for k, snap in self._base.items()} if self._base is not None else None),
+                "history": [[t, r] for t, r in self.history]
+            }
+
+    @classmethod
+    def _state_args(cls, data: dict) -> dict:
+        """Argumentos extra del constructor al restaurar (subclases parametrizadas)."""
+        return {}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        state = cls(history=data['history_size'], **cls._state_args(data))
+        state.last_ts = data['last_ts']
+        state.indicators = {k: IncrementalIndicator.from_dict(v) for k, v in data['indicators'].items()}
+        if data.get('base') is not None:
+            state._base = {k: IncrementalIndicator.from_dict(v).__dict__ for k, v in data['base'].items()}
+        state.history.extend((t, r) for t, r in data['history'])
+        return state
+
@@ -0,0 +1,367 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from strategies.indicators import (
+    calculate_ema,
+    calculate_hma,
+    calculate_rsi,
+    calculate_stoch_rsi,
+    calculate_bollinger_bands,
+    calculate_keltner_channels,
+    calculate_adx,
+    calculate_atr,
+    IncrementalIndicator,
+    IndicatorState,
+    EMAState,
+    SMAState,
+    HMAState,
+    RSIState,
+    StochRSIState,
+    BollingerState,
+    KeltnerState,
+    ADXState,
+    ATRState
+)
+from strategies import batch as b2d
+
+# Columnas de entrada (velas). Todo lo demás sale del registro.
+BASE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class IndicatorSpec:
+    """
+    Definición declarativa de un indicador del registro.
+    - columns: columnas que produce (ej. bb_upper, bb_middle, bb_lower)
+    - depends: columnas que necesita (velas u otros indicadores)
+    - batch(df): cálculo vectorizado -> {columna: Serie}
+    - incremental(): fábrica del estado incremental equivalente
+    - outputs: columna -> clave del resultado de update() (None si devuelve un escalar)
+    - batch2d(m): cálculo para todo el universo (AssetMatrix) -> {columna: matriz}
+    """
+    def __init__(self, name: str, columns: Tuple[str, ...], depends: Tuple[str, ...],
+                 batch: Callable[[pd.DataFrame], Dict[str, pd.Series]],
+                 incremental: Callable[[], IncrementalIndicator] = None,
+                 outputs: Dict[str, Optional[str]] = None,
+                 batch2d: Callable[["b2d.AssetMatrix"], Dict[str, object]] = None):
+        self.name = name
+        self.columns = tuple(columns)
+        self.depends = tuple(depends)
+        self.batch = batch
+        self.incremental = incremental
+        self.outputs = outputs or {columns[0]: None}
+        self.batch2d = batch2d
+
+
+# Columna -> especificación que la produce
+INDICATOR_REGISTRY: Dict[str, IndicatorSpec] = {}
+
+def register_indicator(spec: IndicatorSpec) -> IndicatorSpec:
+    for col in spec.columns:
+        INDICATOR_REGISTRY[col] = spec
+    return spec
+
+def resolve_indicators(columns: Iterable[str]) -> List[IndicatorSpec]:
+    """
+    Cierre de dependencias de `columns`, en orden topológico (dependencias primero).
+    Lanza KeyError si alguna columna no está registrada.
+    """
+    ordered, seen = [], set()
+
+    def visit(col: str):
+        if col in BASE_COLUMNS or col == 'timestamp':
+            return
+        if col not in INDICATOR_REGISTRY:
+            raise KeyError(f"Indicador no registrado: {col}")
+        spec = INDICATOR_REGISTRY[col]
+        if spec.name in seen:
+            return
+        seen.add(spec.name)
+        for dep in spec.depends:
+            visit(dep)
+        ordered.append(spec)
+
+    for col in columns:
+        visit(col)
+    return ordered
+
+def indicator_columns(columns: Iterable[str]) -> Tuple[str, ...]:
+    """Todas las columnas que produce el cierre de dependencias (incluye intermedias como rsi para stoch)."""
+    return tuple(col for spec in resolve_indicators(columns) for col in spec.columns)
+
+def compute_indicators(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """
+    Cálculo vectorizado del cierre de dependencias, en el propio df.
+    Las columnas ya presentes no se recalculan.
+    """
+    for spec in resolve_indicators(columns):
+        if all(col in df.columns for col in spec.columns):
+            continue
+        result = spec.batch(df)
+        for col in spec.columns:
+            df[col] = result[col]
+    return df
+
+def compute_indicators_batch(frames: Dict[str, pd.DataFrame], columns: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Cálculo en lote para varios activos del mismo timeframe: una pasada sobre
+    matrices (activos x tiempo) por indicador. Devuelve {símbolo: DataFrame}
+    con las columnas pedidas (y sus dependencias).
+    """
+    matrix = b2d.AssetMatrix(frames)
+    if not matrix.symbols:
+        return {}
+    needed = indicator_columns(columns)
+    for spec in resolve_indicators(columns):
+        for col, mat in spec.batch2d(matrix).items():
+            matrix[col] = mat
+    return {symbol: matrix.frame(symbol, needed) for symbol in matrix.symbols}
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    view = arr.view()
+    view.flags.writeable = False
+    return view
+
+class IndicatorBuffers:
+    """
+    Buffers preasignados para el cierre de dependencias de `columns` (un activo).
+    compute() escribe cada indicador en su buffer y devuelve vistas de solo lectura;
+    los buffers solo se reasignan si llega una ventana más larga que la capacidad.
+    """
+    def __init__(self, columns: Iterable[str], capacity: int = 0):
+        self.specs = resolve_indicators(columns)
+        self.capacity = 0
+        self.buffers: Dict[str, np.ndarray] = {}
+        self._reserve(capacity)
+
+    def _reserve(self, n: int):
+        if n > self.capacity:
+            self.capacity = n
+            self.buffers = {col: np.empty(n) for spec in self.specs for col in spec.columns}
+
+    def compute(self, candles: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """candles: columnas OHLCV 1-D (no se modifican). Devuelve {columna: vista}."""
+        n = len(candles['close'])
+        self._reserve(n)
+        matrix = b2d.AssetMatrix.from_columns(candles)
+        out = {}
+        for spec in self.specs:
+            for col, mat in spec.batch2d(matrix).items():
+                buf = self.buffers[col][:n]
+                np.copyto(buf, mat[0])
+                matrix[col] = buf[None, :] # Las dependencias (ej. stoch <- rsi) leen el buffer
+                out[col] = _readonly(buf)
+        return out
+
+
+# --- DEFINICIONES (una sola fuente de verdad para toda la matemática) ---
+def _ema_spec(period: int) -> IndicatorSpec:
+    col = f'ema_{period}'
+    return IndicatorSpec(col, (col,), ('close',),
+                         batch=lambda df: {col: calculate_ema(df['close'], period=period)},
+                         incremental=lambda: EMAState(period),
+                         batch2d=lambda m: {col: b2d.ema2d(m['close'], period)})
+
+for _period in (20, 50, 200):
+    register_indicator(_ema_spec(_period))
+
+register_indicator(IndicatorSpec(
+    'hma_55', ('hma_55',), ('close',),
+    batch=lambda df: {'hma_55': calculate_hma(df['close'], period=55)},
+    incremental=lambda: HMAState(55),
+    batch2d=lambda m: {'hma_55': b2d.hma2d(m['close'], 55)}))
+
+register_indicator(IndicatorSpec(
+    'rsi', ('rsi',), ('close',),
+    batch=lambda df: {'rsi': calculate_rsi(df['close'], period=14)},
+    incremental=lambda: RSIState(14),
+    batch2d=lambda m: {'rsi': b2d.rsi2d(m['close'], 14)}))
+
+register_indicator(IndicatorSpec(
+    'stoch_rsi', ('stoch_k', 'stoch_d'), ('rsi',),
+    batch=lambda df: calculate_stoch_rsi(df['rsi'], period=14, k_period=3, d_period=3).rename(columns={'k': 'stoch_k', 'd': 'stoch_d'}),
+    incremental=lambda: StochRSIState(14, 3, 3),
+    outputs={'stoch_k': 'k', 'stoch_d': 'd'},
+    batch2d=lambda m: dict(zip(('stoch_k', 'stoch_d'), b2d.stoch_rsi2d(m['rsi'], 14, 3, 3)))))
+
+register_indicator(IndicatorSpec(
+    'bollinger', ('bb_upper', 'bb_middle', 'bb_lower'), ('close',),
+    batch=lambda df: calculate_bollinger_bands(df['close'], period=20, std_dev=2.0).rename(
+        columns={'upper': 'bb_upper', 'middle': 'bb_middle', 'lower': 'bb_lower'}),
+    incremental=lambda: BollingerState(20, 2.0),
+    outputs={'bb_upper': 'upper', 'bb_middle': 'middle', 'bb_lower': 'lower'},
+    batch2d=lambda m: dict(zip(('bb_upper', 'bb_middle', 'bb_lower'), b2d.bollinger2d(m['close'], 20, 2.0)))))
+
+register_indicator(IndicatorSpec(
+    'keltner', ('kc_upper', 'kc_central', 'kc_lower'), ('high', 'low', 'close'),
+    batch=lambda df: calculate_keltner_channels(df, period=20, multiplier=1.5).rename(
+        columns={'upper': 'kc_upper', 'central': 'kc_central', 'lower': 'kc_lower'}),
+    incremental=lambda: KeltnerState(20, 1.5),
+    outputs={'kc_upper': 'upper', 'kc_central': 'central', 'kc_lower': 'lower'},
+    batch2d=lambda m: dict(zip(('kc_upper', 'kc_central', 'kc_lower'), b2d.keltner2d(m['high'], m['low'], m['close'], 20, 1.5)))))
+
+register_indicator(IndicatorSpec(
+    'adx', ('adx', 'plus_di', 'minus_di'), ('high', 'low', 'close'),
+    batch=lambda df: calculate_adx(df, period=14),
+    incremental=lambda: ADXState(14),
+    outputs={'adx': 'adx', 'plus_di': 'plus_di', 'minus_di': 'minus_di'},
+    batch2d=lambda m: dict(zip(('adx', 'plus_di', 'minus_di'), b2d.adx2d(m['high'], m['low'], m['close'], 14)))))
+
+register_indicator(IndicatorSpec(
+    'atr', ('atr',), ('high', 'low', 'close'),
+    batch=lambda df: {'atr': calculate_atr(df, period=14)},
+    incremental=lambda: ATRState(14),
+    batch2d=lambda m: {'atr': b2d.atr2d(m['high'], m['low'], m['close'], 14)}))
+
+register_indicator(IndicatorSpec(
+    'vol_sma', ('vol_sma',), ('volume',),
+    batch=lambda df: {'vol_sma': df['volume'].rolling(20).mean()},
+    incremental=lambda: SMAState(20, source='volume'),
+    batch2d=lambda m: {'vol_sma': b2d.rolling_mean2d(m['volume'], 20)}))
+
+
+class RegistryIndicatorState(IndicatorState):
+    """Estado incremental del cierre de dependencias de `columns` (mismas columnas que compute_indicators)."""
+    def __init__(self, columns: Iterable[str], history: int = 500):
+        self.specs = resolve_indicators(columns)
+        self.COLUMNS = tuple(col for spec in self.specs for col in spec.columns)
+        super().__init__(history=history)
+
+    def _build(self) -> Dict[str, IncrementalIndicator]:
+        return {spec.name: spec.incremental() for spec in self.specs}
+
+    def _compute(self, candle) -> Dict[str, float]:
+        row = dict(candle) # Las dependencias (ej. rsi -> stoch) se leen de la propia fila
+        out = {}
+        for spec in self.specs:
+            result = self.indicators[spec.name].update(row)
+            for col, key in spec.outputs.items():
+                out[col] = row[col] = result if key is None else result[key]
+        return out
+
+    @classmethod
+    def _state_args(cls, data: dict) -> dict:
+        return {"columns": data['columns']}
+
+
+class _SeriesEntry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fingerprint = None
+        self.frame = None # Columnas de indicadores de la última ventana calculada
+        self.state = None # RegistryIndicatorState (modo incremental)
+
+
+class IndicatorPipeline:
+    """
+    Calcula el cierre de dependencias de las columnas pedidas UNA vez por
+    (símbolo, timeframe, vela) y lo comparte entre estrategias/consumidores.
+    - Misma ventana y misma última vela -> se reutilizan las columnas ya calculadas
+      (solo se calculan las que falten).
+    - Modo incremental: un RegistryIndicatorState por (símbolo, timeframe) que solo
+      procesa las velas nuevas; su conjunto de columnas crece con lo que se pida.
+    """
+    def __init__(self, incremental: bool = True, history: int = 1000, max_series: int = 512):
+        self.incremental = incremental
+        self.history = history
+        self.max_series = max_series
+        self._series: "OrderedDict[Tuple[str, str], _SeriesEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.computed = 0
+        self.reused = 0
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> tuple:
+        last = df.iloc[-1]
+        first_ts = df['timestamp'].iloc[0] if 'timestamp' in df.columns else None
+        last_ts = last['timestamp'] if 'timestamp' in df.columns else None
+        return (len(df), first_ts, last_ts, float(last['high']), float(last['low']), float(last['close']), float(last['volume']))
+
+    def _entry(self, symbol: str, timeframe: str) -> _SeriesEntry:
+        key = (symbol, timeframe)
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is None:
+                entry = self._series[key] = _SeriesEntry()
+                while len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+            else:
+                self._series.move_to_end(key)
+            return entry
+
+    def compute(self, symbol: str, timeframe: str, df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """Añade a df las columnas pedidas (y sus dependencias). Devuelve df."""
+        if df.empty:
+            return df
+        for col, arr in self.arrays(symbol, timeframe, df, columns).items():
+            df[col] = arr
+        return df
+
+    def arrays(self, symbol: str, timeframe: str, df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Como compute(), sin tocar df: {columna: vista de solo lectura de la ventana calculada}."""
+        if df.empty:
+            return {}
+        needed = indicator_columns(columns)
+        fingerprint = self._fingerprint(df)
+        entry = self._entry(symbol, timeframe)
+
+        with entry.lock:
+            cached = entry.frame if entry.fingerprint == fingerprint else None
+            if cached is not None and all(col in cached.columns for col in needed):
+                self.reused += 1
+            else:
+                self.computed += 1
+                known = tuple(cached.columns) if cached is not None else ()
+                wanted = tuple(dict.fromkeys(known + needed))
+                base = df[[c for c in ('timestamp',) + BASE_COLUMNS if c in df.columns]].copy()
+
+                if self.incremental and 'timestamp' in df.columns:
+                    state = entry.state
+                    # (Re)siembra si faltan columnas, no cabe la ventana o df trae historia más antigua
+                    if (state is None or not set(wanted) <= set(state.COLUMNS) or state.history.maxlen < len(df)
+                            or not state.history or base['timestamp'].iloc[0] < pd.Timestamp(state.history[0][0], unit='ms')):
+                        known_state = tuple(state.COLUMNS) if state is not None else ()
+                        state = entry.state = RegistryIndicatorState(tuple(dict.fromkeys(known_state + wanted)),
+                                                                     history=max(self.history, len(df)))
+                    state.sync(base).apply(base)
+                else:
+                    if cached is not None:
+                        for col in cached.columns:
+                            base[col] = cached[col].to_numpy()
+                    compute_indicators(base, wanted)
+
+                entry.fingerprint = fingerprint
+                entry.frame = base.drop(columns=[c for c in ('timestamp',) + BASE_COLUMNS if c in base.columns])
+            frame = entry.frame
+
+        return {col: _readonly(frame[col].to_numpy()) for col in needed}
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                for key in [k for k in self._series if k[0] == symbol]:
+                    del self._series[key]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.computed + self.reused
+        return {
+            "computed": self.computed,
+            "reused": self.reused,
+            "series": len(self._series),
+            "reuse_rate": self.reused / total if total else 0.0
+        }
+
+
+def _build_default_pipeline() -> IndicatorPipeline:
+    from antigravity_quantum.config import USE_INCREMENTAL_INDICATORS
+    return IndicatorPipeline(incremental=USE_INCREMENTAL_INDICATORS)
+
+# Compartido por StrategyEngine (bot) y MarketStream (QuantumEngine)
+indicator_pipeline = _build_default_pipeline()
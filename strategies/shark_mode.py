@@ -78,11 +78,11 @@ class SharkSentinel(threading.Thread):
             futures = []
 
             # 1. PANIC CLOSE LONGS
-            for session_id, session in sessions.items():
+            for session in sessions:
                 futures.append(executor.submit(self._panic_close_session, session))
 
             # 2. SNIPER SHORTS
-            for session_id, session in sessions.items():
+            for session in sessions:
                 for target in self.sniper_targets:
                     futures.append(executor.submit(self._sniper_short_session, session, target))
 
@@ -96,20 +96,19 @@ class SharkSentinel(threading.Thread):
     def _panic_close_session(self, session):
         """Task: Close all longs for a specific session."""
         try:
-            # We need a method in session to close ALL longs. 
-            # Assuming get_active_positions logic.
-            # Simplified: Close BTC/ETH/SOL/BNB + Current targets
-            # A 'real' panic close would iterate session's known positions.
-            # For robustness, we call a theoretical 'close_all_longs' or iterate main assets.
-            
-            # Using existing logic: Fetch active positions first
+            # Parallel flatten of the session's longs (quantities resolved once, closes sent together).
+            # Retries only re-close what is still open.
             def op():
                 if not session.client: return
-                positions = session.get_active_positions()
-                for p in positions:
-                    if float(p['positionAmt']) > 0: # Long
-                        logger.info(f"Closing LONG {p['symbol']} for {session.chat_id}")
-                        session.execute_close_position(p['symbol'])
+                report = session.flatten_positions(side='LONG')
+                for r in report['positions']:
+                    logger.info(f"Closing LONG {r['symbol']} for {session.chat_id}: "
+                                f"{'flat' if r['ok'] else r['msg']} in {r['ms']:.0f} ms")
+                failed = [r['symbol'] for r in report['positions'] if not r['ok']]
+                if failed:
+                    raise Exception(f"Failed to close {failed}")
+                if report['positions']:
+                    logger.info(f"Session {session.chat_id} flat in {report['total_ms']:.0f} ms")
             
             self.exponential_backoff(op)
             
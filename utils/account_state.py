@@ -0,0 +1,316 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import websockets
+except ImportError: # Optional dependency: without it sessions stay on REST
+    websockets = None
+
+FUTURES_USER_STREAM_URL = "wss://fstream.binance.com/ws" # + /<listenKey>
+
+# Order statuses that remove an order from the open-order book
+_FINAL_ORDER_STATUS = {'FILLED', 'CANCELED', 'EXPIRED', 'EXPIRED_IN_MATCH', 'REJECTED'}
+
+
+class AccountStateCache:
+    """
+    Local snapshot of one session's futures account: balances, positions (with
+    leverage) and open orders, kept current by the user-data stream
+    (ACCOUNT_UPDATE, ORDER_TRADE_UPDATE, ACCOUNT_CONFIG_UPDATE) and reconciled
+    against REST every `reconcile_interval` seconds and after every (re)connect.
+
+    Readers (order paths, phantom checks) only touch memory. is_live() is False
+    until the stream is connected AND a REST snapshot was taken after the connect
+    (or when the last snapshot is too old); callers then keep using REST.
+
+    Runs in its own daemon thread (asyncio loop); REST calls go through the
+    session's python-binance client in an executor. `url` and `client` are
+    injectable, so it can run against a local stand-in server; apply_event()
+    takes raw user-data events directly.
+    """
+    def __init__(self, client, url: str = FUTURES_USER_STREAM_URL, reconcile_interval: float = 60.0,
+                 keepalive_interval: float = 1800.0, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.url = url
+        self.reconcile_interval = reconcile_interval
+        self.keepalive_interval = keepalive_interval
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._balances: Dict[str, float] = {}
+        self._positions: Dict[str, Dict[str, float]] = {} # symbol -> amt, entry, pnl (pnl as of the last event/snapshot)
+        self._orders: Dict[str, Dict[int, Dict[str, Any]]] = {} # symbol -> orderId -> order
+        self._leverage: Dict[str, int] = {}
+        self._snapshot_at = 0.0
+        # Event sequence: what each symbol / the balances last saw, so a snapshot fetched
+        # while events kept arriving never overwrites them with older REST data
+        self._seq = 0
+        self._symbol_seq: Dict[str, int] = {}
+        self._balance_seq = 0
+
+        self.connected = False
+        self.running = False
+        self._connected_at = 0.0
+        self._listen_key = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._main_task: Optional[asyncio.Task] = None
+
+        self.events = 0
+        self.reconciles = 0
+        self.reconnects = 0
+
+    # --- READS (memory only) ---
+    def is_live(self) -> bool:
+        with self._lock:
+            return (self.connected and self._snapshot_at >= self._connected_at
+                    and self.clock() - self._snapshot_at < 2 * self.reconcile_interval)
+
+    def position_amt(self, symbol: str) -> float:
+        with self._lock:
+            return self._positions.get(symbol, {}).get('amt', 0.0)
+
+    def position(self, symbol: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            p = self._positions.get(symbol)
+            return dict(p) if p and p['amt'] != 0 else None
+
+    def positions(self) -> List[Dict[str, Any]]:
+        """Non-zero positions, in get_active_positions() format."""
+        with self._lock:
+            return [{"symbol": s, "amt": str(p['amt']), "entry": str(p['entry']), "pnl": str(p['pnl'])}
+                    for s, p in self._positions.items() if p['amt'] != 0]
+
+    def open_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._orders.get(symbol, {}).values())
+
+    def leverage(self, symbol: str) -> Optional[int]:
+        with self._lock:
+            return self._leverage.get(symbol)
+
+    def account(self) -> Dict[str, float]:
+        """
+        futures_account()-style totals, approximate between reconciles (display only; order
+        sizing reads futures_account() from REST):
+        - the stream carries no available balance: it is the last REST value moved by wallet
+          changes, so margin locked by a position opened since is not subtracted yet;
+        - position pnl is the value of the last ACCOUNT_UPDATE (sent on balance/position
+          changes, not on price moves), so totalUnrealizedProfit and totalMarginBalance lag
+          the mark price.
+        """
+        with self._lock:
+            wallet = self._balances.get('USDT', 0.0)
+            unrealized = sum(p['pnl'] for p in self._positions.values())
+            return {
+                'walletBalance': wallet,
+                'totalUnrealizedProfit': unrealized,
+                'totalMarginBalance': wallet + unrealized,
+                'availableBalance': self._balances.get('_available', wallet)
+            }
+
+    # --- WRITES ---
+    def apply_snapshot(self, account: Dict[str, Any], positions: List[Dict[str, Any]], orders: List[Dict[str, Any]],
+                       since: int = None):
+        """
+        REST snapshot (futures_account, futures_position_information, futures_get_open_orders).
+        `since`: event sequence when the REST calls started (sequence()). Symbols (and balances)
+        updated by a stream event after it keep their newer state; None replaces everything.
+        """
+        balances = {a['asset']: float(a['walletBalance']) for a in account.get('assets', [])}
+        balances['_available'] = float(account.get('availableBalance', balances.get('USDT', 0.0)))
+        pos, leverage = {}, {}
+        # positionRisk V3 carries no leverage; the account (V2) positions do
+        for p in account.get('positions', []) + positions:
+            if p.get('leverage'):
+                leverage[p['symbol']] = int(float(p['leverage']))
+        for p in positions:
+            amt = float(p['positionAmt'])
+            if amt != 0:
+                pos[p['symbol']] = {'amt': amt, 'entry': float(p['entryPrice']), 'pnl': float(p.get('unRealizedProfit', 0))}
+        book: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        for o in orders:
+            book.setdefault(o['symbol'], {})[o['orderId']] = o
+        with self._lock:
+            if since is not None:
+                for symbol, seq in self._symbol_seq.items():
+                    if seq > since: # Newer than the snapshot: keep the stream's state
+                        for mine, snap in ((self._positions, pos), (self._orders, book)):
+                            if symbol in mine:
+                                snap[symbol] = mine[symbol]
+                            else:
+                                snap.pop(symbol, None)
+                        if symbol in self._leverage:
+                            leverage[symbol] = self._leverage[symbol]
+                if self._balance_seq > since:
+                    balances = self._balances
+            self._balances = balances
+            self._positions = pos
+            self._orders = book
+            self._leverage = leverage
+            self._snapshot_at = self.clock()
+        self.reconciles += 1
+
+    def set_position(self, symbol: str, amt: float):
+        """
+        Local update from a confirmed order response (e.g. a FILLED close), ahead of the
+        stream's ACCOUNT_UPDATE. Counts as an event, so a snapshot already in flight cannot revert it.
+        """
+        with self._lock:
+            self._seq += 1
+            self._symbol_seq[symbol] = self._seq
+            entry = self._positions.setdefault(symbol, {'amt': 0.0, 'entry': 0.0, 'pnl': 0.0})
+            entry['amt'] = amt
+            if amt == 0:
+                entry.update(entry=0.0, pnl=0.0)
+
+    def sequence(self) -> int:
+        """Number of events applied so far (pass to apply_snapshot as `since`)."""
+        with self._lock:
+            return self._seq
+
+    def apply_event(self, event: Dict[str, Any]):
+        """One user-data stream event (already JSON-decoded)."""
+        kind = event.get('e')
+        with self._lock:
+            seq = self._seq + 1
+            if kind == 'ACCOUNT_UPDATE':
+                data = event.get('a', {})
+                if data.get('B'):
+                    self._balance_seq = seq
+                for b in data.get('B', []):
+                    wallet = float(b['wb'])
+                    if b['a'] == 'USDT' and '_available' in self._balances:
+                        # Available balance moves with the wallet between REST snapshots
+                        self._balances['_available'] += wallet - self._balances.get('USDT', wallet)
+                    self._balances[b['a']] = wallet
+                for p in data.get('P', []):
+                    self._symbol_seq[p['s']] = seq
+                    entry = self._positions.setdefault(p['s'], {'amt': 0.0, 'entry': 0.0, 'pnl': 0.0})
+                    entry.update(amt=float(p['pa']), entry=float(p['ep']), pnl=float(p.get('up', 0)))
+            elif kind == 'ORDER_TRADE_UPDATE':
+                o = event['o']
+                self._symbol_seq[o['s']] = seq
+                book = self._orders.setdefault(o['s'], {})
+                if o['X'] in _FINAL_ORDER_STATUS:
+                    book.pop(o['i'], None)
+                else:
+                    book[o['i']] = {'symbol': o['s'], 'orderId': o['i'], 'side': o.get('S'), 'type': o.get('o'),
+                                    'status': o['X'], 'origQty': o.get('q'), 'price': o.get('p'),
+                                    'stopPrice': o.get('sp'), 'reduceOnly': o.get('R')}
+            elif kind == 'ACCOUNT_CONFIG_UPDATE' and 'ac' in event:
+                self._symbol_seq[event['ac']['s']] = seq
+                self._leverage[event['ac']['s']] = int(event['ac']['l'])
+            elif kind == 'listenKeyExpired':
+                self.connected = False # Forces a reconnect with a new key
+            else:
+                return
+            self._seq = seq
+        self.events += 1
+
+    # --- BACKGROUND ---
+    async def _rest(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: fn(*args, **kwargs))
+
+    async def reconcile(self) -> bool:
+        since = self.sequence() # Events applied while the REST calls run win over their result
+        try:
+            account = await self._rest(self.client.futures_account)
+            positions = await self._rest(self.client.futures_position_information)
+            orders = await self._rest(self.client.futures_get_open_orders)
+        except Exception as e:
+            print(f"⚠️ Account State reconcile failed: {e}")
+            return False
+        self.apply_snapshot(account, positions, orders, since=since)
+        return True
+
+    async def _reconcile_loop(self):
+        while self.running:
+            await asyncio.sleep(self.reconcile_interval)
+            if self.connected:
+                await self.reconcile()
+
+    async def _keepalive_loop(self):
+        while self.running:
+            await asyncio.sleep(self.keepalive_interval)
+            if self._listen_key:
+                try:
+                    await self._rest(self.client.futures_stream_keepalive, self._listen_key)
+                except Exception as e:
+                    print(f"⚠️ Account State keepalive failed: {e}")
+
+    async def _stream_loop(self):
+        delay = 1.0
+        while self.running:
+            try:
+                self._listen_key = await self._rest(self.client.futures_stream_get_listen_key)
+                async with websockets.connect(f"{self.url}/{self._listen_key}", ping_interval=20) as ws:
+                    with self._lock:
+                        self.connected = True
+                        self._connected_at = self.clock()
+                    delay = 1.0
+                    await self.reconcile() # Snapshot AFTER subscribing: no gap between the two
+                    async for raw in ws:
+                        self.apply_event(json.loads(raw))
+                        if not self.connected:
+                            break
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"⚠️ Account Stream Disconnected: {e}")
+
+            self.connected = False
+            if not self.running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay + random.uniform(0, 0.5)) # Backoff with jitter
+            delay = min(delay * 2, 60.0)
+
+    async def _main(self):
+        await asyncio.gather(self._stream_loop(), self._reconcile_loop(), self._keepalive_loop())
+
+    def start(self) -> bool:
+        """Starts the stream thread. False (REST only) without websockets or a client."""
+        if websockets is None or self.client is None:
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self.running = True
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._main_task = self._loop.create_task(self._main())
+            try:
+                self._loop.run_until_complete(self._main_task)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                print(f"⚠️ Account State loop stopped: {e}")
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="account-state", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        self.connected = False
+        if self._loop and self._main_task:
+            try:
+                self._loop.call_soon_threadsafe(self._main_task.cancel)
+            except RuntimeError: # Loop already closed
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live": self.is_live(),
+            "events": self.events,
+            "reconciles": self.reconciles,
+            "reconnects": self.reconnects,
+            "snapshot_age_s": self.clock() - self._snapshot_at if self._snapshot_at else None
+        }
@@ -0,0 +1,149 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_PRECISION = (2, 2) # (quantity, price) when the symbol is unknown
+
+@dataclass(frozen=True)
+class SymbolMetadata:
+    symbol: str
+    quantity_precision: int
+    price_precision: int
+    tick_size: float
+    step_size: float
+    min_qty: float
+    min_notional: float
+
+
+def _parse_symbol(s: Dict[str, Any]) -> SymbolMetadata:
+    filters = {f.get('filterType'): f for f in s.get('filters', [])}
+    price_filter = filters.get('PRICE_FILTER', {})
+    lot_size = filters.get('LOT_SIZE', {})
+    min_notional = filters.get('MIN_NOTIONAL', {})
+    return SymbolMetadata(
+        symbol=s['symbol'],
+        quantity_precision=int(s.get('quantityPrecision', DEFAULT_PRECISION[0])),
+        price_precision=int(s.get('pricePrecision', DEFAULT_PRECISION[1])),
+        tick_size=float(price_filter.get('tickSize', 0) or 0),
+        step_size=float(lot_size.get('stepSize', 0) or 0),
+        min_qty=float(lot_size.get('minQty', 0) or 0),
+        # Futures: 'notional'; spot payloads use 'minNotional'
+        min_notional=float(min_notional.get('notional', min_notional.get('minNotional', 0)) or 0)
+    )
+
+
+class SymbolMetadataCache:
+    """
+    Process-wide index of futures symbol metadata (precision, tick/step size, min notional),
+    shared by every TradingSession.
+
+    - futures_exchange_info() (a multi-hundred-KB payload) is downloaded and parsed once
+      into a dict: every lookup is O(1) and off the order path.
+    - The first lookup loads it with the caller's client (single flight: concurrent
+      sessions wait for that one download); that client is kept for refreshes.
+    - A daemon thread refreshes the index every `refresh_interval` seconds. Readers never
+      block on a refresh: the new dict replaces the old one in a single assignment.
+    - On a failed refresh the previous index stays in use.
+    """
+    def __init__(self, refresh_interval: float = 3600.0, clock: Callable[[], float] = time.time):
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._symbols: Dict[str, SymbolMetadata] = {}
+        self._client = None
+        self._loaded_at = 0.0
+        self._retry_at = 0.0 # Failed load / unknown symbol: no new download before this
+        self._load_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.loads = 0
+        self.failures = 0
+        self.lookups = 0
+
+    def refresh(self, client=None) -> bool:
+        """Downloads and indexes the exchange info. Returns False (index unchanged) on failure."""
+        client = client or self._client
+        if client is None:
+            return False
+        try:
+            info = client.futures_exchange_info()
+            symbols = {s['symbol']: _parse_symbol(s) for s in info.get('symbols', [])}
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Symbol Metadata refresh failed: {e}")
+            return False
+        self._symbols = symbols # Atomic swap: readers see the old or the new index, never a partial one
+        self._client = client
+        self._loaded_at = self.clock()
+        self.loads += 1
+        return True
+
+    def _ensure_loaded(self, client):
+        if self._symbols or self.clock() < self._retry_at:
+            return
+        with self._load_lock:
+            if self._symbols or self.clock() < self._retry_at:
+                return
+            if self.refresh(client):
+                self.start(client)
+            else:
+                self._retry_at = self.clock() + 30
+
+    def get(self, symbol: str, client=None) -> Optional[SymbolMetadata]:
+        """
+        Metadata for `symbol` (loads the index on first use with `client`). None if unknown.
+        An unknown symbol (e.g. listed after the last refresh) triggers at most one early refresh per 30s.
+        """
+        self.lookups += 1
+        self._ensure_loaded(client)
+        meta = self._symbols.get(symbol)
+        if meta is None and self._symbols and self.clock() >= self._retry_at:
+            with self._load_lock:
+                if symbol not in self._symbols and self.clock() >= self._retry_at:
+                    self._retry_at = self.clock() + 30
+                    self.refresh(client)
+            meta = self._symbols.get(symbol)
+        return meta
+
+    def precision(self, symbol: str, client=None) -> Tuple[int, int]:
+        """(quantity_precision, price_precision), DEFAULT_PRECISION if unknown."""
+        meta = self.get(symbol, client)
+        if meta is None:
+            return DEFAULT_PRECISION
+        return meta.quantity_precision, meta.price_precision
+
+    # --- BACKGROUND REFRESH ---
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self, client=None):
+        """Starts the background refresh thread (idempotent)."""
+        if client is not None:
+            self._client = client
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="symbol-metadata-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._symbols),
+            "age_s": self.clock() - self._loaded_at if self._loaded_at else None,
+            "loads": self.loads,
+            "failures": self.failures,
+            "lookups": self.lookups
+        }
+
+
+def _build_default_cache() -> SymbolMetadataCache:
+    from antigravity_quantum.config import SYMBOL_METADATA_REFRESH_SECONDS
+    return SymbolMetadataCache(refresh_interval=SYMBOL_METADATA_REFRESH_SECONDS)
+
+# Shared by every TradingSession (utils/trading_manager.py)
+symbol_metadata = _build_default_cache()
@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from antigravity_quantum.data.ratelimit import WeightBucket
+
+
+class ExecutionDispatcher:
+    """
+    Fans one signal out to many TradingSessions concurrently, keeping the
+    execute_* methods (and their results) unchanged.
+
+    - An asyncio loop (daemon thread) schedules the calls; the blocking exchange
+      calls run on a shared pool of `workers` threads. Each session keeps its own
+      keep-alive HTTP connection pool (python-binance's requests.Session), so
+      concurrent sessions never queue behind each other's sockets.
+    - Calls for the SAME session run one at a time, in submission order (FIFO lock
+      per session key); different sessions never wait for each other.
+    """
+    def __init__(self, workers: int = 64):
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._locks: Dict[Any, asyncio.Lock] = {} # Only touched from the loop thread
+        self._start_lock = threading.Lock()
+
+        self.calls = 0
+        self.errors = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="execution")
+                threading.Thread(target=loop.run_forever, name="execution-loop", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _key(session) -> Any:
+        key = getattr(session, 'chat_id', None)
+        return id(session) if key is None else key
+
+    async def _run(self, key, fn: Callable, args, kwargs):
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            self.calls += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Execution Error ({key}): {e}")
+                raise
+
+    def submit(self, session, fn: Callable, *args, **kwargs) -> Future:
+        """Queues fn(*args, **kwargs) behind the session's earlier calls. Thread-safe, non-blocking."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._run(self._key(session), fn, args, kwargs), loop)
+
+    def fan_out(self, jobs: Iterable[Tuple], timeout: float = None) -> List[Any]:
+        """
+        Runs (session, fn, *args) jobs concurrently and waits for all of them.
+        Returns one entry per job: fn's result, or the exception it raised.
+        """
+        futures = [self.submit(session, fn, *args) for session, fn, *args in jobs]
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        results = []
+        for f in futures:
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                results.append(f.result(remaining))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "sessions": len(self._locks), "calls": self.calls, "errors": self.errors}
+
+
+def _build_default_dispatcher() -> ExecutionDispatcher:
+    from antigravity_quantum.config import EXECUTION_WORKERS
+    return ExecutionDispatcher(workers=EXECUTION_WORKERS)
+
+def _build_default_order_weight() -> WeightBucket:
+    from antigravity_quantum.config import FUTURES_ORDER_WEIGHT_PER_MINUTE
+    return WeightBucket(FUTURES_ORDER_WEIGHT_PER_MINUTE)
+
+# Shared by the signal dispatch loops (main.py)
+execution_dispatcher = _build_default_dispatcher()
+# Futures order weight shared by every session's bulk order paths (acquire_blocking)
+order_weight = _build_default_order_weight()
@@ -2,6 +2,7 @@ import os
 import json
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from binance.client import Client
 from binance.enums import *
 from binance.exceptions import BinanceAPIException
@@ -9,7 +10,12 @@ from binance.exceptions import BinanceAPIException
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest, TakeProfitRequest, StopLossRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.common.exceptions import APIError
 from utils.ai_analyst import QuantumAnalyst
+from utils.exchange_metadata import symbol_metadata
+from utils.account_state import AccountStateCache
+from utils.execution import order_weight
+from antigravity_quantum.config import USE_USER_DATA_STREAM, USER_DATA_STREAM_URL, ACCOUNT_RECONCILE_SECONDS, FLATTEN_WORKERS
 
 class TradingSession:
     """
@@ -53,6 +59,7 @@ class TradingSession:
         # Initialize Client
         self.alpaca_client = None
         self.ai_analyst = QuantumAnalyst() # Initialize AI
+        self.account_state = None # Stream-fed positions/balances/orders (utils/account_state.py)
         self._init_client()
 
     def _init_client(self):
@@ -61,6 +68,7 @@ class TradingSession:
             try:
                 self.client = Client(self.api_key, self.api_secret, tld='com', requests_params=self.request_params)
                 print(f"✅ [Chat {self.chat_id}] Binance Client Initialized.")
+                self._start_account_state()
             except Exception as e:
                 print(f"❌ [Chat {self.chat_id}] Failed to init Client: {e}")
                 self.client = None
@@ -94,6 +102,17 @@ class TradingSession:
             except Exception as e:
                 print(f"❌ [Chat {self.chat_id}] Failed to init Alpaca: {e}")
 
+    def _start_account_state(self):
+        # Re-init (new keys): the old stream belongs to the old client
+        if self.account_state:
+            self.account_state.stop()
+            self.account_state = None
+        if USE_USER_DATA_STREAM:
+            self.account_state = AccountStateCache(self.client, url=USER_DATA_STREAM_URL,
+                                                   reconcile_interval=ACCOUNT_RECONCILE_SECONDS)
+            if not self.account_state.start():
+                self.account_state = None
+
     # --- CONFIGURATION METHODS ---
     def set_mode(self, mode):
         if mode in ['WATCHER', 'COPILOT', 'PILOT']:
@@ -116,16 +135,60 @@ class TradingSession:
             "has_keys": bool(self.client) # Status check
         }
 
+    def _live_account_state(self):
+        """The stream-fed AccountStateCache if it is in sync, else None (callers use REST)."""
+        state = self.account_state
+        return state if state is not None and state.is_live() else None
+
+    def _bracket_orders(self, exit_side, quantity, sl_price, tp1_price, ref_price, qty_precision):
+        """
+        Protective orders of a position: SL (full size) + TP1 (50%) + trailing TP2 (50%),
+        or SL + a single full TP when half the position is below min notional.
+        Returns (orders, split).
+        """
+        orders = []
+        if sl_price > 0:
+            orders.append({'side': exit_side, 'type': 'STOP_MARKET', 'stopPrice': sl_price, 'closePosition': True})
+        
+        qty_tp1 = float(round(quantity / 2, qty_precision))
+        if qty_tp1 * ref_price < 5.5:
+            orders.append({'side': exit_side, 'type': 'TAKE_PROFIT_MARKET', 'stopPrice': tp1_price, 'closePosition': True})
+            return orders, False
+        
+        if qty_tp1 > 0:
+            orders.append({'side': exit_side, 'type': 'TAKE_PROFIT_MARKET', 'stopPrice': tp1_price,
+                           'quantity': qty_tp1, 'reduceOnly': True})
+        qty_tp2 = float(round(quantity - qty_tp1, qty_precision))
+        if qty_tp2 > 0:
+            orders.append({'side': exit_side, 'type': 'TRAILING_STOP_MARKET', 'callbackRate': 1.5,
+                           'quantity': qty_tp2, 'reduceOnly': True})
+        return orders, True
+
+    def _place_orders(self, symbol, orders):
+        """
+        Places up to 5 orders for `symbol` in ONE request (futures batch endpoint).
+        Raises if any of them was rejected, so the caller can roll back.
+        """
+        if not orders:
+            return []
+        # The batch endpoint takes every parameter as a string ('true'/'false' for flags)
+        batch = [{k: (str(v).lower() if isinstance(v, bool) else str(v)) for k, v in dict(o, symbol=symbol).items()}
+                 for o in orders]
+        results = self.client.futures_place_batch_order(batchOrders=batch)
+        rejected = [r.get('msg', r) for r in results if 'code' in r] # Rejected entries: {'code', 'msg'}
+        if rejected:
+            raise Exception(f"Batch order rejected: {rejected}")
+        return results
+
     def get_symbol_precision(self, symbol):
+        # Shared, indexed exchange info (no futures_exchange_info() round trip per order)
         if not self.client: return 2, 2
-        try:
-            info = self.client.futures_exchange_info()
-            for s in info['symbols']:
-                if s['symbol'] == symbol:
-                    return s['quantityPrecision'], s['pricePrecision']
-        except Exception as e:
-            print(f"Error getting precision for {symbol}: {e}")
-        return 2, 2
+        return symbol_metadata.precision(symbol, self.client)
+
+    def get_symbol_metadata(self, symbol):
+        """Precision, tick/step size and min notional of a futures symbol (None if unknown)."""
+        if not self.client: return None
+        return symbol_metadata.get(symbol, self.client)
 
     def _execute_alpaca_order(self, symbol, side, atr=None):
         if not self.alpaca_client:
@@ -267,21 +330,26 @@ class TradingSession:
             # 0. Safety Check: Existing Position (ROBUST)
             has_position = False
             net_qty = 0.0
+            state = self._live_account_state()
 
             try:
-                # Check 1: Specific Symbol
-                positions = self.client.futures_position_information(symbol=symbol)
-                for p in positions:
-                    net_qty += float(p['positionAmt'])
-                
-                # Check 2: Fallback to Account Snapshot if Check 1 says 0 but we want to be SURE
-                if net_qty == 0:
-                    acc_pos = self.client.futures_account()['positions']
-                    for p in acc_pos:
-                        if p['symbol'] == symbol and float(p['positionAmt']) != 0:
-                            net_qty = float(p['positionAmt'])
-                            print(f"⚠️ [Safety] Position found via Account Fallback for {symbol}: {net_qty}")
-                            break
+                if state:
+                    # Stream-fed snapshot: no REST round trip
+                    net_qty = state.position_amt(symbol)
+                else:
+                    # Check 1: Specific Symbol
+                    positions = self.client.futures_position_information(symbol=symbol)
+                    for p in positions:
+                        net_qty += float(p['positionAmt'])
+                    
+                    # Check 2: Fallback to Account Snapshot if Check 1 says 0 but we want to be SURE
+                    if net_qty == 0:
+                        acc_pos = self.client.futures_account()['positions']
+                        for p in acc_pos:
+                            if p['symbol'] == symbol and float(p['positionAmt']) != 0:
+                                net_qty = float(p['positionAmt'])
+                                print(f"⚠️ [Safety] Position found via Account Fallback for {symbol}: {net_qty}")
+                                break
 
             except Exception as e:
                 return False, f"⚠️ Error checking positions ({e}). Aborted."
@@ -289,16 +357,19 @@ class TradingSession:
             if net_qty != 0:
                 return False, f"⚠️ Position already open ({net_qty} {symbol})."
 
-            # 1. Update Leverage
-            self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            # 1. Update Leverage (skipped if already set)
+            if not state or state.leverage(symbol) != leverage:
+                self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
             
             # Pre-flight Clean (Just in case)
-            try:
-                 self.client.futures_cancel_all_open_orders(symbol=symbol)
-            except: pass
+            if not state or state.open_orders(symbol):
+                try:
+                     self.client.futures_cancel_all_open_orders(symbol=symbol)
+                except: pass
 
             # 2. Calculate Position Size
-            # Use futures_account for unified balance view
+            # Use futures_account for unified balance view. Always REST: the stream cache's
+            # available balance lags margin locked by new positions until the next reconcile
             acc_info = self.client.futures_account()
             
             # AVAILABLE BALANCE (For Check)
@@ -353,10 +424,10 @@ class TradingSession:
 
             if quantity <= 0: return False, "Position too small."
 
-            # 3. Execute Market Buy
+            # 3. Execute Market Buy (RESULT: the response carries the fill)
             try:
                 order = self.client.futures_create_order(
-                    symbol=symbol, side='BUY', type='MARKET', quantity=quantity
+                    symbol=symbol, side='BUY', type='MARKET', quantity=quantity, newOrderRespType='RESULT'
                 )
                 entry_price = float(order.get('avgPrice', current_price))
                 if entry_price == 0: entry_price = current_price
@@ -364,42 +435,16 @@ class TradingSession:
                 return False, f"❌ Failed to Open Position: {e}"
 
             # 4. Post-Entry Orders (SL / TP) - ATOMIC SAFETY BLOCK
+            # SL + TPs go out in ONE batch request right after the fill
             try:
-                # SL (Full Size)
-                if sl_price > 0:
-                    self.client.futures_create_order(
-                        symbol=symbol, side='SELL', type='STOP_MARKET', stopPrice=sl_price, closePosition=True
-                    )
+                orders, split = self._bracket_orders('SELL', quantity, sl_price, tp1_price, entry_price, qty_precision)
+                self._place_orders(symbol, orders)
                 
-                # --- SPLIT ORDER LOGIC ---
-                qty_tp1 = float(round(quantity / 2, qty_precision))
-                tp_notional = qty_tp1 * entry_price
-                
-                if tp_notional < 5.5:
+                if not split:
                     # 🚫 Small Position: NO SPLIT (100% TP1)
-                    self.client.futures_create_order(
-                       symbol=symbol, side='SELL', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, closePosition=True
-                    )
                     success_msg = f"Long {symbol} (x{leverage})\nEntry: {entry_price}\nQty: {quantity}\nSL: {sl_price}\nTP: {tp1_price} (100% - Small Pos)"
                 else:
                     # ✅ Sufficient Size: SPLIT (50% TP1 + 50% Trailing)
-                    if qty_tp1 > 0:
-                        self.client.futures_create_order(
-                           symbol=symbol, side='SELL', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, quantity=qty_tp1, reduceOnly=True
-                        )
-                        
-                    # TP2 (Trailing - Remainder)
-                    qty_tp2 = float(round(quantity - qty_tp1, qty_precision))
-                    if qty_tp2 > 0:
-                         self.client.futures_create_order(
-                            symbol=symbol, 
-                            side='SELL', 
-                            type='TRAILING_STOP_MARKET', 
-                            callbackRate=1.5, 
-                            quantity=qty_tp2,
-                            reduceOnly=True
-                        )
-
                     success_msg = f"Long {symbol} (x{leverage})\nEntry: {entry_price}\nQty: {quantity}\nSL: {sl_price}\nTP1: {tp1_price} (50%)\nTP2: Trailing 1.5%"
 
                 # Optional: Add Macro Warning to message
@@ -412,6 +457,9 @@ class TradingSession:
             except Exception as e:
                 # 🚨 CRITICAL: ROLLBACK (Close Position)
                 print(f"⚠️ Order Placement Failed: {e}. closing position...")
+                try:
+                     self.client.futures_cancel_all_open_orders(symbol=symbol) # Part of the batch may have been accepted
+                except: pass
                 try:
                      self.client.futures_create_order(
                         symbol=symbol, side='SELL', type='MARKET', quantity=quantity, reduceOnly=True
@@ -449,26 +497,31 @@ class TradingSession:
 
             # 0. Safety Check
             net_qty = 0.0
+            state = self._live_account_state()
             try:
-                positions = self.client.futures_position_information(symbol=symbol)
-                net_qty = sum(float(p['positionAmt']) for p in positions)
-                
-                if net_qty == 0:
-                     acc_pos = self.client.futures_account()['positions']
-                     for p in acc_pos:
-                        if p['symbol'] == symbol and float(p['positionAmt']) != 0:
-                            net_qty = float(p['positionAmt'])
-                            break
+                if state:
+                    net_qty = state.position_amt(symbol)
+                else:
+                    positions = self.client.futures_position_information(symbol=symbol)
+                    net_qty = sum(float(p['positionAmt']) for p in positions)
+                    
+                    if net_qty == 0:
+                         acc_pos = self.client.futures_account()['positions']
+                         for p in acc_pos:
+                            if p['symbol'] == symbol and float(p['positionAmt']) != 0:
+                                net_qty = float(p['positionAmt'])
+                                break
             except Exception as e:
                 return False, f"Check Error: {e}"
 
             if net_qty != 0:
                 return False, f"⚠️ Position already open ({net_qty} {symbol})."
 
-            # 1. Update Leverage
-            self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            # 1. Update Leverage (skipped if already set)
+            if not state or state.leverage(symbol) != leverage:
+                self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
 
-            # 2. Calculate Size & Params
+            # 2. Calculate Size & Params (REST balance: the stream cache lags newly locked margin)
             acc_info = self.client.futures_account()
             
             # AVAILABLE BALANCE (For Check)
@@ -517,10 +570,10 @@ class TradingSession:
 
             if quantity <= 0: return False, "Position too small."
 
-            # 3. Execute Market SELL
+            # 3. Execute Market SELL (RESULT: the response carries the fill)
             try:
                 order = self.client.futures_create_order(
-                    symbol=symbol, side='SELL', type='MARKET', quantity=quantity
+                    symbol=symbol, side='SELL', type='MARKET', quantity=quantity, newOrderRespType='RESULT'
                 )
                 entry_price = float(order.get('avgPrice', current_price))
                 if entry_price == 0: entry_price = current_price
@@ -528,40 +581,16 @@ class TradingSession:
                 return False, f"❌ Failed to Open Position: {e}"
 
             # 4. Post-Entry Orders (SL / TP) - ATOMIC SAFETY BLOCK
+            # SL + TPs go out in ONE batch request right after the fill
             try:
-                # SL (Full Size)
-                if sl_price > 0:
-                     self.client.futures_create_order(
-                        symbol=symbol, side='BUY', type='STOP_MARKET', stopPrice=sl_price, closePosition=True
-                    )
-                
-                # --- SPLIT ORDER LOGIC ---
-                qty_tp1 = float(round(quantity / 2, qty_precision))
-                tp_notional = qty_tp1 * entry_price
+                orders, split = self._bracket_orders('BUY', quantity, sl_price, tp1_price, entry_price, qty_precision)
+                self._place_orders(symbol, orders)
                 
-                if tp_notional < 5.5:
+                if not split:
                     # 🚫 Small Position: NO SPLIT (100% TP1)
-                    self.client.futures_create_order(
-                       symbol=symbol, side='BUY', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, closePosition=True
-                    )
                     success_msg = f"Short {symbol} (x{leverage})\nEntry: {entry_price}\nQty: {quantity}\nSL: {sl_price}\nTP: {tp1_price} (100% - Small Pos)"
                 else:
                      # ✅ Sufficient Size: SPLIT (50% TP1 + 50% Trailing)
-                    if qty_tp1 > 0:
-                        self.client.futures_create_order(
-                           symbol=symbol, side='BUY', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, quantity=qty_tp1, reduceOnly=True
-                        )
-                    
-                    qty_tp2 = float(round(quantity - qty_tp1, qty_precision))
-                    if qty_tp2 > 0:
-                         self.client.futures_create_order(
-                            symbol=symbol, 
-                            side='BUY', 
-                            type='TRAILING_STOP_MARKET', 
-                            callbackRate=1.5, 
-                            quantity=qty_tp2,
-                            reduceOnly=True
-                        )
                     success_msg = f"Short {symbol} (x{leverage})\nEntry: {entry_price}\nQty: {quantity}\nSL: {sl_price}\nTP1: {tp1_price} (50%)\nTP2: Trailing 1.5%"
 
                 self._log_trade(symbol, entry_price, quantity, sl_price, tp1_price, side='SHORT')
@@ -575,6 +604,9 @@ class TradingSession:
             except Exception as e:
                 # 🚨 CRITICAL: ROLLBACK (Close Position)
                 print(f"⚠️ Order Placement Failed: {e}. closing position...")
+                try:
+                     self.client.futures_cancel_all_open_orders(symbol=symbol) # Part of the batch may have been accepted
+                except: pass
                 try:
                      self.client.futures_create_order(
                         symbol=symbol, side='BUY', type='MARKET', quantity=quantity, reduceOnly=True
@@ -587,40 +619,100 @@ class TradingSession:
         except Exception as e:
             return False, f"[{symbol}] Error: {e}"
 
+    def flatten_positions(self, side=None):
+        """
+        Panic-flatten: closes every open position (only LONGs or SHORTs with side=) concurrently.
+        - Quantities are resolved once up front (account stream if live, else ONE REST call)
+        - One reduce-only MARKET order per position, FLATTEN_WORKERS at a time; each symbol's
+          leftover SL/TP orders are cancelled after its close has filled. Every request takes
+          its weight from the shared order_weight bucket (no 429s across sessions)
+        Returns {'positions': [{symbol, qty, ok, msg, ms}], 'flat', 'total_ms'}: ok means the close
+        FILLED, ms is its time-to-flat (close response); flat is True only if every close filled,
+        and total_ms (the time until the last one was flat) is None otherwise.
+        """
+        start = time.perf_counter()
+        targets = []
+        for p in self.get_active_positions():
+            qty = float(p['amt'])
+            if qty != 0 and (side is None or (qty > 0) == (side == 'LONG')):
+                targets.append((p['symbol'], qty))
+        if not targets:
+            return {'positions': [], 'flat': True, 'total_ms': 0.0}
+
+        def close(symbol, qty):
+            try:
+                if "USDT" not in symbol and self.alpaca_client:
+                    ok, msg = self.execute_close_position(symbol)
+                    flat_at = time.perf_counter()
+                else:
+                    order_weight.acquire_blocking(1)
+                    order = self.client.futures_create_order(
+                        symbol=symbol, side='SELL' if qty > 0 else 'BUY', type='MARKET',
+                        reduceOnly=True, quantity=abs(qty), newOrderRespType='RESULT'
+                    )
+                    flat_at = time.perf_counter()
+                    msg = order.get('status', 'NEW')
+                    ok = msg == 'FILLED'
+                    if ok: # Not filled: the SL/TP orders still protect what is left
+                        try:
+                            order_weight.acquire_blocking(1)
+                            self.client.futures_cancel_all_open_orders(symbol=symbol)
+                        except Exception: pass # Closed anyway: closePosition stops have nothing left to close
+            except BinanceAPIException as e:
+                ok, msg, flat_at = False, e.message, time.perf_counter()
+            except Exception as e:
+                ok, msg, flat_at = False, str(e), time.perf_counter()
+            return {'symbol': symbol, 'qty': qty, 'ok': ok, 'msg': msg, 'ms': (flat_at - start) * 1000}
+
+        with ThreadPoolExecutor(max_workers=min(len(targets), FLATTEN_WORKERS)) as pool:
+            results = list(pool.map(lambda t: close(*t), targets))
+        flat = all(r['ok'] for r in results)
+        return {'positions': results, 'flat': flat, 'total_ms': max(r['ms'] for r in results) if flat else None}
+
     def execute_close_all(self):
-        """Cierra TODAS las posiciones activas"""
+        """Cierra TODAS las posiciones activas (en paralelo)"""
         if not self.client: return False, "No valid session."
         
-        active_pos = self.get_active_positions()
-        if not active_pos:
+        report = self.flatten_positions()
+        if not report['positions']:
             return False, "No active positions to close."
             
         results = []
-        for p in active_pos:
-            sym = p['symbol']
-            success, msg = self.execute_close_position(sym)
-            results.append(f"{sym}: {'✅' if success else '❌'}")
+        for r in report['positions']:
+            detail = f"{r['ms']:.0f} ms" if r['ok'] else r['msg']
+            results.append(f"{r['symbol']}: {'✅' if r['ok'] else '❌'} ({detail})")
             
-        return True, "Batch Close:\n" + "\n".join(results)
+        if not report['flat']:
+            closed = sum(r['ok'] for r in report['positions'])
+            return False, "Batch Close:\n" + "\n".join(results) + f"\n⚠️ Partial: {closed}/{len(results)} positions closed."
+        return True, "Batch Close:\n" + "\n".join(results) + f"\n⏱️ Flat in {report['total_ms']:.0f} ms"
 
     def execute_flip_position(self, symbol, new_side, atr=None):
         """
         FLIP LOGIC:
         1. Cancel Open Orders.
         2. Close Current Position.
-        3. Wait 1s.
+        3. Confirm the close (order response / account stream).
         4. Open New Position (Reverse).
         """
         if not self.client: return False, "No valid session."
         
         # 1. Close Current
-        success_close, msg_close = self.execute_close_position(symbol)
+        alpaca = "USDT" not in symbol and self.alpaca_client
+        if alpaca:
+            success_close, msg_close = self.execute_close_position(symbol)
+            close_order = None
+        else:
+            success_close, msg_close, close_order = self._close_futures_position(symbol)
         
         if not success_close and "No open position" not in msg_close:
             return False, f"Flip Aborted: Failed to close ({msg_close})"
             
-        # 2. Safety Wait (Binance sequencing)
-        time.sleep(1.0)
+        # 2. Confirm Close
+        if success_close:
+            flat = self._confirm_alpaca_flat(symbol) if alpaca else self._confirm_flat(symbol, close_order)
+            if not flat:
+                return False, f"Flip Aborted: Close of {symbol} not confirmed."
         
         # 3. Open New
         if new_side == 'LONG':
@@ -648,40 +740,102 @@ class TradingSession:
         # 2. BINANCE ROUTING
         if not self.client: return False, "No valid session."
         
+        success, msg, _ = self._close_futures_position(symbol)
+        return success, msg
+
+    def _close_futures_position(self, symbol):
+        """Binance side of execute_close_position. Returns (success, msg, close order response or None)."""
         try:
+            state = self._live_account_state()
+
             # 1. Cancel Open Orders (SL/TP)
-            self.client.futures_cancel_all_open_orders(symbol=symbol)
+            if not state or state.open_orders(symbol):
+                self.client.futures_cancel_all_open_orders(symbol=symbol)
             
             # 2. Get Position Info
-            try:
-                positions = self.client.futures_position_information(symbol=symbol)
-            except:
-                positions = self.client.futures_position_information()
-                
             qty = 0.0
-            for p in positions:
-                if p['symbol'] == symbol:
-                    qty = float(p['positionAmt'])
-                    break
+            if state:
+                qty = state.position_amt(symbol)
+            else:
+                try:
+                    positions = self.client.futures_position_information(symbol=symbol)
+                except:
+                    positions = self.client.futures_position_information()
+                    
+                for p in positions:
+                    if p['symbol'] == symbol:
+                        qty = float(p['positionAmt'])
+                        break
             
             if qty == 0:
-                return False, f"No open position found for {symbol}."
+                return False, f"No open position found for {symbol}.", None
             
-            # 3. Close Position
+            # 3. Close Position (RESULT: the response carries the fill status)
             side = 'SELL' if qty > 0 else 'BUY'
             
-            self.client.futures_create_order(
+            order = self.client.futures_create_order(
                 symbol=symbol, 
                 side=side, 
                 type='MARKET', 
                 reduceOnly=True,
-                quantity=abs(qty)
+                quantity=abs(qty),
+                newOrderRespType='RESULT'
             )
             
-            return True, f"✅ Closed {symbol} ({qty}). PnL pending update."
+            return True, f"✅ Closed {symbol} ({qty}). PnL pending update.", order
             
         except Exception as e:
-            return False, f"Error: {str(e)}"
+            return False, f"Error: {str(e)}", None
+
+    def _confirm_flat(self, symbol, close_order=None, timeout=2.0, max_rest_polls=3):
+        """
+        Confirms a close before re-entering (replaces the fixed post-close sleep).
+        A FILLED close response is final: the stream-fed cache (if any) is marked flat right
+        away, so the re-entry's position check does not wait for the stream to catch up.
+        Otherwise polls (stream if live, else REST) and makes one last REST check before giving up.
+        REST polls are capped at `max_rest_polls`, spread over the timeout, so confirmations
+        during a multi-session fan-out stay light on the request-weight budget.
+        """
+        filled = close_order is not None and close_order.get('status') == 'FILLED'
+        if filled:
+            if self.account_state:
+                self.account_state.set_position(symbol, 0.0)
+            return True
+        deadline = time.time() + timeout
+        rest_polls = 0
+        while True:
+            state = self._live_account_state()
+            if state:
+                amt = state.position_amt(symbol)
+            else:
+                amt = sum(float(p['positionAmt']) for p in self.client.futures_position_information(symbol=symbol))
+                rest_polls += 1
+            if amt == 0:
+                return True
+            if time.time() >= deadline or (not state and rest_polls >= max_rest_polls):
+                if not state:
+                    return False
+                amt = sum(float(p['positionAmt']) for p in self.client.futures_position_information(symbol=symbol))
+                if amt == 0:
+                    state.set_position(symbol, 0.0) # The stream lags: REST already sees it flat
+                return amt == 0
+            time.sleep(0.01 if state else timeout / max_rest_polls)
+
+    def _confirm_alpaca_flat(self, symbol, timeout=5.0, interval=0.5):
+        """Alpaca closes asynchronously (no fill in the response): polls until the position is gone."""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self.alpaca_client.get_open_position(symbol)
+            except APIError as e:
+                if e.status_code == 404: # Position does not exist: flat
+                    return True
+                print(f"⚠️ Alpaca position check failed ({symbol}): {e}")
+            except Exception as e:
+                print(f"⚠️ Alpaca position check failed ({symbol}): {e}")
+            if time.time() >= deadline:
+                return False
+            time.sleep(interval)
 
     def execute_update_sltp(self, symbol, side, atr=None):
         """
@@ -694,15 +848,21 @@ class TradingSession:
         
         try:
             # 1. Verify Position & Get Size
-            positions = self.client.futures_position_information(symbol=symbol)
+            state = self._live_account_state()
             qty = 0.0
             entry_price = 0.0
-            for p in positions:
-                amt = float(p['positionAmt'])
-                if amt != 0:
-                    qty = amt
-                    entry_price = float(p['entryPrice'])
-                    break
+            if state:
+                pos = state.position(symbol)
+                if pos:
+                    qty, entry_price = pos['amt'], pos['entry']
+            else:
+                positions = self.client.futures_position_information(symbol=symbol)
+                for p in positions:
+                    amt = float(p['positionAmt'])
+                    if amt != 0:
+                        qty = amt
+                        entry_price = float(p['entryPrice'])
+                        break
             
             if qty == 0: return False, "No position found to update."
             
@@ -712,7 +872,8 @@ class TradingSession:
                 return False, f"Side mismatch (Req: {side}, Has: {curr_side})."
 
             # 2. Cancel Old Orders
-            self.client.futures_cancel_all_open_orders(symbol=symbol)
+            if not state or state.open_orders(symbol):
+                self.client.futures_cancel_all_open_orders(symbol=symbol)
             
             # 3. New Params
             ticker = self.client.futures_symbol_ticker(symbol=symbol)
@@ -742,66 +903,15 @@ class TradingSession:
                     sl_price = round(current_price * (1 + stop_loss_pct), price_precision)
                     tp1_price = round(current_price * (1 - (stop_loss_pct * 3)), price_precision)
                     
-            # 4. Place Orders
-            success_msg = ""
+            # 4. Place Orders (one batch request)
+            exit_side = 'SELL' if side == 'LONG' else 'BUY'
+            orders, split = self._bracket_orders(exit_side, abs_qty, sl_price, tp1_price, entry_price, qty_precision)
+            self._place_orders(symbol, orders)
             
-            if side == 'LONG':
-                # SL
-                self.client.futures_create_order(
-                    symbol=symbol, side='SELL', type='STOP_MARKET', stopPrice=sl_price, closePosition=True
-                )
-                
-                # TP
-                qty_tp1 = float(round(abs_qty / 2, qty_precision))
-                tp_notional = qty_tp1 * entry_price
-                
-                if tp_notional < 5.5:
-                     self.client.futures_create_order(
-                       symbol=symbol, side='SELL', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, closePosition=True
-                    )
-                     success_msg = f"🔄 Updated LONG {symbol}\nSL: {sl_price}\nTP: {tp1_price} (100%)"
-                else:
-                    # Split
-                    if qty_tp1 > 0:
-                        self.client.futures_create_order(
-                           symbol=symbol, side='SELL', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, quantity=qty_tp1, reduceOnly=True
-                        )
-                    
-                    qty_tp2 = float(round(abs_qty - qty_tp1, qty_precision))
-                    if qty_tp2 > 0:
-                         self.client.futures_create_order(
-                            symbol=symbol, side='SELL', type='TRAILING_STOP_MARKET', callbackRate=1.5, quantity=qty_tp2, reduceOnly=True
-                        )
-                    success_msg = f"🔄 Updated LONG {symbol}\nSL: {sl_price}\nTP1: {tp1_price}\nTP2: Trailing 1.5%"
-                    
-            else: # SHORT
-                # SL
-                self.client.futures_create_order(
-                    symbol=symbol, side='BUY', type='STOP_MARKET', stopPrice=sl_price, closePosition=True
-                )
-                
-                # TP
-                qty_tp1 = float(round(abs_qty / 2, qty_precision))
-                tp_notional = qty_tp1 * entry_price
-                
-                if tp_notional < 5.5:
-                     self.client.futures_create_order(
-                       symbol=symbol, side='BUY', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, closePosition=True
-                    )
-                     success_msg = f"🔄 Updated SHORT {symbol}\nSL: {sl_price}\nTP: {tp1_price} (100%)"
-                else:
-                    # Split
-                    if qty_tp1 > 0:
-                        self.client.futures_create_order(
-                           symbol=symbol, side='BUY', type='TAKE_PROFIT_MARKET', stopPrice=tp1_price, quantity=qty_tp1, reduceOnly=True
-                        )
-                    
-                    qty_tp2 = float(round(abs_qty - qty_tp1, qty_precision))
-                    if qty_tp2 > 0:
-                         self.client.futures_create_order(
-                            symbol=symbol, side='BUY', type='TRAILING_STOP_MARKET', callbackRate=1.5, quantity=qty_tp2, reduceOnly=True
-                        )
-                    success_msg = f"🔄 Updated SHORT {symbol}\nSL: {sl_price}\nTP1: {tp1_price}\nTP2: Trailing 1.5%"
+            if not split:
+                success_msg = f"🔄 Updated {side} {symbol}\nSL: {sl_price}\nTP: {tp1_price} (100%)"
+            else:
+                success_msg = f"🔄 Updated {side} {symbol}\nSL: {sl_price}\nTP1: {tp1_price}\nTP2: Trailing 1.5%"
             
             return True, success_msg
             
@@ -1070,16 +1180,20 @@ class TradingSession:
         """Devuelve lista de símbolos con posiciones activas"""
         if not self.client: return []
         try:
-            positions = self.client.futures_position_information()
-            active = []
-            for p in positions:
-                if float(p['positionAmt']) != 0:
-                    active.append({
-                        "symbol": p['symbol'],
-                        "amt": p['positionAmt'],
-                        "entry": p['entryPrice'],
-                        "pnl": p['unRealizedProfit']
-                    })
+            state = self._live_account_state()
+            if state:
+                active = state.positions()
+            else:
+                positions = self.client.futures_position_information()
+                active = []
+                for p in positions:
+                    if float(p['positionAmt']) != 0:
+                        active.append({
+                            "symbol": p['symbol'],
+                            "amt": p['positionAmt'],
+                            "entry": p['entryPrice'],
+                            "pnl": p['unRealizedProfit']
+                        })
             
             # 2. ALPACA
             if self.alpaca_client: